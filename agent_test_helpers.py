@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Shared fakes and helpers for the agent tests (not a test module itself)"""
+
+import json
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
+
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import AgentCapabilities, AgentCard
+
+import cs_feedback_agent_executor
+from admission import AdmissionController
+from semantic_cache import SemanticCache
+from session_manager import AgentSessions
+
+
+class ToolCallingAgent:
+    """Stands in for the Strands agent: one tool call, then the JSON envelope"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def stream_async(self, prompt, cancel_signal=None):
+        for _ in range(3):
+            # 도구 입력 스트리밍 중에는 같은 tool use 가 반복된다
+            yield {"current_tool_use": {"toolUseId": "t1", "name": "get_feedback", "input": ""}}
+        for chunk in ['{"status": "completed", ', '"message": "테란 불만 2건"}']:
+            yield {"data": chunk}
+
+
+class ScriptedAgent:
+    """Answers with the given envelopes in order and records the prompts it got"""
+
+    def __init__(self, envelopes):
+        self.envelopes = list(envelopes)
+        self.prompts = []
+        self.messages = []
+
+    async def stream_async(self, prompt, cancel_signal=None):
+        self.prompts.append(prompt)
+        yield {"data": json.dumps(self.envelopes.pop(0), ensure_ascii=False)}
+
+
+@contextmanager
+def patched(module, **values):
+    """Set module attributes for the duration of the block and restore them afterwards"""
+    originals = {name: getattr(module, name) for name in values}
+    for name, value in values.items():
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for name, value in originals.items():
+            setattr(module, name, value)
+
+
+def fake_cs_agents(factory):
+    """Run the CS executor with ``factory(messages)`` agents, an empty answer cache and no rate limits
+
+    The real controller's request bucket is shared by every test in the
+    process, so earlier tests would otherwise slow down later ones.
+    """
+    return patched(cs_feedback_agent_executor, sessions=AgentSessions(factory, "test"), answer_cache=SemanticCache(),
+                   admission=AdmissionController())
+
+
+def cs_card() -> AgentCard:
+    return AgentCard(
+        name="CS Feedback Agent", description="test", url="http://cs.test", version="1.0.0",
+        defaultInputModes=["text/plain"], defaultOutputModes=["text/plain"], skills=[],
+        capabilities=AgentCapabilities(streaming=True),
+    )
+
+
+def cs_handler() -> DefaultRequestHandler:
+    """Request handler around the real CS executor (agents come from fake_cs_agents)"""
+    return DefaultRequestHandler(
+        agent_executor=cs_feedback_agent_executor.CSFeedbackExecutor(),
+        task_store=InMemoryTaskStore(),
+    )
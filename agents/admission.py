@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Admission control for agent requests.
+
+Every request to an agent turns into one or more Bedrock calls. Without a
+limit, a burst of users makes every agent fire LLM calls at once, Bedrock
+throttles, and all requests slow down together. Each agent therefore admits
+requests through its own controller (``admission_for``), also when all three
+agents share one process (single_process.py):
+
+- at most ``max_concurrency`` requests run at the same time
+- the rest wait in a priority queue (interactive GUI requests ahead of batch
+  reports, FIFO within a priority)
+- a request-rate and a token-rate bucket keep admitted requests under the
+  model's RPM / TPM quota. The quota belongs to the whole account, so every
+  controller gets an equal share: BEDROCK_RPM / BEDROCK_TPM divided by the
+  number of agents (BEDROCK_QUOTA_AGENTS, default 3) and by the worker
+  processes of each agent (AGENT_WORKERS)
+- when the queue is too deep new requests are rejected immediately (HTTP 429
+  on /ask_stream, a ``rejected`` task on A2A) instead of piling up
+
+Limits come from environment variables (see ``AdmissionController.from_env``).
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+from serialization import sse_event
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 0
+BATCH = 1
+PRIORITIES = {"interactive": INTERACTIVE, "batch": BATCH}
+PRIORITY_HEADER = "x-request-priority"
+
+# 응답 토큰까지 포함한 요청당 대략적인 토큰 수 (에이전트 루프 + 도구 호출)
+BASE_REQUEST_TOKENS = 2000
+
+# 같은 계정의 Bedrock 할당량을 나눠 쓰는 에이전트 수 (코디네이터·CS·데이터)
+QUOTA_AGENTS_ENV = "BEDROCK_QUOTA_AGENTS"
+# worker_pool.WORKERS_ENV (워커 프로세스는 이 값을 물려받는다)
+WORKERS_ENV = "AGENT_WORKERS"
+
+# 현재 컨텍스트가 슬롯을 받은 컨트롤러 (같은 컨트롤러로 다시 들어오는 중첩 호출 판별)
+_admitted = ContextVar("admitted", default=None)
+
+
+class Overloaded(Exception):
+    """Raised when the admission queue is full"""
+
+    def __init__(self, queue_depth: int, retry_after: float):
+        super().__init__(f"서버가 혼잡합니다 (대기 {queue_depth}건). {retry_after:.0f}초 후 다시 시도하세요.")
+        self.queue_depth = queue_depth
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second, bursts up to ``capacity``"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        self._refill()
+        return max(0.0, (min(amount, self.capacity) - self.tokens) / self.rate)
+
+    async def acquire(self, amount: float = 1.0):
+        # 용량보다 큰 요청은 용량만큼만 차감 (영원히 못 들어가는 요청 방지)
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                delay = self.wait_time(amount)
+                if delay <= 0:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep(delay)
+
+
+def quota_shares() -> int:
+    """Controllers sharing the account quota: agents x worker processes per agent"""
+    agents = int(os.environ.get(QUOTA_AGENTS_ENV, "3"))
+    workers = int(os.environ.get(WORKERS_ENV, "1"))
+    return max(1, agents) * max(1, workers)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token cost of a request: prompt length plus a fixed budget for the agent loop"""
+    return BASE_REQUEST_TOKENS + len(text or "") // 2
+
+
+def parse_priority(value) -> int:
+    return PRIORITIES.get(str(value or "").strip().lower(), INTERACTIVE)
+
+
+def request_priority(request, body: dict = None) -> int:
+    """Priority of an HTTP request: X-Request-Priority header or "priority" body field"""
+    value = request.headers.get(PRIORITY_HEADER) or (body or {}).get("priority")
+    return parse_priority(value)
+
+
+def message_priority(message) -> int:
+    """Priority of an A2A message: metadata {"priority": "batch"}"""
+    metadata = getattr(message, "metadata", None) or {}
+    return parse_priority(metadata.get("priority"))
+
+
+class AdmissionController:
+    """Bounded concurrency + priority queue + rate limits for one agent"""
+
+    def __init__(self, max_concurrency: int = 4, max_queue: int = 16,
+                 requests_per_minute: float = None, tokens_per_minute: float = None):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.active = 0
+        self._waiters = []
+        self._seq = itertools.count()
+        self.request_bucket = (
+            TokenBucket(requests_per_minute / 60, max(1.0, requests_per_minute / 60 * max_concurrency))
+            if requests_per_minute else None
+        )
+        self.token_bucket = TokenBucket(tokens_per_minute / 60, tokens_per_minute) if tokens_per_minute else None
+        # 최근 처리 시간 (Retry-After 추정용)
+        self._avg_service = 10.0
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """ADMISSION_MAX_CONCURRENCY, ADMISSION_MAX_QUEUE, BEDROCK_RPM, BEDROCK_TPM (0 = unlimited)
+
+        BEDROCK_RPM / BEDROCK_TPM are the account-wide quota; this controller
+        gets its share (see ``quota_shares``).
+        """
+        shares = quota_shares()
+        rpm = float(os.environ.get("BEDROCK_RPM", "120")) / shares
+        tpm = float(os.environ.get("BEDROCK_TPM", "200000")) / shares
+        return cls(
+            max_concurrency=int(os.environ.get("ADMISSION_MAX_CONCURRENCY", "4")),
+            max_queue=int(os.environ.get("ADMISSION_MAX_QUEUE", "16")),
+            requests_per_minute=rpm or None,
+            tokens_per_minute=tpm or None,
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def queue_limit(self, priority: int) -> int:
+        # 배치 요청은 큐의 절반까지만 - 나머지는 대화형 요청 몫
+        return self.max_queue if priority == INTERACTIVE else self.max_queue // 2
+
+    def check(self, priority: int = INTERACTIVE):
+        """Raise Overloaded if a request of this priority would have to queue past the limit"""
+        if self.active < self.max_concurrency and not self._waiters:
+            return
+        if self.queue_depth >= self.queue_limit(priority):
+            waves = self.queue_depth // self.max_concurrency + 1
+            raise Overloaded(self.queue_depth, waves * self._avg_service)
+
+    async def _acquire_slot(self, priority: int):
+        self.check(priority)
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._seq), future)
+        heapq.heappush(self._waiters, entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 슬롯을 넘겨받은 직후 취소됨 - 다음 대기자에게 넘긴다
+                self._release_slot()
+            else:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+
+    def _release_slot(self):
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # 슬롯을 그대로 다음 대기자에게 넘긴다 (active 수 유지)
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: int = INTERACTIVE, tokens: int = BASE_REQUEST_TOKENS):
+        """Wait for a concurrency slot and rate budget; raises Overloaded when the queue is full
+
+        Work nested in a request this controller already admitted shares
+        its caller's slot and only waits for rate budget: taking a second
+        slot from the same controller could deadlock once every slot is held
+        by a waiting caller. A sub-agent called in-process by the coordinator
+        (see in_process.py) has its own controller and takes its own slot.
+        """
+        if _admitted.get() is self:
+            await self._pace(tokens)
+            yield
+            return
+        await self._acquire_slot(priority)
+        started = time.monotonic()
+        admitted = _admitted.set(self)
+        try:
+            await self._pace(tokens)
+            yield
+        finally:
+            _admitted.reset(admitted)
+            self._avg_service = 0.8 * self._avg_service + 0.2 * (time.monotonic() - started)
+            self._release_slot()
+
+    async def _pace(self, tokens: int):
+        if self.request_bucket:
+            await self.request_bucket.acquire(1)
+        if self.token_bucket:
+            await self.token_bucket.acquire(tokens)
+
+    def stats(self) -> dict:
+        return {"active": self.active, "queued": self.queue_depth, "max_concurrency": self.max_concurrency}
+
+
+_controllers = {}
+
+
+def admission_for(agent: str) -> AdmissionController:
+    """The admission controller of one agent ("cs", "data", "game_balance"), created on first use
+
+    Args:
+        agent: Agent name; every module of the same agent gets the same controller
+    """
+    controller = _controllers.get(agent)
+    if controller is None:
+        controller = _controllers.setdefault(agent, AdmissionController.from_env())
+    return controller
+
+
+def overloaded_response(error: Overloaded):
+    """HTTP 429 for /ask_stream"""
+    from starlette.responses import JSONResponse
+
+    return JSONResponse(
+        {"type": "error", "content": str(error)},
+        status_code=429,
+        headers={"Retry-After": str(max(1, round(error.retry_after)))},
+    )
+
+
+async def admitted_stream(admission: AdmissionController, stream, priority: int, tokens: int):
+    """Run an SSE generator inside a slot of the agent's admission controller"""
+    try:
+        async with admission.slot(priority, tokens):
+            async for chunk in stream:
+                yield chunk
+    except Overloaded as e:
+        yield sse_event('error', content=str(e))
+
+
+async def reject_task(context, event_queue, error: Overloaded):
+    """Finish an A2A task as rejected because the agent is overloaded"""
+    from a2a.types import Artifact, TaskArtifactUpdateEvent, TaskState, TaskStatus, TaskStatusUpdateEvent, TextPart
+
+    logger.warning(f"Rejecting task {context.task_id}: {error}")
+    await event_queue.enqueue_event(TaskArtifactUpdateEvent(
+        taskId=context.task_id,
+        contextId=context.context_id,
+        artifact=Artifact(artifactId=str(uuid.uuid4()), parts=[TextPart(text=str(error))]),
+    ))
+    await event_queue.enqueue_event(TaskStatusUpdateEvent(
+        taskId=context.task_id,
+        contextId=context.context_id,
+        status=TaskStatus(state=TaskState.rejected),
+        final=True,
+    ))
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Correlated balance snapshot: match stats joined with complaint volume.
+
+"게임 밸런스 분석해줘" used to cost two LLM-driven sub-agent runs (data and
+CS) plus a coordinator pass correlating their prose. A snapshot answers it
+with numbers, per race and date window:
+
+- match side (``match_snapshot``): win rate with 95% interval, and every
+  matchup's delta from 50% and change since the previous window of equal
+  length, read from the game log engine's per-day prefix sums
+- feedback side (``FeedbackRollup`` + ``ComplaintTrends``, kept by the CS
+  agent): complaint volume and share, upvotes, urgency mix, upvote-weighted
+  sentiment and the top complaint keywords over the same dates
+
+Both sides are updated incrementally as matches and posts are ingested, so
+a snapshot only sums the days in the window.
+"""
+
+import threading
+
+import numpy as np
+
+from complaint_trends import ALL, race_key
+from match_store import RACES, date_to_day, day_to_date
+from win_rate_stats import win_rate_summary
+
+URGENCY_LEVELS = ("high", "medium", "low")
+TOP_KEYWORDS = 5
+# 일별 행: 건수, 추천 수, 감성 가중치 합, 가중 감성 합, high, medium, low
+_FIELDS = 4 + len(URGENCY_LEVELS)
+
+
+class FeedbackRollup:
+    """Per (race, day) complaint totals, summed over any date window"""
+
+    def __init__(self):
+        # race -> {day: [_FIELDS 값]}
+        self.days = {race: {} for race in (ALL, *RACES)}
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def extend(self, feedback):
+        """Add posts ({"race", "date", "upvotes", "urgency", "sentiment_score"})"""
+        with self._lock:
+            for item in feedback:
+                day = date_to_day(item["date"])
+                upvotes = int(item.get("upvotes") or 0)
+                # 추천이 많은 글의 감성이 더 크게 반영된다 (추천 0개도 한 표)
+                weight = upvotes + 1
+                sentiment = item.get("sentiment_score")
+                urgency = item.get("urgency")
+                for key in {ALL, race_key(item.get("race"))}:
+                    row = self.days[key].get(day)
+                    if row is None:
+                        row = self.days[key][day] = [0] * _FIELDS
+                    row[0] += 1
+                    row[1] += upvotes
+                    if sentiment is not None:
+                        row[2] += weight
+                        row[3] += weight * sentiment
+                    if urgency in URGENCY_LEVELS:
+                        row[4 + URGENCY_LEVELS.index(urgency)] += 1
+            self.version += 1
+
+    def summary(self, race=None, lo: int = None, hi: int = None) -> dict:
+        """Totals over days lo..hi (inclusive, None = open)"""
+        total = [0] * _FIELDS
+        with self._lock:
+            for day, row in self.days[race_key(race)].items():
+                if (lo is None or day >= lo) and (hi is None or day <= hi):
+                    for i, value in enumerate(row):
+                        total[i] += value
+        return {
+            "complaints": total[0],
+            "upvotes": total[1],
+            "sentiment": round(total[3] / total[2], 3) if total[2] else None,
+            "urgency": dict(zip(URGENCY_LEVELS, total[4:])),
+        }
+
+
+def feedback_snapshot(rollup: FeedbackRollup, trends, lo: int = None, hi: int = None, k: int = TOP_KEYWORDS) -> dict:
+    """Complaint side of the snapshot for every race over days lo..hi
+
+    Keywords come from ``trends`` (a ComplaintTrends); windows longer than
+    its horizon are cut to the most recent ``horizon_days``.
+    """
+    end = hi if hi is not None else trends.latest_day
+    days = trends.horizon_days if lo is None or end is None else max(1, min(end - lo + 1, trends.horizon_days))
+    until = day_to_date(end) if end is not None else None
+    result = {}
+    for race in (ALL, *RACES):
+        entry = rollup.summary(race, lo, hi)
+        top = trends.top(race, days, k, until=until)
+        entry["keywords"] = [{"keyword": t["keyword"], "count": t["count"]} for t in top["keywords"]]
+        entry["keywords_window"] = {"since": top["from"], "until": top["to"]}
+        result[race] = entry
+    return result
+
+
+def previous_window(engine, lo: int = None, hi: int = None):
+    """Equal-length window just before lo..hi (None for an open-ended window)"""
+    end = hi if hi is not None else engine.last_day
+    if lo is None or end is None:
+        return None
+    length = end - lo + 1
+    return lo - length, lo - 1
+
+
+def match_snapshot(engine, lo: int = None, hi: int = None) -> dict:
+    """Per-race win rate, 95% interval and matchup deltas over the window"""
+    counts, _ = engine.matchup_table(lo, hi)
+    wins = counts.sum(axis=1)
+    games = wins + counts.sum(axis=0)
+    # 종족 전체와 매치업 행렬을 각각 한 번에 계산
+    races = win_rate_summary(wins, games)
+    pairs = win_rate_summary(counts, counts + counts.T)
+    previous = previous_window(engine, lo, hi)
+    if previous:
+        before, _ = engine.matchup_table(*previous)
+        before_races = win_rate_summary(before.sum(axis=1), before.sum(axis=1) + before.sum(axis=0))["rate"]
+        before_pairs = win_rate_summary(before, before + before.T)["rate"]
+    result = {}
+    for code, race in enumerate(RACES):
+        matchups = []
+        for opp, opponent in enumerate(RACES):
+            if opp == code:
+                continue
+            rate = pairs["rate"][code, opp]
+            matchup = {
+                "opponent": opponent,
+                "games": counts[code, opp] + counts[opp, code],
+                "win_rate": rate,
+                "delta": rate - 0.5,
+                "significant": pairs["significant"][code, opp],
+            }
+            if previous:
+                matchup["change"] = rate - before_pairs[code, opp]
+            matchups.append(matchup)
+        entry = {
+            "games": games[code],
+            "wins": wins[code],
+            "win_rate": races["rate"][code],
+            "ci_low": races["low"][code],
+            "ci_high": races["high"][code],
+            "p_value": races["p_value"][code],
+            "significant": races["significant"][code],
+            "matchups": matchups,
+        }
+        if previous:
+            entry["change"] = races["rate"][code] - before_races[code]
+        result[race] = entry
+    return result
+
+
+def join_snapshot(matches: dict, feedback: dict = None, races=RACES) -> list:
+    """One entry per race: match stats + its complaints (None when the CS side is unavailable)"""
+    total = feedback[ALL]["complaints"] if feedback else 0
+    entries = []
+    for race in races:
+        entry = {"race": race, **matches[race]}
+        if feedback:
+            complaints = dict(feedback[race])
+            complaints["share"] = complaints["complaints"] / total if total else None
+            entry["feedback"] = complaints
+        else:
+            entry["feedback"] = None
+        entries.append(entry)
+    return entries
+
+
+def _pp(value) -> str:
+    return f"{value * 100:+.1f}%p"
+
+
+def snapshot_line(entry: dict) -> str:
+    """'Terran 승률 54.2% (95% CI 51.0~57.3%, 유의함, 이전 대비 +2.1%p) | vs Zerg +6.0%p ... | 불만 12건 ...'"""
+    if not entry["games"]:
+        line = f"{entry['race']} 경기 없음"
+    else:
+        verdict = "유의함" if entry["significant"] else "유의하지 않음"
+        change = f", 이전 대비 {_pp(entry['change'])}" if np.isfinite(entry.get("change", np.nan)) else ""
+        line = (f"{entry['race']} 승률 {entry['win_rate'] * 100:.1f}% "
+                f"(95% CI {entry['ci_low'] * 100:.1f}~{entry['ci_high'] * 100:.1f}%, {verdict}{change})")
+        deltas = [f"vs {m['opponent']} {_pp(m['delta'])}" for m in entry["matchups"] if m["games"]]
+        if deltas:
+            line += " | " + ", ".join(deltas)
+    feedback = entry["feedback"]
+    if feedback is None:
+        return line + " | 피드백 정보 없음"
+    if not feedback["complaints"]:
+        return line + " | 불만 0건"
+    share = f"{feedback['share']:.0%}, " if feedback["share"] is not None else ""
+    sentiment = f", 감성 {feedback['sentiment']:+.2f}" if feedback["sentiment"] is not None else ""
+    line += f" | 불만 {feedback['complaints']}건({share}추천 {feedback['upvotes']:,}{sentiment})"
+    if feedback["keywords"]:
+        line += ": " + ", ".join(k["keyword"] for k in feedback["keywords"][:3])
+    return line
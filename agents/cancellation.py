@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Cooperative cancellation for agent work.
+
+Every A2A task (and every /ask_stream request on the coordinator) runs inside
+a ``Cancellation`` scope that holds:
+
+- a ``threading.Event`` handed to Strands as ``cancel_signal``, so the agent
+  stops inside model streaming / between tool calls
+- cleanup callbacks registered by in-flight work, e.g. the coordinator's
+  A2A calls register a ``tasks/cancel`` for the sub-agent task they started
+
+``AgentExecutor.cancel`` looks the scope up by task ID and fires both, so an
+abandoned request stops its LLM loop and its sub-agent tasks right away
+instead of running the whole pipeline to completion.
+"""
+
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from a2a.types import TaskState, TaskStatus, TaskStatusUpdateEvent
+from a2a.utils import new_agent_text_message
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar("current_cancellation", default=None)
+# cancel_soon()으로 만든 태스크가 GC 되지 않도록 참조 유지
+_background = set()
+
+
+class Cancellation:
+    """Cancel signal and cleanup callbacks for one unit of work"""
+
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+        self.signal = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.signal.is_set()
+
+    def on_cancel(self, callback):
+        """Register an async callback to run on cancel (runs at once if already cancelled)
+
+        Returns a function that unregisters the callback once the work it
+        would stop has finished.
+        """
+        with self._lock:
+            if not self.cancelled:
+                self._callbacks.append(callback)
+                return lambda: self._discard(callback)
+        _spawn(callback())
+        return lambda: None
+
+    def _discard(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    async def cancel(self):
+        self.signal.set()
+        with self._lock:
+            callbacks, self._callbacks = self._callbacks, []
+        results = await asyncio.gather(*(callback() for callback in callbacks), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Cancel callback failed for {self.task_id}: {result}")
+
+    def cancel_soon(self):
+        """Cancel from a scope that is itself being cancelled (callbacks run in a new task)"""
+        self.signal.set()
+        _spawn(self.cancel())
+
+
+def _spawn(coroutine):
+    task = asyncio.get_running_loop().create_task(coroutine)
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+class CancellationRegistry:
+    """Running Cancellation scopes by task ID"""
+
+    def __init__(self):
+        self._scopes = {}
+
+    @contextmanager
+    def scope(self, task_id: str):
+        cancellation = Cancellation(task_id)
+        self._scopes[task_id] = cancellation
+        token = _current.set(cancellation)
+        try:
+            yield cancellation
+        finally:
+            _current.reset(token)
+            if self._scopes.get(task_id) is cancellation:
+                del self._scopes[task_id]
+
+    async def cancel(self, task_id: str) -> bool:
+        cancellation = self._scopes.get(task_id)
+        if cancellation is None:
+            return False
+        logger.info(f"Cancelling task {task_id}")
+        await cancellation.cancel()
+        return True
+
+
+cancellations = CancellationRegistry()
+
+
+def current_cancellation():
+    """Cancellation scope of the work running in this context, or None"""
+    return _current.get()
+
+
+async def mark_working(context, event_queue, text: str = None):
+    """Publish a working status (optionally with a progress message)
+
+    Sent first so the running task is stored and can be cancelled, and again
+    with ``text`` while the agent works so streaming clients see progress.
+    """
+    message = new_agent_text_message(text, context.context_id, context.task_id) if text else None
+    await event_queue.enqueue_event(TaskStatusUpdateEvent(
+        taskId=context.task_id,
+        contextId=context.context_id,
+        status=TaskStatus(state=TaskState.working, message=message),
+        final=False,
+    ))
+
+
+async def cancel_execution(context, event_queue):
+    """AgentExecutor.cancel: stop the running work and finish the task as canceled"""
+    await cancellations.cancel(context.task_id)
+    await event_queue.enqueue_event(TaskStatusUpdateEvent(
+        taskId=context.task_id,
+        contextId=context.context_id,
+        status=TaskStatus(state=TaskState.canceled),
+        final=True,
+    ))
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Streaming heavy-hitter tracker for complaint keywords.
+
+"What are players complaining about right now?" should not require reading
+every complaint through the LLM. Each ingested complaint is split into
+keywords (unit / aspect nouns and adjacent-word bigrams such as "마린 러시",
+with particles, verb endings and race names removed) and counted in
+Space-Saving summaries:
+
+- one summary per (race, day), plus one for all races, each holding at most
+  ``capacity`` counters; days older than ``horizon_days`` before the newest
+  complaint are dropped, so memory is fixed however much feedback arrives
+- a window query merges the day summaries in the window (the newest
+  complaint's date is the window end) and keeps the result until the next
+  ingest, so repeated questions are answered in microseconds
+
+Space-Saving reports every keyword whose true count exceeds
+``total / capacity``. Each reported keyword carries ``count`` (the sum of
+its day counters, used for ranking) and the bounds ``count_low`` <= true
+count <= ``count_high``. ``count`` is not a one-sided bound: a day counter
+overestimates, but a day whose summary dropped the keyword adds nothing.
+"""
+
+import math
+import os
+import re
+import threading
+import unicodedata
+
+from match_store import RACES, date_to_day, day_to_date
+
+CAPACITY_ENV = "TREND_CAPACITY"
+HORIZON_ENV = "TREND_HORIZON_DAYS"
+ALL = "all"
+
+RACE_NAMES = {"terran": "Terran", "테란": "Terran", "zerg": "Zerg", "저그": "Zerg",
+              "protoss": "Protoss", "프로토스": "Protoss", "토스": "Protoss"}
+# 키워드가 아닌 말 (정도/부탁/감탄 표현)
+STOPWORDS = {
+    "너무", "정말", "진짜", "제발", "빨리", "다들", "이제", "지금", "계속", "완전", "그냥", "좀",
+    "때문에", "이후", "방법", "상대할", "막을", "게임", "재미", "쓸모", "공감하시죠",
+    "수정", "패치", "부탁", "금방", "제대로", "안", "못",
+}
+_WORD = re.compile(r"[가-힣a-z0-9]+")
+# 단어 끝 조사 ("러시가", "체력이", "저그의"); 남는 말이 두 글자 이상일 때만
+_PARTICLE = re.compile(r"(?<=[가-힣]{2})(에서|으로|은|는|이|가|을|를|의|에|로|과|와)$")
+# 명사 + 하다/이다 ("강력합니다" → "강력", "사기입니다" → "사기")
+_NOUN_VERB = re.compile(r"(?<=[가-힣]{2})(합니다|해요|해서|하다|해주세요|되어서|돼서|됩니다|입니다|이에요|예요|이다)$")
+# 그 밖의 서술어 ("없어요", "부탁드려요", "떨어졌습니다", "길어서")
+_PREDICATE = re.compile(r"(니다|어요|아요|해요|려요|세요|가요|네요|죠|다|요|어서|아서|여서|혀서|려서|워서|라서|해서|하기|않고|하고|ㅠ+)$")
+_WINDOW = re.compile(r"^\s*(\d+)\s*([hdw]?)\s*$")
+
+
+def keywords(text: str) -> list:
+    """Unigram and adjacent-bigram keywords of one complaint"""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    runs, run = [], []
+    # 문장부호와 버려지는 말에서 끊어, 원래 붙어 있던 단어끼리만 bigram 을 만든다
+    for chunk in re.split(r"[.,!?~\n]+", text):
+        for word in chunk.split():
+            word = "".join(_WORD.findall(word))
+            if word not in STOPWORDS:
+                word = _NOUN_VERB.sub("", _PARTICLE.sub("", word))
+            if not word or word in STOPWORDS or word in RACE_NAMES or _PREDICATE.search(word) or len(word) < 2:
+                if run:
+                    runs.append(run)
+                run = []
+            else:
+                run.append(word)
+        if run:
+            runs.append(run)
+        run = []
+    terms = []
+    for run in runs:
+        terms.extend(run)
+        terms.extend(f"{a} {b}" for a, b in zip(run, run[1:]))
+    return terms
+
+
+def race_key(race) -> str:
+    """'Terran' / '테란' / None -> summary key ('all' when no race is given)"""
+    if not race or str(race).lower() in (ALL, "전체"):
+        return ALL
+    key = RACE_NAMES.get(str(race).strip().lower())
+    if key is None:
+        raise ValueError(f"Unknown race: {race} (use Terran, Zerg or Protoss)")
+    return key
+
+
+def parse_window(window) -> int:
+    """'24h' / '7d' / '2w' / 7 -> whole days (feedback is dated by day)"""
+    match = _WINDOW.match(str(window))
+    if not match or int(match.group(1)) <= 0:
+        raise ValueError(f"Invalid window: {window} (e.g. 24h, 7d, 2w)")
+    amount, unit = int(match.group(1)), match.group(2) or "d"
+    return {"h": math.ceil(amount / 24), "d": amount, "w": amount * 7}[unit]
+
+
+class SpaceSaving:
+    """Top-k counter summary with a fixed number of counters (Metwally et al.)"""
+
+    __slots__ = ("capacity", "counts", "errors", "total")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+
+    def add(self, item, weight: int = 1):
+        self.total += weight
+        if item in self.counts:
+            self.counts[item] += weight
+            return
+        if len(self.counts) < self.capacity:
+            self.counts[item] = weight
+            self.errors[item] = 0
+            return
+        # 가장 작은 카운터를 새 항목에 넘긴다: 그 값만큼 과대 추정될 수 있다
+        victim = min(self.counts, key=self.counts.__getitem__)
+        floor = self.counts.pop(victim)
+        del self.errors[victim]
+        self.counts[item] = floor + weight
+        self.errors[item] = floor
+
+    def floor(self) -> int:
+        """Upper bound on the count of any item that is not tracked"""
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+
+class ComplaintTrends:
+    """Heavy-hitter complaint keywords per race and sliding day window"""
+
+    def __init__(self, capacity: int = None, horizon_days: int = None):
+        """
+        Args:
+            capacity: Counters per (race, day) summary (default
+                $TREND_CAPACITY or 256)
+            horizon_days: Longest window that can be queried (default
+                $TREND_HORIZON_DAYS or 30)
+        """
+        self.capacity = capacity or int(os.environ.get(CAPACITY_ENV, "256"))
+        self.horizon_days = horizon_days or int(os.environ.get(HORIZON_ENV, "30"))
+        # race -> {day: SpaceSaving}
+        self.days = {race: {} for race in (ALL, *RACES)}
+        self.complaints = {race: {} for race in (ALL, *RACES)}
+        self.latest_day = None
+        self.ingested = 0
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def add(self, feedback: dict):
+        """Count one complaint ({"race", "complaint", "date"})"""
+        day = date_to_day(feedback["date"])
+        terms = keywords(feedback.get("complaint", ""))
+        race = race_key(feedback.get("race"))
+        with self._lock:
+            self.ingested += 1
+            self._results.clear()
+            if self.latest_day is None or day > self.latest_day:
+                self.latest_day = day
+                self._expire()
+            if day <= self.latest_day - self.horizon_days:
+                return
+            for key in {ALL, race}:
+                summary = self.days[key].get(day)
+                if summary is None:
+                    summary = self.days[key][day] = SpaceSaving(self.capacity)
+                for term in terms:
+                    summary.add(term)
+                self.complaints[key][day] = self.complaints[key].get(day, 0) + 1
+
+    def extend(self, feedback):
+        for item in feedback:
+            self.add(item)
+
+    def _expire(self):
+        oldest = self.latest_day - self.horizon_days
+        for key, days in self.days.items():
+            for day in [day for day in days if day <= oldest]:
+                del days[day]
+                self.complaints[key].pop(day, None)
+
+    def top(self, race=None, window="7d", k: int = 10, until=None) -> dict:
+        """Most frequent complaint keywords in the last ``window`` (ending at the newest complaint)
+
+        Args:
+            race: Terran / Zerg / Protoss (Korean names accepted), None for all races
+            window: '24h', '7d', '2w' or a number of days (at most horizon_days)
+            k: Number of keywords
+            until: End the window at this date (YYYY-MM-DD) instead, if earlier
+        """
+        key, days = race_key(race), parse_window(window)
+        if days > self.horizon_days:
+            raise ValueError(f"Window {window} exceeds the {self.horizon_days}-day horizon")
+        with self._lock:
+            end = self.latest_day
+            if until is not None and end is not None:
+                end = min(end, date_to_day(until))
+            cached = self._results.get((key, days, end))
+            if cached is None:
+                cached = self._results[(key, days, end)] = self._merge(key, days, end)
+            terms, complaints, start = cached
+            return {
+                "race": key, "window_days": days,
+                "from": day_to_date(start) if start is not None else None,
+                "to": day_to_date(end) if end is not None else None,
+                "complaints": complaints,
+                "keywords": terms[:k],
+            }
+
+    def _merge(self, key: str, days: int, end):
+        if end is None:
+            return [], 0, None
+        start = end - days + 1
+        counts, errors, floors = {}, {}, {}
+        summaries = [(day, s) for day, s in self.days[key].items() if start <= day <= end]
+        # 한 날짜 요약에 없는 키워드도 그날 최대 floor 번 나왔을 수 있다
+        total_floor = 0
+        for day, summary in summaries:
+            floor = summary.floor()
+            total_floor += floor
+            for term, count in summary.counts.items():
+                counts[term] = counts.get(term, 0) + count
+                errors[term] = errors.get(term, 0) + summary.errors[term]
+                floors[term] = floors.get(term, 0) + floor
+        ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:self.capacity]
+        # 하한: 요약에 있던 날의 (count - error), 상한: 그 날의 count + 없던 날의 floor
+        terms = [
+            {"keyword": term, "count": count, "count_low": count - errors[term],
+             "count_high": count + total_floor - floors[term]}
+            for term, count in ranked
+        ]
+        complaints = sum(n for day, n in self.complaints[key].items() if start <= day <= end)
+        return terms, complaints, start
+
+    def counters(self) -> int:
+        """Counters currently held (bounded by races x horizon x capacity)"""
+        return sum(len(s.counts) for days in self.days.values() for s in days.values())
@@ -1,19 +1,31 @@
 #!/usr/bin/env python3
-import uvicorn
+# --profile-startup: 이후 import 시간을 재려면 가장 먼저 시작한다
+import startup
+startup.begin()
 import logging
-from starlette.responses import StreamingResponse
 from starlette.routing import Route
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import AgentCard, AgentSkill, AgentCapabilities
-from cs_feedback_agent_executor import CSFeedbackExecutor, agent
-import json
-import re
+from cs_feedback_agent_executor import CSFeedbackExecutor, ingest_feedback, sessions, snapshot_feedback, validate_feedback
+from sqlite_task_store import create_task_store
+from worker_pool import serve
+from response_envelope import split_thinking
+from admission import Overloaded, admission_for, admitted_stream, estimate_tokens, overloaded_response, request_priority
+from serialization import SSE_DONE, dumpb, loads, sse_event, sse_response
+from starlette.responses import Response
+from match_store import date_to_day
+import asyncio
+import threading
+
+startup.phase("imports")
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 이 에이전트의 동시 실행·대기열·요청률 한도 (다른 에이전트와 공유하지 않는다)
+admission = admission_for("cs")
+
 # Agent Card
 agent_card = AgentCard(
     name="CS Feedback Agent",
@@ -40,37 +52,83 @@ agent_card = AgentCard(
 
 # Custom streaming endpoint
 async def ask_stream(request):
-    body = await request.json()
+    body = loads(await request.body())
     query = body.get('query', '')
+    # GUI 세션 ID별로 대화를 이어간다 (없으면 일회용 에이전트)
+    session_id = body.get('session_id')
     
     async def generate():
+        # 클라이언트가 연결을 끊으면 제너레이터가 닫히면서 LLM 호출도 중단
+        cancel_signal = threading.Event()
         try:
-            result = await agent.invoke_async(query)
+            async with sessions.session(session_id) as agent:
+                result = await agent.invoke_async(query, cancel_signal=cancel_signal)
             full_response = result.output if hasattr(result, 'output') else str(result)
             
-            # Extract and send thinking
-            thinking_matches = re.findall(r'<thinking>(.*?)</thinking>', full_response, re.DOTALL)
-            for thinking in thinking_matches:
-                yield f"data: {json.dumps({'type': 'thinking', 'content': thinking.strip()})}\n\n"
-            
-            # Send answer (remove thinking and response tags)
-            clean_response = re.sub(r'<thinking>.*?</thinking>', '', full_response, flags=re.DOTALL)
-            clean_response = re.sub(r'<response>|</response>', '', clean_response, flags=re.DOTALL).strip()
+            # Extract and send thinking, then the answer without thinking/response tags
+            thinking_blocks, clean_response = split_thinking(full_response)
+            for thinking in thinking_blocks:
+                yield sse_event('thinking', content=thinking)
             
             if clean_response:
-                yield f"data: {json.dumps({'type': 'answer', 'content': clean_response})}\n\n"
+                yield sse_event('answer', content=clean_response)
             
-            yield f"data: {json.dumps({'type': 'done'})}\n\n"
+            yield SSE_DONE
         except Exception as e:
             logger.error(f"Streaming error: {e}", exc_info=True)
-            yield f"data: {json.dumps({'type': 'error', 'content': str(e)})}\n\n"
+            yield sse_event('error', content=str(e))
+        finally:
+            cancel_signal.set()
     
-    return StreamingResponse(generate(), media_type="text/event-stream")
+    # 대기열이 가득 차면 스트림을 열기 전에 429
+    priority = request_priority(request, body)
+    try:
+        admission.check(priority)
+    except Overloaded as e:
+        return overloaded_response(e)
+    return sse_response(request, admitted_stream(admission, generate(), priority, estimate_tokens(query)))
+
+async def feedback_snapshot(request):
+    """Complaint volume, sentiment and top keywords per race for the coordinator (no LLM)"""
+    params = request.query_params
+    try:
+        snapshot = snapshot_feedback(params.get("since"), params.get("until"), int(params.get("k", 5)))
+    except ValueError as e:
+        return Response(dumpb({"error": str(e)}), status_code=400, media_type="application/json")
+    return Response(dumpb(snapshot), media_type="application/json")
+
+async def post_feedback(request):
+    """Ingest forum posts: {"feedback": [...], "as_of": "YYYY-MM-DD"} or a single post
+
+    Posts are classified (urgency / sentiment) and folded into the keyword
+    trends and the balance snapshot rollup right away.
+    """
+    try:
+        body = loads(await request.body())
+        if isinstance(body, dict) and "feedback" in body:
+            items, as_of = body["feedback"], body.get("as_of")
+        else:
+            items, as_of = body, None
+        if isinstance(items, dict):
+            items = [items]
+        if not isinstance(items, list) or not items:
+            raise ValueError("feedback must be a post or a non-empty list of posts")
+        posts = [validate_feedback(item) for item in items]
+        if as_of is not None and not isinstance(as_of, str):
+            raise ValueError("as_of must be YYYY-MM-DD")
+        if as_of is not None:
+            date_to_day(as_of)
+    except ValueError as e:
+        return Response(dumpb({"error": str(e)}), status_code=400, media_type="application/json")
+    # 분류는 CPU 작업이므로 이벤트 루프 밖에서
+    posts = await asyncio.to_thread(ingest_feedback, posts, as_of)
+    labels = [{"urgency": p["urgency"], "sentiment": p["sentiment"]} for p in posts]
+    return Response(dumpb({"ingested": len(posts), "labels": labels}), media_type="application/json")
 
 # A2A Server
 request_handler = DefaultRequestHandler(
     agent_executor=CSFeedbackExecutor(),
-    task_store=InMemoryTaskStore()
+    task_store=create_task_store()
 )
 
 a2a_server = A2AStarletteApplication(
@@ -83,7 +141,14 @@ app = a2a_server.build()
 
 # Add custom route
 app.routes.append(Route('/ask_stream', ask_stream, methods=['POST']))
+app.routes.append(Route('/feedback_snapshot', feedback_snapshot, methods=['GET']))
+app.routes.append(Route('/feedback', post_feedback, methods=['POST']))
+startup.phase("app build")
 
 if __name__ == "__main__":
+    if startup.profiling():
+        print(startup.report("CS Feedback Agent"))
+        raise SystemExit
     logger.info("Starting CS Feedback Agent on port 9002...")
-    uvicorn.run(app, host="0.0.0.0", port=9002)
+    # 피드백 수집은 모든 워커에 보내 어느 워커의 도구·스냅샷이든 같은 데이터를 본다
+    serve(app, host="0.0.0.0", port=9002, name="CS Feedback Agent", broadcast=["/feedback"])
@@ -1,15 +1,31 @@
 import logging
+import os
+import threading
 import uuid
-import json
-import re
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
 from a2a.types import TaskState, TaskStatus, Artifact, TaskStatusUpdateEvent, TaskArtifactUpdateEvent, TextPart
 from strands import Agent, tool
-from strands.models.bedrock import BedrockModel
+from session_manager import AgentSessions, bedrock_model, conversation_manager, messages_since, record_turn
+from semantic_cache import SemanticCache
+from cancellation import cancel_execution, cancellations, current_cancellation, mark_working
+from event_buffer import BoundedEventQueue
+from response_envelope import run_agent_envelope
+from structured_output import artifact_parts, collect_tool_data, tool_error, tool_result
+from complaint_trends import ComplaintTrends, race_key
+from feedback_classifier import FeedbackClassifier
+from balance_snapshot import TOP_KEYWORDS, FeedbackRollup, feedback_snapshot
+from match_store import date_to_day
+from admission import Overloaded, admission_for, estimate_tokens, message_priority, reject_task
 
 logger = logging.getLogger(__name__)
 
+# 이 에이전트의 동시 실행·대기열·요청률 한도 (다른 에이전트와 공유하지 않는다)
+admission = admission_for("cs")
+
+# 메모리에 두는 피드백 최대 건수 (넘으면 오래된 것부터 버린다; 트렌드/스냅샷 누적값은 유지)
+MAX_FEEDBACK = int(os.environ.get("FEEDBACK_MAX_POSTS", "50000"))
+
 FEEDBACK_DATA = [
     {"race": "Terran", "complaint": "테란 마린 러시가 너무 강력합니다. 초반 방어가 불가능해요.", "upvotes": 245, "urgency": "high", "date": "2025-10-01"},
     {"race": "Zerg", "complaint": "저그 뮤탈이 너프되어서 이제 쓸모가 없습니다.", "upvotes": 312, "urgency": "high", "date": "2025-10-01"},
@@ -20,12 +36,13 @@ FEEDBACK_DATA = [
 ]
 
 @tool
-def get_feedback(urgency: str = None, race: str = None) -> str:
+def get_feedback(urgency: str = None, race: str = None, limit: int = 50) -> dict:
     """Get customer feedback from game forums
     
     Args:
         urgency: Filter by urgency level (high, medium, low)
         race: Filter by race (Terran, Zerg, Protoss)
+        limit: Most recently ingested posts to return (the count covers all matches)
     """
     filtered = FEEDBACK_DATA
     if urgency:
@@ -33,18 +50,161 @@ def get_feedback(urgency: str = None, race: str = None) -> str:
     if race:
         filtered = [f for f in filtered if f["race"] == race]
     
-    result = []
-    for f in filtered:
-        result.append(f"[{f['race']}] {f['complaint']} (추천: {f['upvotes']}, 날짜: {f['date']})")
+    if not filtered:
+        return tool_error("No feedback found")
     
-    return "\n".join(result) if result else "No feedback found"
+    # 본문은 JSON 으로, 텍스트는 종족별 건수 요약만
+    by_race = {}
+    for f in filtered:
+        by_race[f["race"]] = by_race.get(f["race"], 0) + 1
+    summary = f"피드백 {len(filtered)}건 (" + ", ".join(f"{r} {n}건" for r, n in by_race.items()) + ")"
+    return tool_result(summary, {
+        "filters": {"urgency": urgency, "race": race},
+        "count": len(filtered),
+        "feedback": filtered[-max(1, int(limit)):],
+    })
+
+# 수집·트렌드/롤업 생성을 직렬화 (생성 전에 잘려 나간 글이 누적값에서 빠지지 않도록)
+_ingest_lock = threading.RLock()
+# 지금까지 수집한 글 수: 줄어들지 않으므로 캐시 버전으로 쓴다 (FEEDBACK_DATA 는 상한에서 길이가 멈춤)
+_ingested = 0
+
+def feedback_version() -> int:
+    """Posts ingested since start (only grows; answer cache invalidation)"""
+    return _ingested
+
+_trends = None
+
+def complaint_trends() -> ComplaintTrends:
+    """Complaint keyword heavy hitters (built from FEEDBACK_DATA on first use)"""
+    global _trends
+    with _ingest_lock:
+        if _trends is None:
+            trends = ComplaintTrends()
+            trends.extend(FEEDBACK_DATA)
+            _trends = trends
+        return _trends
+
+_classifier = None
+
+def feedback_classifier() -> FeedbackClassifier:
+    """Urgency / sentiment classifier (upvote baseline starts from FEEDBACK_DATA)"""
+    global _classifier
+    if _classifier is None:
+        classifier = FeedbackClassifier()
+        # 손으로 붙인 urgency 는 그대로 두고 감성만 채운다
+        classifier.label(FEEDBACK_DATA)
+        _classifier = classifier
+    return _classifier
+
+def validate_feedback(item) -> dict:
+    """Checked copy of one incoming post (ValueError if malformed)"""
+    if not isinstance(item, dict):
+        raise ValueError("feedback must be an object")
+    complaint = item.get("complaint")
+    if not isinstance(complaint, str) or not complaint.strip():
+        raise ValueError("complaint must be a non-empty string")
+    race = race_key(item.get("race"))
+    if race == "all":
+        raise ValueError("race is required (Terran, Zerg or Protoss)")
+    if not isinstance(item.get("date"), str):
+        raise ValueError("date must be YYYY-MM-DD")
+    date_to_day(item["date"])
+    upvotes = item.get("upvotes", 0)
+    if isinstance(upvotes, bool) or not isinstance(upvotes, int) or upvotes < 0:
+        raise ValueError(f"upvotes must be a non-negative integer: {upvotes}")
+    post = {"race": race, "complaint": complaint.strip(), "upvotes": upvotes, "date": item["date"]}
+    if item.get("urgency") is not None:
+        if item["urgency"] not in ("high", "medium", "low"):
+            raise ValueError(f"urgency must be high, medium or low: {item['urgency']}")
+        post["urgency"] = item["urgency"]
+    return post
+
+def ingest_feedback(feedback: list, as_of=None) -> list:
+    """Ingest new forum posts ({"race", "complaint", "date", "upvotes"}, urgency optional)
+
+    Unlabeled posts get urgency and sentiment from one batch classification
+    (no LLM), so get_feedback(urgency=...) finds them right away. Called by
+    the CS agent's POST /feedback route.
+
+    Args:
+        feedback: New posts
+        as_of: Date their upvotes were counted (None: the day they were posted)
+    """
+    global _ingested
+    with _ingest_lock:
+        # 상한으로 오래된 글을 버리기 전에 누적 집계를 만들어 둔다 (버린 글도 계속 집계됨)
+        trends, rollup = complaint_trends(), feedback_rollup()
+        feedback_classifier().label(feedback, as_of)
+        FEEDBACK_DATA.extend(feedback)
+        if len(FEEDBACK_DATA) > MAX_FEEDBACK:
+            del FEEDBACK_DATA[:len(FEEDBACK_DATA) - MAX_FEEDBACK]
+        trends.extend(feedback)
+        rollup.extend(feedback)
+        _ingested += len(feedback)
+    return feedback
+
+_rollup = None
+_snapshots = {}
+
+def feedback_rollup() -> FeedbackRollup:
+    """Per-race, per-day complaint totals (built from the labeled FEEDBACK_DATA on first use)"""
+    global _rollup
+    with _ingest_lock:
+        if _rollup is None:
+            feedback_classifier()
+            rollup = FeedbackRollup()
+            rollup.extend(FEEDBACK_DATA)
+            _rollup = rollup
+        return _rollup
+
+def snapshot_feedback(since: str = None, until: str = None, k: int = TOP_KEYWORDS) -> dict:
+    """Complaint side of the coordinator's balance snapshot (no LLM)
 
-agent = Agent(
-    name="CS Feedback Agent",
-    description="게임 포럼에서 고객 피드백을 조회하는 에이전트",
-    model=BedrockModel(model_id="us.amazon.nova-lite-v1:0", temperature=0.3),
-    tools=[get_feedback],
-    system_prompt="""당신은 고객 지원 담당자입니다.
+    Args:
+        since: Start date YYYY-MM-DD (inclusive)
+        until: End date YYYY-MM-DD (inclusive)
+        k: Top complaint keywords per race
+
+    Raises:
+        ValueError: malformed date
+    """
+    lo = date_to_day(since) if since else None
+    hi = date_to_day(until) if until else None
+    rollup, trends = feedback_rollup(), complaint_trends()
+    # 새 피드백이 들어오기 전까지 같은 창은 다시 계산하지 않는다
+    key = (lo, hi, k, rollup.version, trends.ingested)
+    cached = _snapshots.get(key)
+    if cached is None:
+        if len(_snapshots) >= 64:
+            _snapshots.clear()
+        cached = _snapshots[key] = feedback_snapshot(rollup, trends, lo, hi, k)
+    return cached
+
+def record_feedback(feedback: dict):
+    """Ingest one new forum complaint"""
+    ingest_feedback([feedback])
+
+@tool
+def trending_complaints(race: str = None, window: str = "7d", k: int = 10) -> dict:
+    """Get the complaint keywords players mention most right now (no need to read every complaint)
+
+    Args:
+        race: Filter by race (Terran, Zerg, Protoss); omit for all races
+        window: Period ending at the newest feedback, e.g. "24h", "7d", "2w"
+        k: Number of keywords to return
+    """
+    try:
+        trends = complaint_trends().top(race, window, k)
+    except ValueError as e:
+        return tool_error(str(e))
+    if not trends["keywords"]:
+        return tool_error("No feedback in this window")
+    top = ", ".join(f"{t['keyword']}({t['count']})" for t in trends["keywords"][:5])
+    summary = f"{trends['from']}~{trends['to']} 피드백 {trends['complaints']}건, 상위 키워드: {top}"
+    return tool_result(summary, trends)
+
+SYSTEM_PROMPT = """당신은 고객 지원 담당자입니다.
 
 **응답 형식 (JSON):**
 {
@@ -56,6 +216,8 @@ agent = Agent(
 - get_feedback(): 모든 피드백 조회
 - get_feedback(race="Terran"): 특정 종족 피드백
 - get_feedback(urgency="high"): 긴급도별 피드백
+- 결과는 건수 요약과 피드백 목록(JSON)으로 옵니다. 답변에는 필요한 항목만 인용하세요
+- trending_complaints(race="Zerg", window="7d", k=10): 요즘 가장 많이 나오는 불만 키워드와 언급 횟수 ("요즘 무엇에 불만이 많은지" 같은 질문은 피드백 전체 대신 이것을 사용)
 
 **상태 결정:**
 - completed: 요청을 완료하고 결과를 제공한 경우
@@ -63,13 +225,43 @@ agent = Agent(
 - error: 오류 발생 시
 
 **중요: 모든 응답은 한글로 작성하세요.**"""
-)
+
+def create_agent(messages=None) -> Agent:
+    """New CS feedback agent for one conversation (see session_manager)"""
+    return Agent(
+        name="CS Feedback Agent",
+        description="게임 포럼에서 고객 피드백을 조회하는 에이전트",
+        tools=[get_feedback, trending_complaints],
+        model=bedrock_model(),
+        system_prompt=SYSTEM_PROMPT,
+        messages=messages,
+        conversation_manager=conversation_manager(),
+    )
+
+# A2A context(대화)마다 별도 에이전트: 메시지 상태가 섞이지 않고 크기가 제한된다
+sessions = AgentSessions(create_agent, "cs_feedback")
+
+# 표현만 다른 반복 질문은 LLM 실행 없이 답한다 (새 피드백이 들어오면 비움)
+answer_cache = SemanticCache(version=feedback_version)
 
 class CSFeedbackExecutor(AgentExecutor):
-    async def cancel(self, task_id: str) -> None:
-        logger.info(f"Cancelling task {task_id}")
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        await cancel_execution(context, event_queue)
     
     async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        # 과부하 시 대기열이 넘치면 즉시 rejected 로 종료
+        # cancel()이 task ID로 찾아 Strands cancel_signal 과 하위 작업 취소를 건다
+        # 느린 소비자: 청크는 합치고 진행 상황은 최신 것만 남기며, 그래도 차면 기다린다
+        async with BoundedEventQueue(event_queue) as event_queue:
+            with cancellations.scope(context.task_id):
+                await mark_working(context, event_queue)
+                try:
+                    async with admission.slot(message_priority(context.message), estimate_tokens(context.get_user_input())):
+                        await self._execute(context, event_queue)
+                except Overloaded as e:
+                    await reject_task(context, event_queue, e)
+
+    async def _execute(self, context: RequestContext, event_queue: EventQueue) -> None:
         try:
             # Message에서 텍스트 추출
             input_text = ""
@@ -80,78 +272,41 @@ class CSFeedbackExecutor(AgentExecutor):
             
             logger.info(f"Executing task {context.task_id}: '{input_text}'")
             
-            # 대화 히스토리 구성
-            conversation_history = []
-            if context.current_task and hasattr(context.current_task, 'artifacts'):
-                for artifact in context.current_task.artifacts:
-                    if hasattr(artifact, 'parts'):
-                        for part in artifact.parts:
-                            if hasattr(part, 'text'):
-                                conversation_history.append(part.text)
-            
-            # 전체 컨텍스트 구성
-            if conversation_history:
-                full_input = f"이전 대화:\n" + "\n".join(conversation_history) + f"\n\n현재 질문: {input_text}"
-            else:
-                full_input = input_text
-            
-            logger.info(f"Full context: {full_input}")
-            
-            # Agent 스트리밍 실행
-            full_response = ""
-            thinking_buffer = ""
-            
-            async for event in agent.stream_async(full_input):
-                if isinstance(event, dict):
-                    event_type = event.get('type')
-                    
-                    # Thinking 이벤트 - 실시간 전송
-                    if event_type == 'thinking':
-                        thinking_text = event.get('content', '')
-                        thinking_buffer += thinking_text
-                        # Thinking artifact 전송
-                        await event_queue.enqueue_event(TaskArtifactUpdateEvent(
-                            taskId=context.task_id,
-                            contextId=context.context_id,
-                            artifact=Artifact(
-                                artifactId=str(uuid.uuid4()),
-                                parts=[TextPart(text=f"🧠 {thinking_buffer}")]
-                            )
-                        ))
-                    
-                    # 텍스트 델타
-                    elif event_type == 'text_delta':
-                        full_response += event.get('content', '')
-                    
-                    # 최종 메시지
-                    elif event_type == 'message':
-                        full_response = event.get('content', '')
-            
-            # 최종 응답 확인
-            if not full_response:
-                result = await agent.invoke_async(full_input)
-                full_response = result.output if hasattr(result, 'output') else str(result)
+            # Agent 스트리밍 실행: 응답 봉투({status, message})가 닫히면 생성을 멈춘다
+            cancellation = current_cancellation()
+            # 같은 context 의 이전 턴은 세션 에이전트가 기억하므로 artifact 히스토리를 다시 붙이지 않는다
+            async with sessions.session(context.context_id) as agent:
+                # 대화 첫 턴은 의미가 같은 이전 질문의 답을 재사용 (후속 턴은 앞선 대화에 따라 답이 달라진다)
+                first_turn = not agent.messages
+                cached = answer_cache.lookup(input_text) if first_turn else None
+                if cached:
+                    logger.info(f"Semantic cache hit ({cached['similarity']:.2f}): '{cached['query']}'")
+                    status, message, tool_data = "completed", cached["answer"], cached["data"]
+                    record_turn(agent, input_text, message)
+                else:
+                    # 이번 실행에서 추가된 메시지의 도구 결과만 artifact 에 싣는다
+                    known = {id(message) for message in agent.messages}
+                    # 도구 호출이 시작될 때마다 working 상태로 진행 상황을 알린다 (스트리밍 클라이언트용)
+                    parser = await run_agent_envelope(
+                        agent, input_text, cancellation,
+                        on_tool=lambda name: mark_working(context, event_queue, f"🔧 {name} 실행 중"),
+                    )
+                    tool_data = collect_tool_data(messages_since(agent, known))
+                    logger.info(f"Agent response: {parser.buffer}")
+                    status, message = parser.finish()
             
-            logger.info(f"Agent response: {full_response}")
-            response = full_response
+            # 취소된 태스크는 cancel()이 이미 canceled 로 종료했다
+            if cancellation.cancelled:
+                logger.info(f"Task {context.task_id} cancelled")
+                return
             
-            # JSON 파싱 시도
-            try:
-                # <thinking> 태그 제거
-                clean_response = re.sub(r'<thinking>.*?</thinking>', '', response, flags=re.DOTALL).strip()
-                response_data = json.loads(clean_response)
-                status = response_data.get('status', 'completed')
-                message = response_data.get('message', response)
-            except Exception as parse_error:
-                # JSON 파싱 실패 시 기본값
-                logger.warning(f"JSON parsing failed: {parse_error}, using defaults")
-                status = 'completed'
-                message = response
+            if first_turn and not cached and status == 'completed':
+                answer_cache.store(input_text, message, tool_data)
             
-            # Artifact 생성
+            # Artifact 생성: 텍스트 답변 + 도구 결과 DataPart
             artifact = Artifact(
                 artifactId=str(uuid.uuid4()),
-                parts=[TextPart(text=message)]
+                parts=artifact_parts(message, tool_data)
             )
             
             # Artifact 먼저 전송
@@ -1,21 +1,29 @@
 #!/usr/bin/env python3
-import pandas as pd
-import uvicorn
+# --profile-startup: 이후 import 시간을 재려면 가장 먼저 시작한다
+import startup
+startup.begin()
 import logging
-from starlette.applications import Starlette
-from starlette.responses import StreamingResponse
+import os
 from starlette.routing import Route
-from pydantic import BaseModel
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import AgentCard, AgentSkill, AgentCapabilities
-from data_analysis_agent_executor import DataAnalysisExecutor, agent
-import json
+from data_analysis_agent_executor import DataAnalysisExecutor, sessions, start_drift_watcher
+from sqlite_task_store import create_task_store
+from worker_pool import WORKER_PORT_ENV, serve
+from response_envelope import split_thinking
+from admission import Overloaded, admission_for, admitted_stream, estimate_tokens, overloaded_response, request_priority
+from serialization import SSE_DONE, loads, sse_event, sse_response
+import threading
+
+startup.phase("imports")
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 이 에이전트의 동시 실행·대기열·요청률 한도 (다른 에이전트와 공유하지 않는다)
+admission = admission_for("data")
+
 # Agent Card
 agent_card = AgentCard(
     name="Data Analysis Agent",
@@ -42,39 +50,47 @@ agent_card = AgentCard(
 
 # Custom streaming endpoint
 async def ask_stream(request):
-    body = await request.json()
+    body = loads(await request.body())
     query = body.get('query', '')
+    # GUI 세션 ID별로 대화를 이어간다 (없으면 일회용 에이전트)
+    session_id = body.get('session_id')
     
     async def generate():
+        # 클라이언트가 연결을 끊으면 제너레이터가 닫히면서 LLM 호출도 중단
+        cancel_signal = threading.Event()
         try:
             # Use invoke_async to get full response
-            result = await agent.invoke_async(query)
+            async with sessions.session(session_id) as agent:
+                result = await agent.invoke_async(query, cancel_signal=cancel_signal)
             full_response = result.output if hasattr(result, 'output') else str(result)
             
-            # Extract and send thinking
-            import re
-            thinking_matches = re.findall(r'<thinking>(.*?)</thinking>', full_response, re.DOTALL)
-            for thinking in thinking_matches:
-                yield f"data: {json.dumps({'type': 'thinking', 'content': thinking.strip()})}\n\n"
-            
-            # Send answer (remove thinking and response tags)
-            clean_response = re.sub(r'<thinking>.*?</thinking>', '', full_response, flags=re.DOTALL)
-            clean_response = re.sub(r'<response>|</response>', '', clean_response, flags=re.DOTALL).strip()
+            # Extract and send thinking, then the answer without thinking/response tags
+            thinking_blocks, clean_response = split_thinking(full_response)
+            for thinking in thinking_blocks:
+                yield sse_event('thinking', content=thinking)
             
             if clean_response:
-                yield f"data: {json.dumps({'type': 'answer', 'content': clean_response})}\n\n"
+                yield sse_event('answer', content=clean_response)
             
-            yield f"data: {json.dumps({'type': 'done'})}\n\n"
+            yield SSE_DONE
         except Exception as e:
             logger.error(f"Streaming error: {e}", exc_info=True)
-            yield f"data: {json.dumps({'type': 'error', 'content': str(e)})}\n\n"
+            yield sse_event('error', content=str(e))
+        finally:
+            cancel_signal.set()
     
-    return StreamingResponse(generate(), media_type="text/event-stream")
+    # 대기열이 가득 차면 스트림을 열기 전에 429
+    priority = request_priority(request, body)
+    try:
+        admission.check(priority)
+    except Overloaded as e:
+        return overloaded_response(e)
+    return sse_response(request, admitted_stream(admission, generate(), priority, estimate_tokens(query)))
 
 # A2A Server
 request_handler = DefaultRequestHandler(
     agent_executor=DataAnalysisExecutor(),
-    task_store=InMemoryTaskStore()
+    task_store=create_task_store()
 )
 
 a2a_server = A2AStarletteApplication(
@@ -87,7 +103,14 @@ app = a2a_server.build()
 
 # Add custom route
 app.routes.append(Route('/ask_stream', ask_stream, methods=['POST']))
+startup.phase("app build")
 
 if __name__ == "__main__":
+    if startup.profiling():
+        print(startup.report("Data Analysis Agent"))
+        raise SystemExit
     logger.info("Starting Data Analysis Agent on port 9003...")
-    uvicorn.run(app, host="0.0.0.0", port=9003)
+    # 워커 여러 개로 띄울 때는 프록시 프로세스 한 곳에서만 감시한다
+    if not os.environ.get(WORKER_PORT_ENV):
+        start_drift_watcher()
+    serve(app, host="0.0.0.0", port=9003, name="Data Analysis Agent")
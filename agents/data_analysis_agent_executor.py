@@ -1,56 +1,308 @@
-import pandas as pd
 import logging
+import threading
 import uuid
-from typing import Literal
-from pydantic import BaseModel
+import numpy as np
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
 from a2a.types import TaskState, TaskStatus, Artifact, TaskStatusUpdateEvent, TaskArtifactUpdateEvent, TextPart
 from strands import Agent, tool
-from strands.models.bedrock import BedrockModel
+from session_manager import AgentSessions, bedrock_model, conversation_manager, messages_since, record_turn
+from semantic_cache import SemanticCache
+from match_store import BRACKETS, RACES, day_to_date, race_code
+from game_log_engine import GameLogEngine, open_default_engine
+from win_rate_stats import win_rate_summary, bootstrap_mean_interval, format_interval_line
+from rating_engine import RatingEngine, to_elo, win_probability
+from cancellation import cancel_execution, cancellations, current_cancellation, mark_working
+from event_buffer import BoundedEventQueue
+from response_envelope import run_agent_envelope
+from structured_output import artifact_parts, collect_tool_data, tool_error, tool_result
+from admission import Overloaded, admission_for, estimate_tokens, message_priority, reject_task
+from drift_detector import DriftMonitor, DriftWatcher, WebhookPublisher
 
 logger = logging.getLogger(__name__)
 
-GAME_DATA = [
-    {"game_id": 1, "race": "Terran", "result": "win", "duration": 15},
-    {"game_id": 2, "race": "Zerg", "result": "loss", "duration": 20},
-    {"game_id": 3, "race": "Protoss", "result": "win", "duration": 18},
-    {"game_id": 4, "race": "Terran", "result": "win", "duration": 12},
-    {"game_id": 5, "race": "Zerg", "result": "win", "duration": 25},
-    {"game_id": 6, "race": "Protoss", "result": "loss", "duration": 19},
-]
+# 이 에이전트의 동시 실행·대기열·요청률 한도 (다른 에이전트와 공유하지 않는다)
+admission = admission_for("data")
+
+_engine = None
+_rating_engine = None
+# 도구 호출과 드리프트 감시 스레드가 동시에 sync 하지 않도록
+_engine_lock = threading.Lock()
+drift_monitor = DriftMonitor()
+
+def get_engine() -> GameLogEngine:
+    """Game log engine (첫 사용 시 game_logs.json → 매치 스토어 변환, 이후 새 행만 반영)"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = open_default_engine()
+        else:
+            _engine.sync()
+        return _engine
+
+def check_drift() -> list:
+    """Run the win-rate drift detectors over matches ingested since the last check"""
+    return drift_monitor.catch_up(get_engine().store)
+
+def start_drift_watcher(interval: float = None) -> DriftWatcher:
+    """Poll the match store in the background and POST drift alerts to the coordinator"""
+    return DriftWatcher(check_drift, WebhookPublisher(), interval).start()
+
+def data_version():
+    """Rows folded into the engine + known patches (semantic cache invalidation)"""
+    engine = get_engine()
+    return engine.rows_indexed, len(engine.patches)
+
+def get_rating_engine() -> RatingEngine:
+    """Bradley-Terry rating engine (이전 적합 결과로 warm start)"""
+    global _rating_engine
+    engine = get_engine()
+    if _rating_engine is None:
+        _rating_engine = RatingEngine(engine)
+    return _rating_engine
+
+def _window(engine: GameLogEngine, lo, hi) -> dict:
+    return {
+        "since": day_to_date(lo) if lo is not None else None,
+        "until": day_to_date(hi) if hi is not None else None,
+        "label": engine.describe_window(lo, hi),
+    }
 
 @tool
-def analyze_win_rates(race: str) -> str:
-    """종족별 승률 분석"""
-    df = pd.DataFrame(GAME_DATA)
-    race_data = df[df['race'] == race]
-    if len(race_data) == 0:
-        return f"{race} 데이터 없음"
-    wins = len(race_data[race_data['result'] == 'win'])
-    total = len(race_data)
+def analyze_win_rates(race: str, since: str = None, until: str = None, patch: str = None, last_days: int = None,
+                      interval_method: str = "wilson") -> dict:
+    """종족별 승률 분석 (95% 신뢰구간, 50% 대비 p-value 포함)
+
+    Args:
+        race: Race name (Terran, Zerg, Protoss)
+        since: Start date YYYY-MM-DD (inclusive)
+        until: End date YYYY-MM-DD (inclusive)
+        patch: Patch version (e.g. 1.0.1) - only matches played on that patch
+        last_days: Only the most recent N days of data
+        interval_method: Confidence interval method (wilson, clopper-pearson)
+    """
+    code = race_code(race)
+    engine = get_engine()
+    if code is None:
+        return tool_error(f"{race} 데이터 없음")
+    try:
+        lo, hi = engine.resolve_window(since, until, patch, last_days)
+    except ValueError as e:
+        return tool_error(str(e))
+    totals = engine.race_totals(lo, hi)
+    wins = int(totals["wins"][code])
+    total = int(totals["games"][code])
+    if total == 0:
+        return tool_error(f"{race} 데이터 없음 ({engine.describe_window(lo, hi)})")
+    try:
+        # 전 종족을 한 번에 계산
+        stats = win_rate_summary(totals["wins"], totals["games"], interval_method)
+    except ValueError as e:
+        return tool_error(str(e))
     win_rate = (wins / total) * 100
-    return f"{race} 승률: {win_rate:.1f}% ({wins}/{total})"
+    significance = format_interval_line(
+        stats["low"][code], stats["high"][code], stats["p_value"][code], stats["significant"][code]
+    )
+    return tool_result(
+        f"{race} 승률: {win_rate:.1f}% ({wins}/{total}), {significance} [{engine.describe_window(lo, hi)}]",
+        {
+            "race": RACES[code],
+            "window": _window(engine, lo, hi),
+            "wins": wins,
+            "games": total,
+            "win_rate": wins / total,
+            "ci_low": stats["low"][code],
+            "ci_high": stats["high"][code],
+            "p_value": stats["p_value"][code],
+            "significant": stats["significant"][code],
+            "interval_method": interval_method,
+        },
+    )
+
+@tool
+def analyze_game_duration(race: str, since: str = None, until: str = None, patch: str = None, last_days: int = None,
+                          bootstrap: bool = False) -> dict:
+    """종족별 평균 게임 시간
+
+    Args:
+        race: Race name (Terran, Zerg, Protoss)
+        since: Start date YYYY-MM-DD (inclusive)
+        until: End date YYYY-MM-DD (inclusive)
+        patch: Patch version (e.g. 1.0.1) - only matches played on that patch
+        last_days: Only the most recent N days of data
+        bootstrap: Add a 95% bootstrap confidence interval for the mean
+    """
+    code = race_code(race)
+    engine = get_engine()
+    if code is None:
+        return tool_error(f"{race} 데이터 없음")
+    try:
+        lo, hi = engine.resolve_window(since, until, patch, last_days)
+    except ValueError as e:
+        return tool_error(str(e))
+    totals = engine.race_totals(lo, hi)
+    games = int(totals["games"][code])
+    if games == 0:
+        return tool_error(f"{race} 데이터 없음 ({engine.describe_window(lo, hi)})")
+    avg_duration = totals["duration_sum"][code] / games / 60
+    interval_text = ""
+    interval = None
+    if bootstrap:
+        rows = engine.rows(lo, hi)
+        winner, loser = engine.store.winner[rows], engine.store.loser[rows]
+        duration = engine.store.duration[rows]
+        # 롤업과 같은 기준: 미러전은 양쪽 모두로 집계
+        samples = np.concatenate([duration[winner == code], duration[loser == code]])
+        low, high = bootstrap_mean_interval(samples)
+        interval = [low / 60, high / 60]
+        interval_text = f", 95% CI {low / 60:.1f}~{high / 60:.1f}분 (bootstrap)"
+    return tool_result(
+        f"{race} 평균 게임 시간: {avg_duration:.1f}분{interval_text} [{engine.describe_window(lo, hi)}]",
+        {
+            "race": RACES[code],
+            "window": _window(engine, lo, hi),
+            "games": games,
+            "mean_minutes": avg_duration,
+            "ci_minutes": interval,
+        },
+    )
+
+@tool
+def analyze_matchup(race: str, opponent: str = None, since: str = None, until: str = None, patch: str = None, last_days: int = None,
+                    interval_method: str = "wilson") -> dict:
+    """종족 상성(매치업) 분석 (95% 신뢰구간, 50% 대비 p-value 포함)
+
+    Args:
+        race: Race name (Terran, Zerg, Protoss)
+        opponent: Opponent race; omit to list every matchup of race
+        since: Start date YYYY-MM-DD (inclusive)
+        until: End date YYYY-MM-DD (inclusive)
+        patch: Patch version (e.g. 1.0.1) - only matches played on that patch
+        last_days: Only the most recent N days of data
+        interval_method: Confidence interval method (wilson, clopper-pearson)
+    """
+    code = race_code(race)
+    engine = get_engine()
+    if code is None:
+        return tool_error(f"{race} 데이터 없음")
+    opponents = [race_code(opponent)] if opponent else [c for c in range(len(RACES)) if c != code]
+    if None in opponents:
+        return tool_error(f"{opponent} 데이터 없음")
+    try:
+        lo, hi = engine.resolve_window(since, until, patch, last_days)
+    except ValueError as e:
+        return tool_error(str(e))
+    counts, durations = engine.matchup_table(lo, hi)
+    try:
+        # 매치업 행렬 전체를 한 번에 계산: [i, j] = i가 j 상대로 거둔 승
+        stats = win_rate_summary(counts, counts + counts.T, interval_method)
+    except ValueError as e:
+        return tool_error(str(e))
+    matchups = []
+    highlights = []
+    for opp in opponents:
+        wins, losses = int(counts[code, opp]), int(counts[opp, code])
+        games = wins + losses
+        entry = {"opponent": RACES[opp], "wins": wins, "losses": losses, "games": games}
+        if games:
+            entry.update({
+                "win_rate": wins / games,
+                "ci_low": stats["low"][code, opp],
+                "ci_high": stats["high"][code, opp],
+                "p_value": stats["p_value"][code, opp],
+                "significant": stats["significant"][code, opp],
+                "mean_minutes": (durations[code, opp] + durations[opp, code]) / games / 60,
+            })
+            mark = "" if stats["significant"][code, opp] else " (유의하지 않음)"
+            highlights.append(f"vs {RACES[opp]} {wins / games * 100:.1f}%{mark}")
+        else:
+            highlights.append(f"vs {RACES[opp]} 데이터 없음")
+        matchups.append(entry)
+    return tool_result(
+        f"{RACES[code]} 매치업: {', '.join(highlights)} [{engine.describe_window(lo, hi)}]",
+        {"race": RACES[code], "window": _window(engine, lo, hi), "interval_method": interval_method, "matchups": matchups},
+    )
 
 @tool
-def analyze_game_duration(race: str) -> str:
-    """종족별 평균 게임 시간"""
-    df = pd.DataFrame(GAME_DATA)
-    race_data = df[df['race'] == race]
-    if len(race_data) == 0:
-        return f"{race} 데이터 없음"
-    avg_duration = race_data['duration'].mean()
-    return f"{race} 평균 게임 시간: {avg_duration:.1f}분"
-
-agent = Agent(
-    name="Data Analysis Agent",
-    model=BedrockModel(model_id="us.amazon.nova-lite-v1:0", temperature=0.3),
-    tools=[analyze_win_rates, analyze_game_duration],
-    system_prompt="""당신은 데이터 분석가입니다.
+def analyze_race_strength(by_bracket: bool = False, since: str = None, until: str = None, patch: str = None,
+                          last_days: int = None) -> dict:
+    """종족 전투력 레이팅 (Bradley-Terry, 상대 종족 구성 보정)
+
+    Args:
+        by_bracket: Rate each race separately per MMR bracket (full history only;
+            cannot be combined with since/until/patch/last_days)
+        since: Start date YYYY-MM-DD (inclusive)
+        until: End date YYYY-MM-DD (inclusive)
+        patch: Patch version (e.g. 1.0.1) - only matches played on that patch
+        last_days: Only the most recent N days of data
+    """
+    ratings = get_rating_engine()
+    if by_bracket:
+        # 구간별 레이팅은 전체 기간 누적 행렬로만 계산한다: 기간 조건을 조용히 무시하지 않는다
+        if any(value is not None for value in (since, until, patch, last_days)):
+            return tool_error("by_bracket 은 전체 기간만 지원합니다 (since/until/patch/last_days 와 함께 쓸 수 없음)")
+        result = ratings.bracket_ratings()
+        elo = to_elo(result["strengths"])
+        brackets = []
+        for b, bracket in enumerate(BRACKETS):
+            games = result["games"][:, b]
+            if games.sum() == 0:
+                continue
+            brackets.append({
+                "bracket": bracket,
+                "ratings": [{"race": race, "elo": elo[r, b], "games": games[r]} for r, race in enumerate(RACES)],
+            })
+        if not brackets:
+            return tool_error("MMR 구간 데이터 없음")
+        return tool_result(
+            f"종족 x MMR 구간 레이팅 (Bradley-Terry, 전체 기간): {len(brackets)}개 구간",
+            {"window": {"since": None, "until": None, "label": "전체 기간"}, "brackets": brackets},
+        )
+
+    engine = get_engine()
+    try:
+        lo, hi = engine.resolve_window(since, until, patch, last_days)
+    except ValueError as e:
+        return tool_error(str(e))
+    result = ratings.race_ratings(lo, hi)
+    if result["games"].sum() == 0:
+        return tool_error(f"데이터 없음 ({engine.describe_window(lo, hi)})")
+    elo = to_elo(result["strengths"])
+    expected = win_probability(result["strengths"])
+    order = np.argsort(-elo)
+    return tool_result(
+        "종족 레이팅 (Bradley-Terry): " + " > ".join(f"{RACES[r]} {elo[r]:.0f}" for r in order)
+        + f" [{engine.describe_window(lo, hi)}]",
+        {
+            "window": _window(engine, lo, hi),
+            "ratings": [
+                {"race": RACES[r], "elo": elo[r], "strength": result["strengths"][r], "games": result["games"][r]}
+                for r in order
+            ],
+            "expected_win_rate": {
+                f"{RACES[i]} vs {RACES[j]}": expected[i, j]
+                for i in range(len(RACES)) for j in range(i + 1, len(RACES))
+            },
+        },
+    )
+
+SYSTEM_PROMPT = """당신은 데이터 분석가입니다.
 
 도구:
 - analyze_win_rates: 종족별 승률 분석
 - analyze_game_duration: 평균 게임 시간 분석
+- analyze_matchup: 종족 간 상성(매치업) 분석
+- analyze_race_strength: 상대 구성까지 보정한 종족 전투력 레이팅 (Bradley-Terry). "어느 종족이 가장 강한가" 같은 종합 판단에는 이 도구 하나를 우선 사용하세요
+- 모든 도구는 한 줄 요약과 수치 JSON(승률, 신뢰구간, p-value, 경기 수 등)을 함께 반환합니다. 답변에는 필요한 수치만 인용하세요
+
+**기간 필터 (모든 도구 공통, 선택):**
+- since / until: 날짜 범위 (YYYY-MM-DD)
+- patch: 특정 패치 버전 기간만 (예: "1.0.1")
+- last_days: 최근 N일 (예: "최근 7일" → last_days=7)
+
+**통계적 유의성:**
+- 승률 결과에는 95% 신뢰구간과 50% 대비 p-value가 포함됩니다
+- "유의하지 않음"이거나 신뢰구간이 50%를 포함하면 표본이 부족한 것이므로 불균형이라고 단정하지 마세요
 
 **중요: 도구 호출 시 종족명은 반드시 영어로 사용하세요:**
 - 테란 → Terran
@@ -72,13 +324,42 @@ agent = Agent(
 **중요: 사용자가 "승률"이라고만 물어보면 어떤 종족인지 반드시 되물으세요.**
 
 모든 응답은 한글로 작성하세요."""
-)
+
+def create_agent(messages=None) -> Agent:
+    """New data analysis agent for one conversation (see session_manager)"""
+    return Agent(
+        name="Data Analysis Agent",
+        tools=[analyze_win_rates, analyze_game_duration, analyze_matchup, analyze_race_strength],
+        model=bedrock_model(),
+        system_prompt=SYSTEM_PROMPT,
+        messages=messages,
+        conversation_manager=conversation_manager(),
+    )
+
+# A2A context(대화)마다 별도 에이전트: 메시지 상태가 섞이지 않고 크기가 제한된다
+sessions = AgentSessions(create_agent, "data_analysis")
+
+# 표현만 다른 반복 질문은 LLM 실행 없이 답한다 (새 경기 로그가 반영되면 비움)
+answer_cache = SemanticCache(version=data_version)
 
 class DataAnalysisExecutor(AgentExecutor):
-    async def cancel(self, task_id: str) -> None:
-        logger.info(f"Cancelling task {task_id}")
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        await cancel_execution(context, event_queue)
     
     async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        # 과부하 시 대기열이 넘치면 즉시 rejected 로 종료
+        # cancel()이 task ID로 찾아 Strands cancel_signal 과 하위 작업 취소를 건다
+        # 느린 소비자: 청크는 합치고 진행 상황은 최신 것만 남기며, 그래도 차면 기다린다
+        async with BoundedEventQueue(event_queue) as event_queue:
+            with cancellations.scope(context.task_id):
+                await mark_working(context, event_queue)
+                try:
+                    async with admission.slot(message_priority(context.message), estimate_tokens(context.get_user_input())):
+                        await self._execute(context, event_queue)
+                except Overloaded as e:
+                    await reject_task(context, event_queue, e)
+
+    async def _execute(self, context: RequestContext, event_queue: EventQueue) -> None:
         try:
             # Message에서 텍스트 추출
             input_text = ""
@@ -89,81 +370,41 @@ class DataAnalysisExecutor(AgentExecutor):
             
             logger.info(f"Executing task {context.task_id}: '{input_text}'")
             
-            # 대화 히스토리 구성
-            conversation_history = []
-            if context.current_task and hasattr(context.current_task, 'artifacts'):
-                # 이전 artifacts에서 대화 히스토리 추출
-                for artifact in context.current_task.artifacts:
-                    if hasattr(artifact, 'parts'):
-                        for part in artifact.parts:
-                            if hasattr(part, 'text'):
-                                conversation_history.append(part.text)
-            
-            # 전체 컨텍스트 구성
-            if conversation_history:
-                full_input = f"이전 대화:\n" + "\n".join(conversation_history) + f"\n\n현재 질문: {input_text}"
-            else:
-                full_input = input_text
-            
-            logger.info(f"Full context: {full_input}")
-            
-            # Agent 스트리밍 실행
-            full_response = ""
-            thinking_buffer = ""
-            
-            async for event in agent.stream_async(full_input):
-                if isinstance(event, dict):
-                    event_type = event.get('type')
-                    
-                    # Thinking 이벤트 - 실시간 전송
-                    if event_type == 'thinking':
-                        thinking_text = event.get('content', '')
-                        thinking_buffer += thinking_text
-                        # Thinking artifact 전송
-                        await event_queue.enqueue_event(TaskArtifactUpdateEvent(
-                            taskId=context.task_id,
-                            contextId=context.context_id,
-                            artifact=Artifact(
-                                artifactId=str(uuid.uuid4()),
-                                parts=[TextPart(text=f"🧠 {thinking_buffer}")]
-                            )
-                        ))
-                    
-                    # 텍스트 델타
-                    elif event_type == 'text_delta':
-                        full_response += event.get('content', '')
-                    
-                    # 최종 메시지
-                    elif event_type == 'message':
-                        full_response = event.get('content', '')
-            
-            # 최종 응답 확인
-            if not full_response:
-                result = await agent.invoke_async(full_input)
-                full_response = result.output if hasattr(result, 'output') else str(result)
+            # Agent 스트리밍 실행: 응답 봉투({status, message})가 닫히면 생성을 멈춘다
+            cancellation = current_cancellation()
+            # 같은 context 의 이전 턴은 세션 에이전트가 기억하므로 artifact 히스토리를 다시 붙이지 않는다
+            async with sessions.session(context.context_id) as agent:
+                # 대화 첫 턴은 의미가 같은 이전 질문의 답을 재사용 (후속 턴은 앞선 대화에 따라 답이 달라진다)
+                first_turn = not agent.messages
+                cached = answer_cache.lookup(input_text) if first_turn else None
+                if cached:
+                    logger.info(f"Semantic cache hit ({cached['similarity']:.2f}): '{cached['query']}'")
+                    status, message, tool_data = "completed", cached["answer"], cached["data"]
+                    record_turn(agent, input_text, message)
+                else:
+                    # 이번 실행에서 추가된 메시지의 도구 결과만 artifact 에 싣는다
+                    known = {id(message) for message in agent.messages}
+                    # 도구 호출이 시작될 때마다 working 상태로 진행 상황을 알린다 (스트리밍 클라이언트용)
+                    parser = await run_agent_envelope(
+                        agent, input_text, cancellation,
+                        on_tool=lambda name: mark_working(context, event_queue, f"🔧 {name} 실행 중"),
+                    )
+                    tool_data = collect_tool_data(messages_since(agent, known))
+                    logger.info(f"Agent response: {parser.buffer}")
+                    status, message = parser.finish()
             
-            logger.info(f"Agent response: {full_response}")
-            response = full_response
+            # 취소된 태스크는 cancel()이 이미 canceled 로 종료했다
+            if cancellation.cancelled:
+                logger.info(f"Task {context.task_id} cancelled")
+                return
             
-            # JSON 파싱 시도
-            try:
-                import json
-                import re
-                # <thinking> 태그 제거
-                clean_response = re.sub(r'<thinking>.*?</thinking>', '', response, flags=re.DOTALL).strip()
-                response_data = json.loads(clean_response)
-                status = response_data.get('status', 'completed')
-                message = response_data.get('message', response)
-            except Exception as parse_error:
-                # JSON 파싱 실패 시 기본값
-                logger.warning(f"JSON parsing failed: {parse_error}, using defaults")
-                status = 'completed'
-                message = response
+            if first_turn and not cached and status == 'completed':
+                answer_cache.store(input_text, message, tool_data)
             
-            # Artifact 생성
+            # Artifact 생성: 텍스트 답변 + 도구 결과 DataPart
             artifact = Artifact(
                 artifactId=str(uuid.uuid4()),
-                parts=[TextPart(text=message)]
+                parts=artifact_parts(message, tool_data)
             )
             
             # Artifact 먼저 전송
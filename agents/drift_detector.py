@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Online win-rate drift detection.
+
+Imbalances used to surface only when someone asked. The data analysis agent
+now runs one change detector per race and per matchup over the match stream
+as rows are appended to the match store:
+
+- an EWMA of the win indicator (current win rate estimate)
+- a two-sided CUSUM against the 50% balance target with slack ``k``: it
+  accumulates ``|win - 0.5| - k`` and raises an alert past threshold ``h``
+
+Every match costs a constant number of float updates (two races + one
+matchup), whatever the history length. An alert is raised once when a
+stream drifts up or down and cleared when a reverse CUSUM (same ``k`` and
+``h``) shows it back at 50%. When the monitor first attaches it replays only the most recent
+``warmup`` matches silently and then reports the streams already in alarm.
+
+Alerts are POSTed to the Game Balance Agent's ``/alerts`` webhook
+(``DRIFT_WEBHOOK_URL``), which pre-computes an analysis before anyone asks.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from match_store import RACES, day_to_date
+
+logger = logging.getLogger(__name__)
+
+LAMBDA_ENV = "DRIFT_EWMA_LAMBDA"
+SLACK_ENV = "DRIFT_CUSUM_SLACK"
+THRESHOLD_ENV = "DRIFT_CUSUM_THRESHOLD"
+MIN_MATCHES_ENV = "DRIFT_MIN_MATCHES"
+WARMUP_ENV = "DRIFT_WARMUP"
+WEBHOOK_ENV = "DRIFT_WEBHOOK_URL"
+INTERVAL_ENV = "DRIFT_POLL_SECONDS"
+DEFAULT_WEBHOOK = "http://localhost:9001/alerts"
+TARGET = 0.5
+UP, DOWN, CLEARED = "up", "down", "cleared"
+
+
+class EwmaCusum:
+    """EWMA + two-sided CUSUM on one win-indicator stream (O(1) per update)"""
+
+    __slots__ = ("lam", "slack", "threshold", "min_matches", "matches", "ewma", "high", "low", "back", "alarm")
+
+    def __init__(self, lam: float = 0.01, slack: float = 0.025, threshold: float = 50.0, min_matches: int = 200):
+        """
+        Args:
+            lam: EWMA weight of the newest match
+            slack: Allowed deviation from 50% (CUSUM reference k)
+            threshold: CUSUM decision interval h (larger: fewer false alarms, slower detection)
+            min_matches: Matches seen before any alert
+        """
+        self.lam, self.slack, self.threshold, self.min_matches = lam, slack, threshold, min_matches
+        self.matches = 0
+        self.ewma = TARGET
+        self.high = 0.0
+        self.low = 0.0
+        self.back = 0.0
+        self.alarm = None
+
+    def update(self, won: int):
+        """Fold one match in -> 'up' / 'down' / 'cleared' when the alarm state changes, else None"""
+        self.matches += 1
+        self.ewma += self.lam * (won - self.ewma)
+        x = won - TARGET
+        self.high = max(0.0, self.high + x - self.slack)
+        self.low = max(0.0, self.low - x - self.slack)
+        if self.matches < self.min_matches:
+            return None
+        # 임계값을 넘으면 누적합을 비우고, 이미 같은 방향으로 알렸으면 다시 알리지 않는다
+        if self.high > self.threshold:
+            self.high = self.low = self.back = 0.0
+            if self.alarm != UP:
+                self.alarm = UP
+                return UP
+        elif self.low > self.threshold:
+            self.high = self.low = self.back = 0.0
+            if self.alarm != DOWN:
+                self.alarm = DOWN
+                return DOWN
+        elif self.alarm:
+            # 경보 중에는 50% 로 돌아왔는지를 반대 방향 CUSUM 으로 본다 (EWMA 는 흔들려서 쓰지 않음)
+            self.back = max(0.0, self.back + (self.slack - x if self.alarm == UP else x + self.slack))
+            if self.back > self.threshold:
+                self.high = self.low = self.back = 0.0
+                self.alarm = None
+                return CLEARED
+        return None
+
+
+def stream_names() -> list:
+    """Races plus every matchup ('Terran vs Zerg': the first race's win rate)"""
+    pairs = [f"{a} vs {b}" for i, a in enumerate(RACES) for b in RACES[i + 1:]]
+    return list(RACES) + pairs
+
+
+class DriftMonitor:
+    """Drift detectors for every race and matchup over a match store"""
+
+    def __init__(self, lam: float = None, slack: float = None, threshold: float = None,
+                 min_matches: int = None, warmup: int = None):
+        """
+        Args:
+            lam: EWMA weight (default $DRIFT_EWMA_LAMBDA or 0.01)
+            slack: CUSUM slack around 50% (default $DRIFT_CUSUM_SLACK or 0.025)
+            threshold: CUSUM threshold (default $DRIFT_CUSUM_THRESHOLD or 50)
+            min_matches: Matches per stream before alerts (default $DRIFT_MIN_MATCHES or 200)
+            warmup: Most recent matches replayed when first attached (default $DRIFT_WARMUP or 20000)
+        """
+        env = os.environ.get
+        self.config = {
+            "lam": lam if lam is not None else float(env(LAMBDA_ENV, "0.01")),
+            "slack": slack if slack is not None else float(env(SLACK_ENV, "0.025")),
+            "threshold": threshold if threshold is not None else float(env(THRESHOLD_ENV, "50")),
+            "min_matches": min_matches if min_matches is not None else int(env(MIN_MATCHES_ENV, "200")),
+        }
+        self.warmup = warmup if warmup is not None else int(env(WARMUP_ENV, "20000"))
+        self.position = None
+        self.store_id = None
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.streams = {name: EwmaCusum(**self.config) for name in stream_names()}
+        # (winner, loser) -> (매치업 스트림, 그 스트림 기준 승패)
+        self._matchups = {}
+        for i in range(len(RACES)):
+            for j in range(i + 1, len(RACES)):
+                stream = self.streams[f"{RACES[i]} vs {RACES[j]}"]
+                self._matchups[(i, j)] = (stream, 1)
+                self._matchups[(j, i)] = (stream, 0)
+        self._races = [self.streams[race] for race in RACES]
+        self._names = {id(stream): name for name, stream in self.streams.items()}
+
+    def observe(self, winners, losers, days) -> list:
+        """Feed matches in order -> alerts for every alarm state change"""
+        alerts = []
+        races, matchups = self._races, self._matchups
+        for winner, loser, day in zip(winners, losers, days):
+            if winner == loser:
+                continue
+            for stream, won in ((races[winner], 1), (races[loser], 0), matchups[(winner, loser)]):
+                event = stream.update(won)
+                if event:
+                    alerts.append(self._alert(stream, event, day))
+        return alerts
+
+    def catch_up(self, store) -> list:
+        """Run the detectors over rows appended to the store since the last call"""
+        with self._lock:
+            end = len(store)
+            silent = self.position is None or self.store_id != store.store_id or self.position > end
+            if silent:
+                # 처음(또는 스토어 재생성 후)에는 최근 warmup 경기만 조용히 돌리고 현재 경보만 보고한다
+                self._reset()
+                self.store_id = store.store_id
+                self.position = max(0, end - self.warmup)
+            start, self.position = self.position, end
+            if start == end:
+                return self.active() if silent else []
+            alerts = self.observe(
+                store.winner[start:end].tolist(), store.loser[start:end].tolist(), store.day[start:end].tolist()
+            )
+            return self.active() if silent else alerts
+
+    def active(self) -> list:
+        """One alert per stream currently in alarm"""
+        return [self._alert(stream, stream.alarm, None) for stream in self.streams.values() if stream.alarm]
+
+    def _alert(self, stream: EwmaCusum, event: str, day) -> dict:
+        name = self._names[id(stream)]
+        return {
+            "id": uuid4().hex[:12],
+            "stream": name,
+            "kind": "matchup" if " vs " in name else "race",
+            "event": event,
+            "win_rate": round(stream.ewma, 4),
+            "target": TARGET,
+            "matches": stream.matches,
+            "date": day_to_date(day) if day is not None else None,
+            "detected_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+
+
+class WebhookPublisher:
+    """POST alerts to the coordinator's /alerts endpoint (background thread, never blocks ingestion)"""
+
+    def __init__(self, url: str = None, timeout: float = 5.0):
+        self.url = url or os.environ.get(WEBHOOK_ENV, DEFAULT_WEBHOOK)
+        self.timeout = timeout
+
+    def publish(self, alerts: list):
+        if alerts:
+            threading.Thread(target=self._post, args=(alerts,), daemon=True).start()
+
+    def _post(self, alerts: list):
+        import httpx
+
+        try:
+            httpx.post(self.url, json={"alerts": alerts}, timeout=self.timeout).raise_for_status()
+            logger.info(f"Published {len(alerts)} drift alerts to {self.url}")
+        except Exception as e:
+            logger.warning(f"Failed to publish {len(alerts)} drift alerts to {self.url}: {e}")
+
+
+class DriftWatcher:
+    """Poll for newly ingested matches and publish drift alerts"""
+
+    def __init__(self, check, publisher, interval: float = None):
+        """
+        Args:
+            check: Callable returning new alerts (syncs the store and runs the detectors)
+            publisher: Object with publish(alerts)
+            interval: Seconds between polls (default $DRIFT_POLL_SECONDS or 30; 0 disables)
+        """
+        self.check = check
+        self.publisher = publisher
+        self.interval = interval if interval is not None else float(os.environ.get(INTERVAL_ENV, "30"))
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.interval <= 0:
+            logger.info("Drift watcher disabled")
+            return self
+        self._thread = threading.Thread(target=self._run, name="drift-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def poll(self) -> list:
+        alerts = self.check()
+        if alerts:
+            for alert in alerts:
+                logger.info(f"Drift {alert['event']}: {alert['stream']} win rate {alert['win_rate']:.1%}")
+            self.publisher.publish(alerts)
+        return alerts
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.poll()
+            except Exception as e:
+                logger.warning(f"Drift check failed: {e}")
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
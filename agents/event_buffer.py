@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Bounded, coalescing event buffers for slow stream consumers.
+
+The A2A ``EventQueue`` holds up to 1024 events per task and ``put`` blocks
+the executor once it is full, so a slow SSE client either costs memory or
+stalls the agent. ``BoundedEventQueue`` sits between an executor and its
+EventQueue:
+
+- while the consumer keeps up (fewer than ``EVENT_QUEUE_LIMIT`` of our
+  events not yet dequeued from the EventQueue) events pass straight through
+- when it lags, events wait in a local buffer where a newer working-status
+  snapshot (progress message) replaces the one still waiting; only the
+  latest is worth showing
+- terminal events (final status, Message) are never dropped: they flush
+  everything before them, in order
+- if the buffer still fills with other events (artifacts), the executor
+  waits (back-pressure)
+
+Per task at most ``2 * EVENT_QUEUE_LIMIT`` events are held, however many slow
+clients are attached.
+
+``StreamBuffer`` does the same for the coordinator's /ask_stream, where the
+agent thread produces stdout chunks and progress lines for an async SSE
+generator.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from collections import deque
+
+from a2a.types import Message, TaskStatusUpdateEvent
+
+logger = logging.getLogger(__name__)
+
+LIMIT_ENV = "EVENT_QUEUE_LIMIT"
+POLL_INTERVAL = 0.02
+# 소비자가 이 시간 동안 하나도 가져가지 않으면 기다리지 않고 EventQueue 에 넘긴다
+STALL_TIMEOUT = 30.0
+
+
+def is_terminal(event) -> bool:
+    return isinstance(event, Message) or (isinstance(event, TaskStatusUpdateEvent) and event.final)
+
+
+def is_snapshot(event) -> bool:
+    """Intermediate status (working + progress message): superseded by the next one"""
+    return isinstance(event, TaskStatusUpdateEvent) and not event.final
+
+
+class BoundedEventQueue:
+    """Bounded, coalescing buffer in front of one task's A2A EventQueue
+
+    Use as ``async with BoundedEventQueue(event_queue) as event_queue:``
+    around the executor body; leaving the block delivers whatever is still
+    buffered.
+
+    Queue depth is counted here: events this wrapper enqueued minus events
+    the consumer dequeued (``dequeue_event`` on the EventQueue is wrapped
+    for the duration of the block).
+    """
+
+    def __init__(self, event_queue, limit: int = None):
+        """
+        Args:
+            event_queue: The EventQueue handed to AgentExecutor.execute
+            limit: Events allowed to wait in the EventQueue (default
+                $EVENT_QUEUE_LIMIT or 32), and in the local buffer
+        """
+        self.target = event_queue
+        self.limit = limit if limit is not None else int(os.environ.get(LIMIT_ENV, "32"))
+        self.pending = deque()
+        self.enqueued = 0
+        self.dequeued = 0
+        self.dropped = 0
+        self.stalled = False
+        self._drainer = None
+        self._progress = asyncio.Event()
+
+    async def __aenter__(self):
+        dequeue = self.target.dequeue_event
+
+        async def counting_dequeue(*args, **kwargs):
+            event = await dequeue(*args, **kwargs)
+            self.dequeued += 1
+            return event
+
+        self.target.dequeue_event = counting_dequeue
+        return self
+
+    async def __aexit__(self, *exc):
+        try:
+            await self.flush()
+        finally:
+            # 인스턴스 속성을 지우면 EventQueue 의 원래 메서드가 다시 보인다
+            del self.target.dequeue_event
+
+    @property
+    def depth(self) -> int:
+        """Events handed to the EventQueue that the consumer has not taken yet"""
+        return max(0, self.enqueued - self.dequeued)
+
+    def _lagging(self) -> bool:
+        return not self.stalled and self.depth >= self.limit
+
+    async def _deliver(self, event):
+        await self.target.enqueue_event(event)
+        self.enqueued += 1
+
+    async def enqueue_event(self, event):
+        draining = self._drainer is not None and not self._drainer.done()
+        if not self.pending and not draining and not self._lagging():
+            await self._deliver(event)
+            return
+        self._add(event)
+        if is_terminal(event):
+            await self.flush()
+            return
+        self._start_drainer()
+        # 버릴 수 없는 이벤트로 버퍼가 찼으면 소비자가 따라올 때까지 생산자를 세운다
+        while len(self.pending) > self.limit:
+            self._progress.clear()
+            await self._progress.wait()
+
+    def _add(self, event):
+        if is_snapshot(event):
+            for i, queued in enumerate(self.pending):
+                if is_snapshot(queued):
+                    del self.pending[i]
+                    self.dropped += 1
+                    break
+        self.pending.append(event)
+
+    def _start_drainer(self):
+        if self._drainer is None or self._drainer.done():
+            self._drainer = asyncio.get_running_loop().create_task(self._drain())
+
+    async def _wait_for_room(self):
+        waited = 0.0
+        while self._lagging() and waited < STALL_TIMEOUT:
+            await asyncio.sleep(POLL_INTERVAL)
+            waited += POLL_INTERVAL
+        if self._lagging():
+            self.stalled = True
+            logger.warning(f"Event consumer stalled for {STALL_TIMEOUT:.0f}s, no longer waiting for it")
+
+    async def _drain(self):
+        try:
+            while self.pending:
+                await self._wait_for_room()
+                if not self.pending:
+                    break
+                await self._deliver(self.pending.popleft())
+                self._progress.set()
+        finally:
+            self._progress.set()
+
+    async def flush(self):
+        """Deliver every buffered event in order (nothing is dropped)"""
+        while self.pending or (self._drainer is not None and not self._drainer.done()):
+            self._start_drainer()
+            await self._drainer
+        if self.dropped:
+            logger.info(f"Slow consumer: dropped {self.dropped} status snapshots")
+
+
+class StreamBuffer:
+    """Thread-safe buffer from an agent thread to an async SSE generator
+
+    Adjacent items of a mergeable kind (stdout text) are concatenated and a
+    newer item of a snapshot kind replaces the waiting one, so the buffer
+    stays small while the client is slow. Other items are kept in order.
+    """
+
+    def __init__(self, loop, merge_kinds=("stdout",), snapshot_kinds=()):
+        self.loop = loop
+        self.merge_kinds = set(merge_kinds)
+        self.snapshot_kinds = set(snapshot_kinds)
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._ready = asyncio.Event()
+
+    def put(self, kind: str, content=None):
+        """Called from any thread"""
+        with self._lock:
+            if kind in self.snapshot_kinds:
+                # 이전 스냅샷을 빼면 앞뒤 stdout 이 맞닿으므로 다시 합친다
+                items, self._items = self._items, deque()
+                for item in items:
+                    if item[0] != kind:
+                        self._add(*item)
+            self._add(kind, content)
+        self.loop.call_soon_threadsafe(self._ready.set)
+
+    def _add(self, kind: str, content):
+        if self._items and kind in self.merge_kinds and self._items[-1][0] == kind:
+            self._items[-1] = (kind, self._items[-1][1] + content)
+        else:
+            self._items.append((kind, content))
+
+    async def drain(self) -> list:
+        """Everything buffered since the last call (waits for at least one item)"""
+        while True:
+            with self._lock:
+                if self._items:
+                    items, self._items = list(self._items), deque()
+                    return items
+                self._ready.clear()
+            await self._ready.wait()
@@ -1,109 +1,457 @@
 #!/usr/bin/env python3
+# --profile-startup: 이후 import 시간을 재려면 가장 먼저 시작한다
+import startup
+startup.begin()
+import asyncio
+import contextvars
+import sys
 from strands import Agent, tool
-from strands.models.bedrock import BedrockModel
+from session_manager import AgentSessions, bedrock_model, conversation_manager
+from semantic_cache import SemanticCache
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
-import uvicorn
+from starlette.routing import Route
+from starlette.responses import JSONResponse
 import httpx
 from a2a.client import A2ACardResolver, ClientConfig, ClientFactory
-from a2a.types import Message, Part, TextPart, Role
+from a2a.types import Message, Part, TextPart, Role, TaskArtifactUpdateEvent, TaskIdParams, TaskState, TaskStatusUpdateEvent
+from collections import OrderedDict
+from contextlib import aclosing, nullcontext
 from uuid import uuid4
-import json
+from contextvars import ContextVar
+import os
+import threading
+from game_log_engine import open_default_engine
+from balance_snapshot import join_snapshot, match_snapshot, snapshot_line
+from drift_detector import CLEARED, DOWN, UP, stream_names
+from complaint_trends import race_key
+from match_store import RACES, day_to_date
+from patch_simulator import simulate, parse_adjustments, simulation_data
+from structured_output import split_parts, tool_error, tool_names, tool_result
+from sqlite_task_store import create_task_store
+from worker_pool import serve
+from cancellation import cancellations, current_cancellation
+from in_process import in_process_client
+from admission import Overloaded, admission_for, admitted_stream, estimate_tokens, overloaded_response, request_priority
+from serialization import SSE_DONE, dumps, loads, sse_event, sse_response
+from response_envelope import parse_envelope, strip_tags
+from event_buffer import StreamBuffer
+from session_manager import messages_since, record_turn
+from game_balance_agent_executor import FEEDBACK_TOOLS, GameBalanceExecutor
+
+startup.phase("imports")
+
+# 코디네이터 대화(세션) 키: A2A executor 는 자신의 context ID, /ask_stream 은 GUI 세션 ID
+coordinator_session = ContextVar("coordinator_session", default=None)
+
+# 코디네이터의 동시 실행·대기열·요청률 한도 (하위 에이전트와 공유하지 않는다)
+admission = admission_for("game_balance")
+
+MAX_SESSIONS = int(os.environ.get("A2A_MAX_SESSIONS", "256"))
 
 # A2A client for calling other agents
 class A2AClient:
-    def __init__(self):
+    def __init__(self, max_sessions: int = MAX_SESSIONS):
         self.agents = {
             "data": "http://localhost:9003",
             "cs": "http://localhost:9002"
         }
         self.cards = {}
+        # 같은 프로세스에 있는 에이전트의 RequestHandler (single_process.py): HTTP 없이 호출
+        self.local = {}
+        # 그 핸들러들이 도는 서버 이벤트 루프 (다른 스레드의 루프에서 호출하면 이 루프로 넘긴다)
+        self.local_loop = None
+        # (coordinator session, agent) -> {"context_id", "task_id"}, LRU
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()
     
     async def init(self):
-        async with httpx.AsyncClient(timeout=60) as client:
-            for name, url in self.agents.items():
-                try:
-                    resolver = A2ACardResolver(httpx_client=client, base_url=url)
-                    self.cards[name] = await resolver.get_agent_card()
-                    print(f"✅ Connected to {name} agent")
-                except Exception as e:
-                    print(f"❌ Failed to connect to {name}: {e}")
+        """Discover every sub-agent now (optional: call_agent discovers on first use)"""
+        for name in self.agents:
+            await self.card(name)
+    
+    def connect_local(self, agent_name: str, card, handler):
+        """Call an agent hosted in this process through its request handler (no HTTP)"""
+        self.cards[agent_name] = card
+        self.local[agent_name] = handler
+    
+    def http_client(self, agent_name: str, timeout: float):
+        """httpx client for a remote agent (nothing to open for an in-process one)"""
+        if agent_name in self.local:
+            return nullcontext()
+        return httpx.AsyncClient(timeout=timeout)
+    
+    def client(self, agent_name: str, http_client, streaming: bool = True):
+        """a2a Client for a sub-agent: in-process transport if hosted here, else JSON-RPC over HTTP"""
+        if agent_name in self.local:
+            return in_process_client(self.cards[agent_name], self.local[agent_name], streaming, self.local_loop)
+        return ClientFactory(ClientConfig(httpx_client=http_client, streaming=streaming)).create(self.cards[agent_name])
+    
+    async def card(self, agent_name: str):
+        """Sub-agent AgentCard, fetched on first use and cached (None while unreachable)
+        
+        Discovery no longer runs at import time, so the coordinator starts
+        without waiting for (or even requiring) the sub-agents; an agent that
+        was down is retried on the next call.
+        """
+        if agent_name not in self.cards and agent_name in self.agents:
+            try:
+                async with httpx.AsyncClient(timeout=10) as client:
+                    resolver = A2ACardResolver(httpx_client=client, base_url=self.agents[agent_name])
+                    self.cards[agent_name] = await resolver.get_agent_card()
+                print(f"✅ Connected to {agent_name} agent")
+            except Exception as e:
+                print(f"❌ Failed to connect to {agent_name}: {e}")
+        return self.cards.get(agent_name)
+    
+    def conversation(self, agent_name: str):
+        """(session key, remembered sub-agent IDs or None) for the current coordinator session"""
+        session = coordinator_session.get()
+        if session is None:
+            return None, None
+        key = (session, agent_name)
+        ids = self.sessions.get(key)
+        if ids is not None:
+            self.sessions.move_to_end(key)
+        return key, ids
+    
+    def remember(self, key, context_id: str, task_id: str, state):
+        """Keep the sub-agent context; the task ID only while it waits for input"""
+        if key is None or context_id is None:
+            return
+        self.sessions[key] = {
+            "context_id": context_id,
+            # 완료된 태스크에는 메시지를 더 보낼 수 없으므로 같은 context 의 새 태스크로 잇는다
+            "task_id": task_id if state == TaskState.input_required else None,
+        }
+        self.sessions.move_to_end(key)
+        while len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+    
+    def forget(self, key):
+        if key is not None:
+            self.sessions.pop(key, None)
+    
+    async def get_json(self, agent_name: str, path: str, params: dict = None, timeout: float = 10):
+        """GET a sub-agent's plain JSON endpoint (no A2A task, no LLM run)"""
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            response = await client.get(self.agents[agent_name] + path, params=params)
+            response.raise_for_status()
+            return loads(response.content)
     
-    async def call_agent(self, agent_name: str, query: str) -> str:
-        if agent_name not in self.cards:
-            return f"Agent {agent_name} not available"
+    async def call_agent(self, agent_name: str, query: str, continue_conversation: bool = True, priority: str = None):
+        """Send query to a sub-agent -> (answer text, [DataPart payloads])
+
+        Within a coordinator session, follow-up calls reuse the sub-agent's
+        context ID (and resume its task while it is input_required), so the
+        sub-agent keeps the earlier turns and the query only needs the delta.
+        ``priority="batch"`` lets the sub-agent queue it behind interactive requests.
+        """
+        if await self.card(agent_name) is None:
+            return f"Agent {agent_name} not available", []
+        
+        key, ids = self.conversation(agent_name)
+        if not continue_conversation:
+            self.forget(key)
+            ids = None
         
         print(f"\n📤 [A2A Request] Calling {agent_name} agent")
         print(f"   Query: {query}")
+        if ids:
+            print(f"   Context: {ids['context_id']}" + (f" (resume task {ids['task_id']})" if ids["task_id"] else ""))
         
         try:
-            async with httpx.AsyncClient(timeout=60) as client:
-                config = ClientConfig(httpx_client=client, streaming=False)
-                factory = ClientFactory(config)
-                a2a_client = factory.create(self.cards[agent_name])
-                
-                msg = Message(
-                    kind="message",
-                    role=Role.user,
-                    parts=[Part(TextPart(kind="text", text=query))],
-                    message_id=uuid4().hex
-                )
-                
-                response_text = ""
-                async for event in a2a_client.send_message(msg):
-                    if isinstance(event, tuple):
-                        event = event[0]
-                    if hasattr(event, 'artifacts') and event.artifacts:
-                        for artifact in event.artifacts:
-                            for part in artifact.parts:
-                                if hasattr(part.root, 'text'):
-                                    response_text = part.root.text
-                
-                # Parse JSON response if present
-                if response_text:
-                    try:
-                        response_json = json.loads(response_text)
-                        message = response_json.get('message', response_text)
-                        print(f"📥 [A2A Response] From {agent_name} agent")
-                        print(f"   Response: {message[:200]}...")
-                        return message
-                    except:
-                        print(f"📥 [A2A Response] From {agent_name} agent")
-                        print(f"   Response: {response_text[:200]}...")
-                        return response_text
-                
-                return "No response"
+            try:
+                response_text, response_data, context_id, task_id, state = await self.send(agent_name, query, ids, priority)
+            except Exception as e:
+                if not ids:
+                    raise
+                # 하위 에이전트가 재시작되어 태스크/컨텍스트를 잃은 경우: 새 대화로 한 번 재시도
+                print(f"⚠️ [A2A Retry] {agent_name} could not resume ({e}), starting a new conversation")
+                self.forget(key)
+                response_text, response_data, context_id, task_id, state = await self.send(agent_name, query, None, priority)
+            self.remember(key, context_id, task_id, state)
+
+            # Parse JSON response if present
+            if response_text:
+                try:
+                    response_json = loads(response_text)
+                    message = response_json.get('message', response_text)
+                    print(f"📥 [A2A Response] From {agent_name} agent")
+                    print(f"   Response: {message[:200]}...")
+                    return message, response_data
+                except Exception:
+                    print(f"📥 [A2A Response] From {agent_name} agent")
+                    print(f"   Response: {response_text[:200]}...")
+                    return response_text, response_data
+            
+            return "No response", []
         except Exception as e:
             print(f"❌ [A2A Error] Failed to call {agent_name}: {e}")
-            return f"Error: {e}"
+            return f"Error: {e}", []
+    
+    async def send(self, agent_name: str, query: str, ids=None, priority: str = None):
+        """One streaming A2A exchange -> (text, data, context_id, task_id, final state)"""
+        async with self.http_client(agent_name, 60) as client:
+            # 스트리밍: 첫 이벤트에서 하위 task ID(취소 전파용)를 알고, 중간 결과를 바로 중계한다
+            a2a_client = self.client(agent_name, client)
+            
+            msg = Message(
+                kind="message",
+                role=Role.user,
+                parts=[Part(TextPart(kind="text", text=query))],
+                message_id=uuid4().hex,
+                context_id=ids["context_id"] if ids else None,
+                task_id=ids["task_id"] if ids else None,
+                metadata={"priority": priority} if priority else None,
+            )
+            
+            response_text = ""
+            response_data = []
+            context_id = task_id = state = None
+            cancellation = current_cancellation()
+            discard = None
+            try:
+                async with aclosing(a2a_client.send_message(msg)) as events:
+                    async for event in events:
+                        if isinstance(event, Message):
+                            response_text, response_data = split_parts(event.parts)
+                            context_id = event.context_id
+                            break
+                        task, update = event
+                        context_id, state = task.context_id, task.status.state
+                        if task_id is None:
+                            task_id = task.id
+                            if cancellation:
+                                discard = cancellation.on_cancel(lambda: self.cancel_remote(agent_name, task_id))
+                        if isinstance(update, TaskArtifactUpdateEvent):
+                            text, data = split_parts(update.artifact.parts)
+                            if update.append:
+                                response_text, response_data = response_text + text, response_data + data
+                            else:
+                                response_text, response_data = text, data
+                            await report_progress(agent_name, text)
+                        elif isinstance(update, TaskStatusUpdateEvent):
+                            state = update.status.state
+                            if update.status.message:
+                                await report_progress(agent_name, split_parts(update.status.message.parts)[0])
+                            if update.final:
+                                # 최종 상태가 오면 스트림이 닫히기를 기다리지 않고 바로 반환
+                                break
+                        elif update is None and task.artifacts:
+                            # 스트리밍을 지원하지 않는 에이전트는 완료된 Task 하나로 응답한다
+                            response_text, response_data = split_parts(task.artifacts[-1].parts)
+            finally:
+                if discard:
+                    discard()
+            return response_text, response_data, context_id, task_id, state
+
+    async def cancel_remote(self, agent_name: str, task_id: str):
+        """Propagate cancellation to a sub-agent task (A2A tasks/cancel)"""
+        try:
+            async with self.http_client(agent_name, 10) as client:
+                remote = self.client(agent_name, client, streaming=False)
+                await remote.cancel_task(TaskIdParams(id=task_id))
+                print(f"🛑 [A2A Cancel] Cancelled {agent_name} task {task_id}")
+        except Exception as e:
+            print(f"⚠️ [A2A Cancel] Failed to cancel {agent_name} task {task_id}: {e}")
 
 a2a_client = A2AClient()
 
+# 하위 에이전트 진행 상황을 받는 async 콜백(agent_name, text): /ask_stream 과 A2A executor 가 설정
+progress_listener = ContextVar("a2a_progress_listener", default=None)
+
+async def report_progress(agent_name: str, text: str):
+    """Relay a sub-agent's intermediate update to whoever is streaming this request"""
+    listener = progress_listener.get()
+    if listener is not None and text:
+        await listener(agent_name, text)
+
+def relay_result(message: str, payloads: list):
+    """Sub-agent answer as a tool result: DataParts are passed on as JSON, not re-parsed from text"""
+    if not payloads:
+        return message
+    return tool_result(message, {"results": payloads})
+
 @tool
-async def call_data_agent(query: str) -> str:
+async def call_data_agent(query: str, continue_conversation: bool = True) -> dict:
     """Call data analysis agent to get game statistics
     
     Args:
-        query: Question about game data (win rates, pick rates, etc)
+        query: Question about game data (win rates, pick rates, etc).
+            The agent remembers earlier questions in this conversation, so a
+            follow-up only needs what is new (e.g. "저그는?")
+        continue_conversation: False to start a fresh conversation with the agent
     """
-    return await a2a_client.call_agent("data", query)
+    return relay_result(*await a2a_client.call_agent("data", query, continue_conversation))
 
 @tool
-async def call_cs_agent(query: str) -> str:
+async def call_cs_agent(query: str, continue_conversation: bool = True) -> dict:
     """Call CS agent to get player feedback
     
     Args:
-        query: Question about player complaints or feedback
+        query: Question about player complaints or feedback.
+            The agent remembers earlier questions in this conversation, so a
+            follow-up only needs what is new
+        continue_conversation: False to start a fresh conversation with the agent
     """
-    return await a2a_client.call_agent("cs", query)
+    return relay_result(*await a2a_client.call_agent("cs", query, continue_conversation))
+
+_engine = None
+# 도구 스레드·캐시 버전 확인이 동시에 불러도 엔진을 한 번만 열고 sync 가 겹치지 않게 한다
+_engine_lock = threading.Lock()
+
+def get_engine():
+    """Game log engine for simulation baselines (새 행만 반영)"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = open_default_engine()
+        else:
+            _engine.sync()
+        return _engine
+
+def data_version():
+    """Rows folded into the engine + known patches (semantic cache invalidation)"""
+    engine = get_engine()
+    return engine.rows_indexed, len(engine.patches)
+
+@tool
+def simulate_patch(adjustments: dict, matches: int = 100000, patch: str = None, last_days: int = None) -> dict:
+    """Simulate the win-rate impact of a balance patch proposal (Monte Carlo)
+
+    Args:
+        adjustments: Win-probability changes in percentage points,
+            e.g. {"Terran vs Zerg": -5} or {"Zerg": 3} (race vs everyone)
+        matches: Synthetic matches per replicate
+        patch: Use only matches from this patch version as the baseline
+        last_days: Use only the most recent N days as the baseline
+    """
+    engine = get_engine()
+    try:
+        delta = parse_adjustments(adjustments)
+        lo, hi = engine.resolve_window(patch=patch, last_days=last_days)
+    except ValueError as e:
+        return tool_error(str(e))
+    counts, _ = engine.matchup_table(lo, hi)
+    result = simulate(counts, delta, matches=max(1, min(int(matches), 10_000_000)))
+    data = simulation_data(result)
+    data.update({"adjustments": adjustments, "baseline_window": engine.describe_window(lo, hi), "baseline_games": int(counts.sum())})
+    summary = ", ".join(f"{r['race']} {r['baseline'] * 100:.1f}%→{r['projected'] * 100:.1f}%" for r in data["races"])
+    return tool_result(f"패치 시뮬레이션: {summary} [기준 데이터: {data['baseline_window']}, {data['baseline_games']}경기]", data)
+
+@tool
+async def get_balance_snapshot(race: str = None, since: str = None, until: str = None, patch: str = None,
+                               last_days: int = None) -> dict:
+    """Balance snapshot in one call: win rate + 95% interval, matchup deltas, complaint volume,
+    upvote-weighted sentiment and top complaint keywords per race (no sub-agent LLM runs)
+
+    Args:
+        race: Terran / Zerg / Protoss; omit for every race
+        since: Start date YYYY-MM-DD (inclusive)
+        until: End date YYYY-MM-DD (inclusive)
+        patch: Patch version (e.g. 1.0.1) - only that patch's dates
+        last_days: Only the most recent N days of data
+    """
+    engine = get_engine()
+    try:
+        key = race_key(race)
+        lo, hi = engine.resolve_window(since, until, patch, last_days)
+    except ValueError as e:
+        return tool_error(str(e))
+    races = RACES if key == "all" else [key]
+    window = {
+        "since": day_to_date(lo) if lo is not None else None,
+        "until": day_to_date(hi) if hi is not None else None,
+        "label": engine.describe_window(lo, hi),
+    }
+    try:
+        # 불만 통계는 CS 에이전트가 수집 시점에 누적해 둔 값 (같은 날짜 범위)
+        feedback = await a2a_client.get_json("cs", "/feedback_snapshot", {
+            name: value for name, value in (("since", window["since"]), ("until", window["until"])) if value})
+    except Exception as e:
+        print(f"⚠️ [Snapshot] Feedback snapshot unavailable: {e}")
+        feedback = None
+    entries = join_snapshot(match_snapshot(engine, lo, hi), feedback, races)
+    summary = "\n".join(snapshot_line(entry) for entry in entries)
+    return tool_result(f"밸런스 스냅샷 [{window['label']}]\n{summary}", {"window": window, "races": entries})
+
+# 데이터 에이전트가 보낸 승률 이상 경보 (경보 ID -> 경보 + 미리 계산한 분석), 최근 것만 보관
+MAX_ALERTS = 50
+drift_alerts = OrderedDict()
+_background = set()
+
+async def precompute_analysis(alert: dict):
+    """Ask the data agent about an alerted stream before anyone asks the coordinator"""
+    coordinator_session.set(f"alert-{alert['id']}")
+    query = (f"{alert['stream']} 승률이 {alert['win_rate']:.1%}로 50%에서 벗어났다는 경보가 있습니다. "
+             f"최근 승률 추이와 매치업별 승률, 신뢰구간을 분석해주세요.")
+    message, payloads = await a2a_client.call_agent("data", query, continue_conversation=False, priority="batch")
+    alert["analysis"] = message
+    alert["analysis_data"] = payloads
 
-agent = Agent(
-    name="Game Balance Agent",
-    description="게임 밸런스 조정을 위한 코디네이터 에이전트",
-    model=BedrockModel(model_id="us.amazon.nova-lite-v1:0", temperature=0.3),
-    tools=[call_data_agent, call_cs_agent],
-    system_prompt="""당신은 게임 밸런스 조정 담당자입니다.
+def validate_alert(alert) -> dict:
+    """Checked copy of one webhook alert (ValueError if malformed)"""
+    if not isinstance(alert, dict):
+        raise ValueError("alert must be an object")
+    if not isinstance(alert.get("id"), str) or not alert["id"]:
+        raise ValueError("alert id must be a non-empty string")
+    if alert.get("stream") not in stream_names():
+        raise ValueError(f"unknown stream: {alert.get('stream')}")
+    if alert.get("event") not in (UP, DOWN, CLEARED):
+        raise ValueError(f"unknown event: {alert.get('event')}")
+    win_rate = alert.get("win_rate")
+    if isinstance(win_rate, bool) or not isinstance(win_rate, (int, float)) or not 0 <= win_rate <= 1:
+        raise ValueError(f"win_rate must be a number in [0, 1]: {win_rate}")
+    matches = alert.get("matches", 0)
+    if isinstance(matches, bool) or not isinstance(matches, int) or matches < 0:
+        raise ValueError(f"matches must be a non-negative integer: {matches}")
+    for name in ("date", "detected_at", "kind"):
+        if alert.get(name) is not None and not isinstance(alert[name], str):
+            raise ValueError(f"{name} must be a string")
+    return {
+        "id": alert["id"], "stream": alert["stream"], "kind": alert.get("kind"), "event": alert["event"],
+        "win_rate": float(win_rate), "target": 0.5, "matches": matches,
+        "date": alert.get("date"), "detected_at": alert.get("detected_at") or "",
+    }
+
+async def receive_alerts(request):
+    """Drift alert webhook: {"alerts": [...]} from the data analysis agent"""
+    try:
+        body = loads(await request.body())
+        alerts = body.get("alerts") if isinstance(body, dict) else None
+        if not isinstance(alerts, list):
+            raise ValueError("body must be {\"alerts\": [...]}")
+        # 잘못된 경보가 하나라도 있으면 전부 거절 (도구에서 나중에 터지지 않도록)
+        alerts = [validate_alert(alert) for alert in alerts]
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    for alert in alerts:
+        drift_alerts[alert["id"]] = alert
+        while len(drift_alerts) > MAX_ALERTS:
+            drift_alerts.popitem(last=False)
+        print(f"🚨 [Drift Alert] {alert['stream']} {alert.get('event')} (win rate {alert.get('win_rate')})")
+        if alert["event"] in (UP, DOWN):
+            # 세션 ContextVar 가 요청 처리와 섞이지 않도록 별도 컨텍스트에서 실행
+            task = asyncio.get_running_loop().create_task(precompute_analysis(alert), context=contextvars.Context())
+            _background.add(task)
+            task.add_done_callback(_background.discard)
+    return JSONResponse({"received": len(alerts)})
+
+@tool
+def get_balance_alerts() -> dict:
+    """Win-rate drift alerts raised automatically from the match stream, with pre-computed analyses"""
+    latest = {}
+    for alert in drift_alerts.values():
+        latest[alert["stream"]] = alert
+    active = [alert for alert in latest.values() if alert.get("event") != "cleared"]
+    if not active:
+        return tool_result("현재 승률 이상 경보가 없습니다.", {"alerts": []})
+    lines = [f"- {a['stream']}: 승률 {a['win_rate']:.1%} ({'상승' if a['event'] == 'up' else '하락'}, {a.get('date') or a['detected_at']})"
+             + (f"\n  분석: {a['analysis']}" if a.get("analysis") else " (분석 진행 중)") for a in active]
+    return tool_result("승률 이상 경보:\n" + "\n".join(lines), {"alerts": active})
+
+SYSTEM_PROMPT = """당신은 게임 밸런스 조정 담당자입니다.
 
 **응답 형식 (JSON):**
 {
@@ -114,6 +462,13 @@ agent = Agent(
 **도구 사용:**
 - call_data_agent(query): 게임 데이터 분석 (승률, 픽률 등)
 - call_cs_agent(query): 플레이어 피드백 조회
+- 하위 에이전트는 같은 대화의 이전 질문을 기억합니다. 후속 질문은 바뀐 부분만 보내세요 (예: "저그는?")
+- get_balance_snapshot(race, last_days): 종족별 승률·신뢰구간·매치업 편차와 같은 기간의 불만 건수·추천 가중 감성·상위 불만 키워드를 한 번에 조회.
+  "게임 밸런스 분석해줘" 같은 전반적인 질문은 하위 에이전트를 부르기 전에 이것을 먼저 사용하고, 개별 피드백 원문이나 세부 분석이 필요할 때만 call_data_agent/call_cs_agent 를 사용하세요
+- get_balance_alerts(): 경기 데이터에서 자동 감지된 승률 이상 경보와 미리 계산된 분석. "요즘 밸런스 문제 있어?" 같은 질문에는 먼저 확인하세요
+- simulate_patch(adjustments): 패치안의 승률 영향 시뮬레이션. 패치를 제안할 때는 후보안마다 예상 승률 변화를 %p로 넣어 비교하세요
+  (예: 마린 체력 감소 → {"Terran vs Zerg": -4, "Terran vs Protoss": -2})
+- 하위 에이전트 결과와 시뮬레이션 결과에는 요약과 함께 수치 JSON이 포함됩니다. 수치를 비교·결합할 때는 JSON 값을 사용하세요
 
 **상태 결정:**
 - completed: 분석을 완료하고 결과를 제공한 경우
@@ -121,26 +476,37 @@ agent = Agent(
 - error: 오류 발생 시
 
 **중요: 모든 응답은 한글로 작성하세요.**"""
-)
 
-from game_balance_agent_executor import GameBalanceExecutor
-from starlette.routing import Route
-from starlette.responses import StreamingResponse
-import re
+def create_agent(messages=None) -> Agent:
+    """New coordinator agent for one conversation (see session_manager)"""
+    return Agent(
+        name="Game Balance Agent",
+        description="게임 밸런스 조정을 위한 코디네이터 에이전트",
+        tools=[get_balance_snapshot, call_data_agent, call_cs_agent, get_balance_alerts, simulate_patch],
+        model=bedrock_model(),
+        system_prompt=SYSTEM_PROMPT,
+        messages=messages,
+        conversation_manager=conversation_manager(),
+    )
+
+# A2A context(대화)마다 별도 에이전트: 메시지 상태가 섞이지 않고 크기가 제한된다
+sessions = AgentSessions(create_agent, "game_balance")
+
+# 표현만 다른 반복 질문은 멀티 에이전트 실행 없이 답한다 (새 경기 로그가 반영되면 비움,
+# 피드백을 읽은 답은 저장하지 않는다 - FEEDBACK_TOOLS)
+answer_cache = SemanticCache(version=data_version)
 
 async def ask_stream(request):
     """Streaming endpoint for GUI"""
-    body = await request.json()
+    body = loads(await request.body())
     query = body.get('query', '')
+    # GUI 세션 ID가 있으면 코디네이터 대화와 하위 에이전트 대화(context)를 턴 사이에 이어간다
+    session_id = body.get('session_id')
     
-    async def generate():
+    async def stream(cancellation, agent, first_turn):
         try:
-            import sys
-            import asyncio
-            import queue
-            import threading
-            
-            output_queue = queue.Queue()
+            # 느린 클라이언트: 밀린 stdout 은 하나로 합치고 진행 상황은 최신 것만 남긴다
+            output_queue = StreamBuffer(asyncio.get_running_loop(), merge_kinds=('stdout',), snapshot_kinds=('progress',))
             
             # Capture all stdout in real-time
             class StreamCapture:
@@ -152,67 +518,103 @@ async def ask_stream(request):
                     self.original.flush()
                     # Send text as-is, preserving newlines
                     if text:
-                        output_queue.put(('stdout', text))
+                        output_queue.put('stdout', text)
                 
                 def flush(self):
                     self.original.flush()
             
+            async def relay(agent_name, text):
+                output_queue.put('progress', (agent_name, text))
+            
             # Run agent in thread
             def run_agent():
                 old_stdout = sys.stdout
                 sys.stdout = StreamCapture(old_stdout)
+                progress_listener.set(relay)
+                coordinator_session.set(session_id)
                 try:
-                    result = agent(query)
+                    result = agent(query, cancel_signal=cancellation.signal)
                     if hasattr(result, 'message') and hasattr(result.message, 'content'):
                         response = result.message.content[0].text if result.message.content else ""
                     else:
                         response = str(result)
-                    output_queue.put(('final', response))
+                    output_queue.put('final', response)
                 except Exception as e:
-                    output_queue.put(('error', str(e)))
+                    output_queue.put('error', str(e))
                 finally:
                     sys.stdout = old_stdout
-                    output_queue.put(('done', None))
+                    output_queue.put('done')
             
-            thread = threading.Thread(target=run_agent, daemon=True)
+            # 이번 턴에 호출한 도구를 알기 위해 실행 전 메시지를 기억한다
+            known = {id(message) for message in agent.messages}
+            # 하위 에이전트 호출이 취소 스코프를 찾을 수 있도록 컨텍스트를 복사해서 실행
+            thread = threading.Thread(target=contextvars.copy_context().run, args=(run_agent,), daemon=True)
             thread.start()
             
-            # Stream all output in real-time
-            while True:
-                try:
-                    msg_type, content = output_queue.get(timeout=0.1)
-                    
+            # Stream all output in real-time (기다리는 동안 이벤트 루프를 막지 않는다)
+            done = False
+            while not done:
+                for msg_type, content in await output_queue.drain():
                     if msg_type == 'stdout':
                         # Send all stdout as thinking, preserving newlines
-                        yield f"data: {json.dumps({'type': 'thinking', 'content': content}, ensure_ascii=False)}\n\n"
+                        yield sse_event('thinking', content=content)
+                    elif msg_type == 'progress':
+                        # 하위 에이전트의 중간 결과 (도구 실행, 부분 응답)
+                        agent_name, text = content
+                        yield sse_event('progress', agent=agent_name, content=text)
                     elif msg_type == 'final':
                         # Send final answer
-                        clean = re.sub(r'<thinking>.*?</thinking>', '', content, flags=re.DOTALL)
-                        clean = re.sub(r'<response>|</response>', '', clean, flags=re.DOTALL).strip()
+                        clean = strip_tags(content)
                         if clean:
-                            yield f"data: {json.dumps({'type': 'answer', 'content': clean})}\n\n"
+                            yield sse_event('answer', content=clean)
+                            status, message = parse_envelope(clean)
+                            cacheable = first_turn and not tool_names(messages_since(agent, known)) & FEEDBACK_TOOLS
+                            if cacheable and status == 'completed' and not cancellation.cancelled:
+                                answer_cache.store(query, message)
                     elif msg_type == 'error':
-                        yield f"data: {json.dumps({'type': 'error', 'content': content})}\n\n"
+                        yield sse_event('error', content=content)
                     elif msg_type == 'done':
+                        done = True
                         break
-                except queue.Empty:
-                    await asyncio.sleep(0.1)
             
-            yield f"data: {json.dumps({'type': 'done'})}\n\n"
+            yield SSE_DONE
             thread.join(timeout=1)
             
         except Exception as e:
-            yield f"data: {json.dumps({'type': 'error', 'content': str(e)})}\n\n"
+            yield sse_event('error', content=str(e))
+
+    async def generate():
+        # 클라이언트가 연결을 끊으면 에이전트 루프와 하위 에이전트 태스크까지 취소
+        with cancellations.scope(f"ask-{uuid4().hex}") as cancellation:
+            async with sessions.session(session_id) as agent:
+                # 대화 첫 턴은 의미가 같은 이전 질문의 답을 재사용 (에이전트 실행 없음)
+                first_turn = not agent.messages
+                cached = answer_cache.lookup(query) if first_turn else None
+                if cached:
+                    record_turn(agent, query, cached["answer"])
+                    envelope = dumps({"status": "completed", "message": cached["answer"]})
+                    yield sse_event('answer', content=envelope)
+                    yield SSE_DONE
+                    return
+                try:
+                    async for chunk in stream(cancellation, agent, first_turn):
+                        yield chunk
+                except (asyncio.CancelledError, GeneratorExit):
+                    cancellation.cancel_soon()
+                    raise
     
-    return StreamingResponse(generate(), media_type="text/event-stream")
+    # 대기열이 가득 차면 스트림을 열기 전에 429
+    priority = request_priority(request, body)
+    try:
+        admission.check(priority)
+    except Overloaded as e:
+        return overloaded_response(e)
+    return sse_response(request, admitted_stream(admission, generate(), priority, estimate_tokens(query)))
 
 def create_app():
     from a2a.types import AgentCard, AgentCapabilities, AgentSkill
     
-    # Initialize A2A client
-    import asyncio
-    asyncio.run(a2a_client.init())
-    
+    # 하위 에이전트 탐색은 첫 호출 때 (import 중 네트워크 I/O 없음)
     agent_card = AgentCard(
         name="Game Balance Agent",
         description="게임 밸런스 조정 코디네이터",
@@ -234,8 +636,8 @@ def create_app():
     )
     
     request_handler = DefaultRequestHandler(
-        agent_executor=GameBalanceExecutor(),
-        task_store=InMemoryTaskStore()
+        agent_executor=GameBalanceExecutor(sessions, answer_cache, coordinator_session, progress_listener),
+        task_store=create_task_store()
     )
     
     server = A2AStarletteApplication(
@@ -245,11 +647,17 @@ def create_app():
     
     base_app = server.build()
     base_app.routes.append(Route('/ask_stream', ask_stream, methods=['POST']))
+    base_app.routes.append(Route('/alerts', receive_alerts, methods=['POST']))
     
     return base_app
 
 app = create_app()
+startup.phase("app build")
 
 if __name__ == "__main__":
+    if startup.profiling():
+        print(startup.report("Game Balance Agent"))
+        raise SystemExit
     print("⚖️ Starting Game Balance Agent on port 9001...")
-    uvicorn.run(app, host="127.0.0.1", port=9001)
+    # 경보는 모든 워커에 보내 어느 워커의 get_balance_alerts 든 같은 경보를 본다
+    serve(app, host="127.0.0.1", port=9001, name="Game Balance Agent", broadcast=["/alerts"])
@@ -1,92 +1,131 @@
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
 from a2a.types import TaskStatusUpdateEvent, TaskArtifactUpdateEvent, TaskStatus, TaskState, Artifact, TextPart
-import json
-import re
+from serialization import dumps
+from cancellation import cancel_execution, cancellations, current_cancellation, mark_working
+from event_buffer import BoundedEventQueue
+from response_envelope import run_agent_envelope
+from structured_output import artifact_parts, collect_tool_data, tool_names
+from session_manager import messages_since, record_turn
+from admission import Overloaded, admission_for, estimate_tokens, message_priority, reject_task
+
+# 코디네이터의 동시 실행·대기열·요청률 한도 (하위 에이전트와 공유하지 않는다)
+admission = admission_for("game_balance")
+
+# CS 피드백을 읽는 도구: 답변 캐시 버전(경기 데이터)은 새 피드백을 모르므로 이 도구를 쓴 답은 캐시하지 않는다
+FEEDBACK_TOOLS = frozenset({"call_cs_agent", "get_balance_snapshot"})
+
 
 class GameBalanceExecutor(AgentExecutor):
-    async def execute(self, context: RequestContext, event_queue: EventQueue):
-        from game_balance_agent import agent
-        
+    """Runs coordinator turns from A2A requests
+
+    Args:
+        sessions: AgentSessions holding one coordinator agent per context ID
+        answer_cache: SemanticCache for first-turn answers
+        coordinator_session: ContextVar the sub-agent calls read the coordinator session from
+        progress_listener: ContextVar the sub-agent calls report intermediate results to
+    """
+
+    def __init__(self, sessions, answer_cache, coordinator_session, progress_listener):
+        self.sessions = sessions
+        self.answer_cache = answer_cache
+        self.coordinator_session = coordinator_session
+        self.progress_listener = progress_listener
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        # 과부하 시 대기열이 넘치면 즉시 rejected 로 종료
+        # cancel()이 task ID로 찾아 Strands cancel_signal 과 하위 작업 취소를 건다
+        # 느린 소비자: 청크는 합치고 진행 상황은 최신 것만 남기며, 그래도 차면 기다린다
+        async with BoundedEventQueue(event_queue) as event_queue:
+            with cancellations.scope(context.task_id):
+                await mark_working(context, event_queue)
+                try:
+                    async with admission.slot(message_priority(context.message), estimate_tokens(context.get_user_input())):
+                        await self._execute(context, event_queue)
+                except Overloaded as e:
+                    await reject_task(context, event_queue, e)
+
+    async def _execute(self, context: RequestContext, event_queue: EventQueue):
+        answer_cache, sessions = self.answer_cache, self.sessions
         input_text = context.message.parts[0].root.text
         
-        # Get conversation history
-        history = []
-        if context.current_task and context.current_task.artifacts:
-            for artifact in context.current_task.artifacts:
-                if artifact.parts:
-                    history.append(artifact.parts[0].root.text)
-        
-        # Build context with history
-        if history:
-            full_input = f"Previous conversation:\n" + "\n".join(history[-6:]) + f"\n\nCurrent question: {input_text}"
-        else:
-            full_input = input_text
-        
         try:
-            result = await agent.invoke_async(full_input)
-            response = result.output if hasattr(result, 'output') else str(result)
-            
-            # Parse JSON response
-            clean_response = re.sub(r'<thinking>.*?</thinking>', '', response, flags=re.DOTALL).strip()
-            
-            try:
-                json_match = re.search(r'\{[^}]*"status"[^}]*"message"[^}]*\}', clean_response, re.DOTALL)
-                if json_match:
-                    response_json = json.loads(json_match.group())
-                    status = response_json.get('status', 'completed')
-                    message = response_json.get('message', clean_response)
+            # 응답을 스트리밍하며 봉투를 파싱하고 status 로 분기한다
+            cancellation = current_cancellation()
+            # 같은 context 의 후속 턴은 하위 에이전트 대화도 이어간다
+            self.coordinator_session.set(context.context_id)
+            # 하위 에이전트의 중간 결과를 이 태스크의 working 상태로 다시 흘려보낸다
+            self.progress_listener.set(lambda name, text: mark_working(context, event_queue, f"[{name}] {text}"))
+            # 이전 턴은 context 별 세션 에이전트가 기억하므로 artifact 히스토리를 다시 붙이지 않는다
+            async with sessions.session(context.context_id) as agent:
+                # 대화 첫 턴은 의미가 같은 이전 질문의 답을 재사용 (하위 에이전트 호출 없음)
+                first_turn = not agent.messages
+                cached = answer_cache.lookup(input_text) if first_turn else None
+                cacheable = False
+                if cached:
+                    status, message, tool_data = "completed", cached["answer"], cached["data"]
+                    record_turn(agent, input_text, message)
                 else:
-                    status = 'completed'
-                    message = clean_response
-            except:
-                status = 'completed'
-                message = clean_response
+                    # 이번 실행에서 추가된 메시지의 도구 결과만 artifact 에 싣는다
+                    known = {id(message) for message in agent.messages}
+                    parser = await run_agent_envelope(
+                        agent, input_text, cancellation,
+                        on_tool=lambda name: mark_working(context, event_queue, f"🔧 {name} 실행 중"),
+                    )
+                    new_messages = messages_since(agent, known)
+                    tool_data = collect_tool_data(new_messages)
+                    cacheable = first_turn and not tool_names(new_messages) & FEEDBACK_TOOLS
+                    status, message = parser.finish()
+            # 취소된 태스크는 cancel()이 이미 canceled 로 종료했다
+            if cancellation.cancelled:
+                return
+            if cacheable and status == 'completed':
+                answer_cache.store(input_text, message, tool_data)
             
             # Map status to TaskState
             state_map = {
-                'completed': TaskState.COMPLETED,
-                'input_required': TaskState.INPUT_REQUIRED,
-                'error': TaskState.FAILED
+                'completed': TaskState.completed,
+                'input_required': TaskState.input_required,
+                'error': TaskState.failed
             }
-            task_state = state_map.get(status, TaskState.COMPLETED)
+            task_state = state_map.get(status, TaskState.completed)
             
-            # Send status update
-            await event_queue.enqueue_event(TaskStatusUpdateEvent(
-                taskId=context.current_task.id,
-                contextId=context.context_id,
-                status=TaskStatus(state=task_state),
-                final=(task_state != TaskState.INPUT_REQUIRED)
-            ))
-            
-            # Send artifact with full JSON response
-            full_response = json.dumps({"status": status, "message": message}, ensure_ascii=False)
+            # Send artifact with full JSON response (final 상태 이벤트 뒤에는 큐가 닫히므로 먼저 보낸다)
+            full_response = dumps({"status": status, "message": message})
             await event_queue.enqueue_event(TaskArtifactUpdateEvent(
-                taskId=context.current_task.id,
+                taskId=context.task_id,
                 contextId=context.context_id,
                 artifact=Artifact(
-                    artifactId=f"response-{context.current_task.id}",
-                    parts=[TextPart(text=full_response)]
+                    artifactId=f"response-{context.task_id}",
+                    parts=artifact_parts(full_response, tool_data)
                 )
             ))
             
-        except Exception as e:
+            # Send status update
             await event_queue.enqueue_event(TaskStatusUpdateEvent(
-                taskId=context.current_task.id,
+                taskId=context.task_id,
                 contextId=context.context_id,
-                status=TaskStatus(state=TaskState.FAILED),
+                status=TaskStatus(state=task_state),
                 final=True
             ))
             
-            error_response = json.dumps({"status": "error", "message": f"오류 발생: {str(e)}"}, ensure_ascii=False)
+        except Exception as e:
+            error_response = dumps({"status": "error", "message": f"오류 발생: {str(e)}"})
             await event_queue.enqueue_event(TaskArtifactUpdateEvent(
-                taskId=context.current_task.id,
+                taskId=context.task_id,
                 contextId=context.context_id,
                 artifact=Artifact(
-                    artifactId=f"error-{context.current_task.id}",
+                    artifactId=f"error-{context.task_id}",
                     parts=[TextPart(text=error_response)]
                 )
             ))
+            
+            await event_queue.enqueue_event(TaskStatusUpdateEvent(
+                taskId=context.task_id,
+                contextId=context.context_id,
+                status=TaskStatus(state=TaskState.failed),
+                final=True
+            ))
     
-    async def cancel(self, context: RequestContext):
-        pass
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        await cancel_execution(context, event_queue)
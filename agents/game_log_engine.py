@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Date-partitioned game log engine on top of the match store.
+
+Matches are partitioned by day. For every day the engine keeps a rollup of
+(winner race x loser race) match counts and duration sums, plus prefix sums
+over days, so any [since, until] window is answered with two binary searches
+over the partition boundaries and one subtraction - no rescan of the history.
+
+The rollup is persisted next to the store (``rollup.npz``) and only the rows
+appended since the last sync are folded in.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from match_store import RACES, MatchStore, date_to_day, day_to_date, open_store
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+GAME_LOGS_PATH = Path(os.environ.get("GAME_LOGS_PATH", DATA_DIR / "game_logs.json"))
+MATCH_STORE_PATH = Path(os.environ.get("MATCH_STORE_PATH", DATA_DIR / "game_logs.store"))
+PATCHES_PATH = Path(os.environ.get("PATCHES_PATH", DATA_DIR / "patches.json"))
+
+ROLLUP_FILE = "rollup.npz"
+NUM_RACES = len(RACES)
+
+
+def load_patches(path) -> list:
+    """Patch table [{"patch": "1.0.1", "date": "YYYY-MM-DD", ...}] sorted by date"""
+    path = Path(path)
+    if not path.exists():
+        return []
+    patches = json.loads(path.read_text(encoding="utf-8"))
+    return sorted(patches, key=lambda p: p["date"])
+
+
+def open_default_engine() -> "GameLogEngine":
+    """Engine over MATCH_STORE_PATH (converted from GAME_LOGS_PATH on first use)"""
+    store = open_store(MATCH_STORE_PATH, source=GAME_LOGS_PATH)
+    logger.info(f"Match store opened: {MATCH_STORE_PATH} ({len(store)} matches)")
+    return GameLogEngine(store, patches=load_patches(PATCHES_PATH))
+
+
+class GameLogEngine:
+    """Windowed aggregates (win rate, duration, matchups) over a MatchStore"""
+
+    def __init__(self, store: MatchStore, patches=None, persist: bool = True):
+        self.store = store
+        self.patches = patches or []
+        self.persist = persist
+        self._reset()
+        if persist:
+            self._load_rollup()
+        self.sync()
+
+    def _reset(self):
+        self.days = np.empty(0, dtype=np.int32)
+        self.matchups = np.zeros((0, NUM_RACES, NUM_RACES), dtype=np.int64)
+        self.matchup_duration = np.zeros((0, NUM_RACES, NUM_RACES), dtype=np.float64)
+        self.rows_indexed = 0
+        self.last_day = None
+        # 날짜순으로 append된 스토어라면 day 컬럼 자체가 정렬된 파티션 경계가 된다
+        self.chronological = True
+        self._build_prefix()
+
+    @property
+    def rollup_path(self) -> Path:
+        return self.store.path / ROLLUP_FILE
+
+    def _load_rollup(self):
+        if not self.rollup_path.exists():
+            return
+        try:
+            with np.load(self.rollup_path) as data:
+                if str(data["store_id"]) != str(self.store.store_id) or int(data["rows"]) > len(self.store):
+                    logger.info("Match store was rebuilt, discarding rollup")
+                    return
+                self.days = data["days"]
+                self.matchups = data["matchups"]
+                self.matchup_duration = data["matchup_duration"]
+                self.rows_indexed = int(data["rows"])
+                self.last_day = int(data["last_day"]) if self.rows_indexed else None
+                self.chronological = bool(data["chronological"])
+        except Exception as e:
+            logger.warning(f"Failed to load rollup ({e}), rebuilding")
+            self._reset()
+            return
+        self._build_prefix()
+
+    def _save_rollup(self):
+        # 여러 엔진(워커·에이전트)이 동시에 저장할 수 있으므로 임시 파일은 저장마다 따로 만든다
+        with tempfile.NamedTemporaryFile(dir=self.rollup_path.parent, prefix=self.rollup_path.stem + ".",
+                                         suffix=".tmp.npz", delete=False) as tmp:
+            try:
+                np.savez(
+                    tmp,
+                    store_id=np.array(str(self.store.store_id)),
+                    days=self.days,
+                    matchups=self.matchups,
+                    matchup_duration=self.matchup_duration,
+                    rows=np.array(self.rows_indexed),
+                    last_day=np.array(self.last_day if self.last_day is not None else 0),
+                    chronological=np.array(self.chronological),
+                )
+            except BaseException:
+                tmp.close()
+                os.unlink(tmp.name)
+                raise
+        os.replace(tmp.name, self.rollup_path)
+
+    def _build_prefix(self):
+        # 앞에 0 행을 둔 누적합: 파티션 [lo, hi) 합계 = cum[hi] - cum[lo]
+        zero = np.zeros((1, NUM_RACES, NUM_RACES))
+        self._cum_matchups = np.concatenate([zero, np.cumsum(self.matchups, axis=0)]).astype(np.int64)
+        self._cum_duration = np.concatenate([zero, np.cumsum(self.matchup_duration, axis=0)])
+
+    def sync(self) -> int:
+        """Fold rows appended to the store since the last sync into the rollup"""
+        self.store.refresh()
+        if self.rows_indexed > len(self.store):
+            self._reset()
+        start, end = self.rows_indexed, len(self.store)
+        if start == end:
+            return 0
+
+        day = np.asarray(self.store.day[start:end])
+        winner = np.asarray(self.store.winner[start:end], dtype=np.int64)
+        loser = np.asarray(self.store.loser[start:end], dtype=np.int64)
+        duration = np.asarray(self.store.duration[start:end], dtype=np.float64)
+
+        if self.chronological:
+            ordered = bool(np.all(day[1:] >= day[:-1]))
+            if self.last_day is not None and day[0] < self.last_day:
+                ordered = False
+            self.chronological = ordered
+        self.last_day = int(day.max()) if self.last_day is None else max(self.last_day, int(day.max()))
+
+        tail_days, day_idx = np.unique(day, return_inverse=True)
+        key = (day_idx * NUM_RACES + winner) * NUM_RACES + loser
+        size = len(tail_days) * NUM_RACES * NUM_RACES
+        shape = (len(tail_days), NUM_RACES, NUM_RACES)
+        tail_counts = np.bincount(key, minlength=size).reshape(shape)
+        tail_duration = np.bincount(key, weights=duration, minlength=size).reshape(shape)
+
+        merged_days = np.union1d(self.days, tail_days).astype(np.int32)
+        matchups = np.zeros((len(merged_days), NUM_RACES, NUM_RACES), dtype=np.int64)
+        matchup_duration = np.zeros((len(merged_days), NUM_RACES, NUM_RACES), dtype=np.float64)
+        old_pos = np.searchsorted(merged_days, self.days)
+        matchups[old_pos] = self.matchups
+        matchup_duration[old_pos] = self.matchup_duration
+        new_pos = np.searchsorted(merged_days, tail_days)
+        matchups[new_pos] += tail_counts
+        matchup_duration[new_pos] += tail_duration
+
+        self.days = merged_days
+        self.matchups = matchups
+        self.matchup_duration = matchup_duration
+        self.rows_indexed = end
+        self._build_prefix()
+        if self.persist:
+            try:
+                self._save_rollup()
+            except OSError as e:
+                logger.warning(f"Failed to persist rollup: {e}")
+        return end - start
+
+    def resolve_window(self, since=None, until=None, patch=None, last_days=None):
+        """Window parameters -> (since_day, until_day) inclusive, None = open
+
+        Raises:
+            ValueError: unknown patch name or malformed date
+        """
+        lo = date_to_day(since) if since else None
+        hi = date_to_day(until) if until else None
+        if patch:
+            names = [p["patch"] for p in self.patches]
+            if patch not in names:
+                raise ValueError(f"알 수 없는 패치: {patch} (사용 가능: {', '.join(names) or '없음'})")
+            i = names.index(patch)
+            patch_lo = date_to_day(self.patches[i]["date"])
+            lo = patch_lo if lo is None else max(lo, patch_lo)
+            if i + 1 < len(self.patches):
+                patch_hi = date_to_day(self.patches[i + 1]["date"]) - 1
+                hi = patch_hi if hi is None else min(hi, patch_hi)
+        if last_days:
+            # 기준일은 오늘이 아니라 데이터의 마지막 날짜
+            anchor = hi if hi is not None else self.last_day
+            if anchor is not None:
+                recent_lo = anchor - int(last_days) + 1
+                lo = recent_lo if lo is None else max(lo, recent_lo)
+        return lo, hi
+
+    def describe_window(self, lo=None, hi=None) -> str:
+        if lo is None and hi is None:
+            return "전체 기간"
+        start = day_to_date(lo) if lo is not None else "처음"
+        end = day_to_date(hi) if hi is not None else "최근"
+        return f"{start} ~ {end}"
+
+    def _partition_range(self, lo=None, hi=None):
+        # 날짜 파티션 경계에 대한 이진 탐색
+        start = 0 if lo is None else int(np.searchsorted(self.days, lo, side="left"))
+        end = len(self.days) if hi is None else int(np.searchsorted(self.days, hi, side="right"))
+        return start, max(start, end)
+
+    def matchup_table(self, lo=None, hi=None):
+        """(counts[winner, loser], duration_sums[winner, loser]) over the window"""
+        start, end = self._partition_range(lo, hi)
+        counts = self._cum_matchups[end] - self._cum_matchups[start]
+        durations = self._cum_duration[end] - self._cum_duration[start]
+        return counts, durations
+
+    def race_totals(self, lo=None, hi=None) -> dict:
+        """Per-race wins/losses/games/duration_sum arrays (index = race code)"""
+        counts, durations = self.matchup_table(lo, hi)
+        wins = counts.sum(axis=1)
+        losses = counts.sum(axis=0)
+        return {
+            "wins": wins,
+            "losses": losses,
+            "games": wins + losses,
+            "duration_sum": durations.sum(axis=1) + durations.sum(axis=0),
+        }
+
+    def rows(self, lo=None, hi=None):
+        """Store row selection (slice or index array) for matches inside the window"""
+        if lo is None and hi is None:
+            return slice(0, self.rows_indexed)
+        day = self.store.day[:self.rows_indexed]
+        if self.chronological:
+            start = 0 if lo is None else int(np.searchsorted(day, lo, side="left"))
+            end = self.rows_indexed if hi is None else int(np.searchsorted(day, hi, side="right"))
+            return slice(start, max(start, end))
+        mask = np.ones(len(day), dtype=bool)
+        if lo is not None:
+            mask &= day >= lo
+        if hi is not None:
+            mask &= day <= hi
+        return np.flatnonzero(mask)
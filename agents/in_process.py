@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+In-process A2A transport.
+
+When every agent runs in one process (``single_process.py``), the
+coordinator still talks A2A to the CS and data agents, but through
+``InProcessTransport`` instead of JSON-RPC over localhost HTTP: client calls
+go straight to the agent's ``DefaultRequestHandler`` and its event objects
+come back as they are.
+
+The a2a client's task manager mutates the Task / artifacts it receives, and
+the server keeps the same objects in its task store, so requests and events
+are copied at the boundary. That is still far cheaper than JSON encoding,
+a socket round trip and JSON decoding per event.
+
+The handler, its task store, the agent sessions' locks and the admission
+controller all belong to the server's event loop. The /ask_stream endpoint
+runs the coordinator agent on a worker thread with its own loop, so calls
+made from any other loop are handed to the server loop
+(``run_coroutine_threadsafe``) and their events are passed back.
+"""
+
+import asyncio
+
+from a2a.client import BaseClient, ClientConfig
+from a2a.client.transports.base import ClientTransport
+
+
+def _copy(obj):
+    return obj.model_copy(deep=True) if obj is not None else None
+
+
+class InProcessTransport(ClientTransport):
+    """ClientTransport that calls a RequestHandler in the same process"""
+
+    def __init__(self, card, handler, loop=None):
+        """
+        Args:
+            card: The agent's AgentCard
+            handler: The agent's RequestHandler (normally DefaultRequestHandler)
+            loop: Event loop the handler runs on (None: whichever loop calls it)
+        """
+        self.card = card
+        self.handler = handler
+        self.loop = loop
+
+    def _server_loop(self):
+        """The handler's loop when the caller is on a different one, else None"""
+        if self.loop is None or not self.loop.is_running():
+            return None
+        return None if asyncio.get_running_loop() is self.loop else self.loop
+
+    async def _call(self, make_call):
+        loop = self._server_loop()
+        if loop is None:
+            return _copy(await make_call())
+
+        async def call():
+            return _copy(await make_call())
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(call(), loop))
+
+    async def _stream(self, make_stream):
+        loop = self._server_loop()
+        if loop is None:
+            stream = make_stream()
+            try:
+                async for event in stream:
+                    yield _copy(event)
+            finally:
+                # 클라이언트가 final 이벤트에서 빠져나가도 서버 쪽 스트림을 바로 정리한다
+                await stream.aclose()
+            return
+
+        # 서버 루프에서 스트림을 돌리고 이벤트를 호출한 루프의 큐로 넘긴다
+        caller = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+
+        def deliver(kind, value=None):
+            caller.call_soon_threadsafe(queue.put_nowait, (kind, value))
+
+        async def pump():
+            stream = make_stream()
+            try:
+                async for event in stream:
+                    deliver("event", _copy(event))
+                deliver("done")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                deliver("error", e)
+            finally:
+                await stream.aclose()
+
+        future = asyncio.run_coroutine_threadsafe(pump(), loop)
+        try:
+            while True:
+                kind, value = await queue.get()
+                if kind == "event":
+                    yield value
+                elif kind == "error":
+                    raise value
+                else:
+                    return
+        finally:
+            # 호출 쪽이 먼저 빠져나가면 서버 루프의 스트림도 닫는다
+            future.cancel()
+
+    async def send_message(self, request, *, context=None, extensions=None):
+        return await self._call(lambda: self.handler.on_message_send(_copy(request)))
+
+    async def send_message_streaming(self, request, *, context=None, extensions=None):
+        async for event in self._stream(lambda: self.handler.on_message_send_stream(_copy(request))):
+            yield event
+
+    async def get_task(self, request, *, context=None, extensions=None):
+        return await self._call(lambda: self.handler.on_get_task(request))
+
+    async def cancel_task(self, request, *, context=None, extensions=None):
+        return await self._call(lambda: self.handler.on_cancel_task(request))
+
+    async def set_task_callback(self, request, *, context=None, extensions=None):
+        return await self._call(lambda: self.handler.on_set_task_push_notification_config(_copy(request)))
+
+    async def get_task_callback(self, request, *, context=None, extensions=None):
+        return await self._call(lambda: self.handler.on_get_task_push_notification_config(request))
+
+    async def resubscribe(self, request, *, context=None, extensions=None):
+        async for event in self._stream(lambda: self.handler.on_resubscribe_to_task(request)):
+            yield event
+
+    async def get_card(self, *, context=None, extensions=None, signature_verifier=None):
+        return self.card
+
+    async def close(self):
+        pass
+
+
+def in_process_client(card, handler, streaming: bool = True, loop=None) -> BaseClient:
+    """a2a Client for an agent hosted in this process (``loop``: the server loop, see InProcessTransport)"""
+    config = ClientConfig(streaming=streaming)
+    return BaseClient(card, config, InProcessTransport(card, handler, loop), [], [])
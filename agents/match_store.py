@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped columnar match store for game logs.
+
+A store is a directory with one fixed-width binary file per column plus a
+small ``meta.json`` that records the row count and a store id (regenerated
+whenever the store is re-created, so derived indexes can detect a rebuild):
+
+    game_id.bin   int64
+    winner.bin    uint8   (race code)
+    loser.bin     uint8   (race code)
+    duration.bin  uint32  (seconds)
+    day.bin       int32   (days since 1970-01-01)
+    bracket.bin   uint8   (MMR bracket code, 0 = unknown; optional)
+
+Columns are opened with ``numpy.memmap`` so opening a store costs a single
+small JSON read, and a query only touches the pages of the columns it uses.
+
+Writers (conversion and appends) hold an exclusive lock on ``<store>.lock``
+next to the store, so several agents or worker processes can open the
+default store at once: a store is converted in a temporary directory and
+renamed into place, and only one process converts it.
+
+Usage:
+    python agents/match_store.py convert data/game_logs.json data/game_logs.store
+    python agents/match_store.py append new_games.jsonl data/game_logs.store
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 동작 (한 프로세스만 쓰는 경우)
+    fcntl = None
+
+RACES = ("Terran", "Zerg", "Protoss")
+RACE_CODES = {race: code for code, race in enumerate(RACES)}
+
+# bracket 코드 0은 "unknown" (mmr_bracket 필드가 없는 로그)
+BRACKETS = ("Unknown", "Bronze", "Silver", "Gold", "Platinum", "Diamond", "Master", "Grandmaster")
+BRACKET_CODES = {bracket.lower(): code for code, bracket in enumerate(BRACKETS)}
+
+COLUMNS = {
+    "game_id": np.dtype("<i8"),
+    "winner": np.dtype("u1"),
+    "loser": np.dtype("u1"),
+    "duration": np.dtype("<u4"),
+    "day": np.dtype("<i4"),
+    "bracket": np.dtype("u1"),
+}
+
+STORE_VERSION = 1
+CHUNK_SIZE = 100_000
+
+
+def race_code(race: str):
+    """Race name -> code (None if unknown)"""
+    if race is None:
+        return None
+    return RACE_CODES.get(race.strip().capitalize())
+
+
+def bracket_code(bracket) -> int:
+    """MMR bracket name -> code (0 if missing/unknown)"""
+    if not bracket:
+        return 0
+    return BRACKET_CODES.get(str(bracket).strip().lower(), 0)
+
+
+def date_to_day(date: str) -> int:
+    """'YYYY-MM-DD' -> days since epoch"""
+    return int(np.datetime64(date, "D").astype(np.int64))
+
+
+def day_to_date(day: int) -> str:
+    """days since epoch -> 'YYYY-MM-DD'"""
+    return str(np.datetime64(int(day), "D"))
+
+
+def _record_race(record: dict, field: str) -> int:
+    race = record.get(field)
+    code = race_code(race) if isinstance(race, str) else None
+    if code is None:
+        raise ValueError(f"game {record.get('game_id')}: unknown {field} {race!r} (expected one of {', '.join(RACES)})")
+    return code
+
+
+def encode_records(records) -> dict:
+    """Convert game log dicts (game_logs.json format) into column arrays
+
+    Race names are matched case-insensitively; an unknown race raises ValueError.
+    """
+    records = list(records)
+    columns = {
+        "game_id": np.fromiter((r["game_id"] for r in records), COLUMNS["game_id"], len(records)),
+        "winner": np.fromiter((_record_race(r, "winner_race") for r in records), COLUMNS["winner"], len(records)),
+        "loser": np.fromiter((_record_race(r, "loser_race") for r in records), COLUMNS["loser"], len(records)),
+        "duration": np.fromiter((r["duration"] for r in records), COLUMNS["duration"], len(records)),
+    }
+    columns["day"] = np.array([r["date"] for r in records], dtype="datetime64[D]").astype(COLUMNS["day"])
+    columns["bracket"] = np.fromiter((bracket_code(r.get("mmr_bracket")) for r in records), COLUMNS["bracket"], len(records))
+    return columns
+
+
+def iter_log_records(path):
+    """Yield game log dicts from a JSON array (.json) or JSON Lines file"""
+    path = Path(path)
+    with open(path, encoding="utf-8") as f:
+        if path.suffix == ".json":
+            yield from json.load(f)
+            return
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+@contextmanager
+def store_lock(path):
+    """Exclusive cross-process writer lock for the store at path (blocks until free)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.parent / f"{path.name}.lock", "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class MatchStore:
+    """Read/append access to a columnar match store directory"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._columns = {}
+        self._meta_stamp = None
+        self.size = 0
+        self.store_id = None
+        self.refresh()
+
+    @classmethod
+    def create(cls, path) -> "MatchStore":
+        """Create an empty store (existing column files are truncated)"""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for name in COLUMNS:
+            (path / f"{name}.bin").write_bytes(b"")
+        cls._write_meta(path, 0, uuid.uuid4().hex)
+        return cls(path)
+
+    @staticmethod
+    def _write_meta(path: Path, size: int, store_id: str) -> None:
+        meta = {
+            "version": STORE_VERSION,
+            "store_id": store_id,
+            "size": size,
+            "races": list(RACES),
+            "columns": {name: dtype.str for name, dtype in COLUMNS.items()},
+        }
+        tmp = path / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, path / "meta.json")
+
+    def refresh(self) -> bool:
+        """Re-read meta.json if another writer appended; returns True if reloaded"""
+        meta_path = self.path / "meta.json"
+        st = meta_path.stat()
+        # meta.json은 os.replace로 교체되므로 inode가 바뀐다 (mtime 해상도가 낮은 FS 대비)
+        stamp = (st.st_ino, st.st_mtime_ns)
+        if stamp == self._meta_stamp:
+            return False
+        meta = json.loads(meta_path.read_text())
+        if meta.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported match store version: {meta.get('version')}")
+        self.size = int(meta["size"])
+        self.store_id = meta.get("store_id")
+        self._meta_stamp = stamp
+        self._columns = {}
+        return True
+
+    def column(self, name: str) -> np.ndarray:
+        """Memory-mapped view of a column (opened on first access)"""
+        if name not in self._columns:
+            dtype = COLUMNS[name]
+            path = self.path / f"{name}.bin"
+            if not path.exists():
+                # 선택 컬럼이 추가되기 전에 만든 스토어: 기본값(0)으로 채운다
+                self._columns[name] = np.zeros(self.size, dtype=dtype)
+            elif self.size == 0:
+                self._columns[name] = np.empty(0, dtype=dtype)
+            else:
+                self._columns[name] = np.memmap(path, dtype=dtype, mode="r", shape=(self.size,))
+        return self._columns[name]
+
+    @property
+    def game_id(self) -> np.ndarray:
+        return self.column("game_id")
+
+    @property
+    def winner(self) -> np.ndarray:
+        return self.column("winner")
+
+    @property
+    def loser(self) -> np.ndarray:
+        return self.column("loser")
+
+    @property
+    def duration(self) -> np.ndarray:
+        return self.column("duration")
+
+    @property
+    def day(self) -> np.ndarray:
+        return self.column("day")
+
+    @property
+    def bracket(self) -> np.ndarray:
+        return self.column("bracket")
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append_columns(self, columns: dict) -> int:
+        """Append pre-encoded column arrays; returns number of rows written"""
+        lengths = {len(columns[name]) for name in COLUMNS}
+        if len(lengths) != 1:
+            raise ValueError("All columns must have the same length")
+        count = lengths.pop()
+        if count == 0:
+            return 0
+        # 다른 프로세스의 append 와 섞이지 않도록 잠근 채 최신 크기에서 이어 쓴다
+        with store_lock(self.path):
+            self.refresh()
+            # 데이터 파일을 먼저 쓰고 meta를 마지막에 갱신 → 리더는 항상 완전한 행만 본다
+            for name, dtype in COLUMNS.items():
+                path = self.path / f"{name}.bin"
+                path.touch()
+                with open(path, "r+b") as f:
+                    # 이전 append가 meta 갱신 전에 중단됐다면 남은 꼬리 바이트를 잘라내고,
+                    # 없던 선택 컬럼이면 기존 행 수만큼 0으로 채운다
+                    f.truncate(self.size * dtype.itemsize)
+                    f.seek(0, os.SEEK_END)
+                    f.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+            self._write_meta(self.path, self.size + count, self.store_id)
+            self.refresh()
+        return count
+
+    def append(self, records) -> int:
+        """Append game log dicts; returns number of rows written"""
+        return self.append_columns(encode_records(records))
+
+    def append_file(self, src, chunk_size: int = CHUNK_SIZE) -> int:
+        """Stream a JSON/JSONL log file into the store in chunks"""
+        written = 0
+        chunk = []
+        for record in iter_log_records(src):
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                written += self.append(chunk)
+                chunk = []
+        if chunk:
+            written += self.append(chunk)
+        return written
+
+
+def _convert_locked(src, dst: Path, chunk_size: int) -> MatchStore:
+    # 임시 디렉터리에 만든 뒤 통째로 바꿔 넣는다: 리더는 반쯤 만든 스토어를 보지 않는다
+    tmp = Path(tempfile.mkdtemp(dir=dst.parent, prefix=f"{dst.name}.", suffix=".tmp"))
+    try:
+        MatchStore.create(tmp).append_file(src, chunk_size=chunk_size)
+        if dst.exists():
+            old = dst.parent / f"{dst.name}.{uuid.uuid4().hex}.old"
+            os.replace(dst, old)
+            os.replace(tmp, dst)
+            shutil.rmtree(old, ignore_errors=True)
+        else:
+            os.replace(tmp, dst)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return MatchStore(dst)
+
+
+def convert(src, dst, chunk_size: int = CHUNK_SIZE) -> MatchStore:
+    """Build a new store at dst from a JSON/JSONL game log file (replaces an existing one)"""
+    dst = Path(dst)
+    with store_lock(dst):
+        return _convert_locked(src, dst, chunk_size)
+
+
+def open_store(path, source=None) -> MatchStore:
+    """Open the store at path, converting it from source first if it doesn't exist
+
+    Concurrent callers wait for the one that converts and then open its store.
+    """
+    path = Path(path)
+    if not (path / "meta.json").exists():
+        if source is None:
+            raise FileNotFoundError(f"Match store not found: {path}")
+        with store_lock(path):
+            # 잠금을 기다리는 동안 다른 프로세스가 변환을 끝냈을 수 있다
+            if not (path / "meta.json").exists():
+                return _convert_locked(source, path, CHUNK_SIZE)
+    return MatchStore(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Game log match store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for command in ("convert", "append"):
+        p = sub.add_parser(command)
+        p.add_argument("source", help="game_logs.json or .jsonl file")
+        p.add_argument("store", help="store directory")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        store = convert(args.source, args.store)
+        print(f"✅ Converted {len(store)} matches → {args.store}")
+    else:
+        store = open_store(args.store)
+        written = store.append_file(args.source)
+        print(f"✅ Appended {written} matches → {args.store} (total {len(store)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo patch-impact simulator.
+
+Starting from the observed matchup win probabilities and matchup mix, a
+proposed patch is expressed as win-probability adjustments (percentage
+points) per matchup or per race. Each replicate first draws the baseline
+matchup probabilities from their Beta posterior (so thin data widens the
+bands), applies the patch, then draws how many of the N synthetic matches
+fall into every cross-race matchup (multinomial) and how many of those each
+side wins (binomial) - equivalent to sampling N matches one by one, but a
+replicate costs a few vector operations instead of N. Replicates can be
+split across a process pool for very large jobs.
+"""
+
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from match_store import RACES, race_code
+
+NUM_RACES = len(RACES)
+# 교차 종족 매치업 (i < j), 미러전은 종족 승률에 영향이 없으므로 제외
+PAIRS = [(i, j) for i in range(NUM_RACES) for j in range(i + 1, NUM_RACES)]
+PAIR_I = np.array([i for i, _ in PAIRS])
+PAIR_J = np.array([j for _, j in PAIRS])
+MIN_PROB = 0.01
+MAX_PROB = 0.99
+
+_pool = None
+
+
+def baseline_from_counts(counts, prior: float = 1.0):
+    """Observed matchup table -> (P(i beats j) matrix, matchup frequency per pair)
+
+    Laplace smoothing keeps unseen or one-sided matchups away from 0/1.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    games = counts + counts.T
+    prob = (counts + prior) / (games + 2 * prior)
+    pair_games = games[PAIR_I, PAIR_J]
+    if pair_games.sum() == 0:
+        freq = np.full(len(PAIRS), 1 / len(PAIRS))
+    else:
+        freq = pair_games / pair_games.sum()
+    return prob, freq
+
+
+def parse_adjustments(adjustments: dict) -> np.ndarray:
+    """{"Terran vs Zerg": -5, "Protoss": 2} (percentage points) -> delta matrix
+
+    A "A vs B" key shifts P(A beats B) and mirrors it for P(B beats A); a bare
+    race key shifts that race against every other race.
+
+    Raises:
+        ValueError: unknown race or malformed key
+    """
+    delta = np.zeros((NUM_RACES, NUM_RACES))
+    for key, value in (adjustments or {}).items():
+        points = float(value) / 100
+        names = [n for n in re.split(r"\s*(?:vs\.?|-|/)\s*", str(key).strip(), flags=re.IGNORECASE) if n]
+        codes = [race_code(n) for n in names]
+        if None in codes or len(codes) not in (1, 2):
+            raise ValueError(f"알 수 없는 조정 항목: {key} (예: 'Terran vs Zerg', 'Protoss')")
+        if len(codes) == 1:
+            others = [c for c in range(NUM_RACES) if c != codes[0]]
+            delta[codes[0], others] += points
+            delta[others, codes[0]] -= points
+        elif codes[0] != codes[1]:
+            delta[codes[0], codes[1]] += points
+            delta[codes[1], codes[0]] -= points
+    return delta
+
+
+def _simulate_chunk(pair_wins, pair_losses, delta_pairs, freq, matches: int, replicates: int, prior: float, seed):
+    rng = np.random.default_rng(seed)
+    base = rng.beta(pair_wins + prior, pair_losses + prior, size=(replicates, len(PAIRS)))
+    patched = np.clip(base + delta_pairs, MIN_PROB, MAX_PROB)
+    games = rng.multinomial(matches, freq, size=replicates)
+    wins = rng.binomial(games, patched)
+    return games, wins
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    # 풀 생성 비용이 크므로 한 번 만들어 재사용
+    global _pool
+    if _pool is None or _pool._max_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = ProcessPoolExecutor(max_workers=workers)
+    return _pool
+
+
+def simulate(counts, delta=None, matches: int = 100_000, replicates: int = 2000,
+             confidence: float = 0.95, seed=None, workers: int = 1, prior: float = 1.0) -> dict:
+    """Project race and matchup win rates after applying delta to the observed table
+
+    Args:
+        counts: Observed matchup table counts[winner, loser]
+        delta: Win-probability adjustment matrix from parse_adjustments()
+        matches: Synthetic matches per replicate
+        replicates: Number of Monte Carlo replicates
+        confidence: Band coverage
+        seed: RNG seed
+        workers: >1 splits replicates across a process pool
+        prior: Beta prior pseudo-count per side
+
+    Returns baseline/projected win probabilities per race and per matchup pair,
+    with percentile bands over the replicates.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    prob, freq = baseline_from_counts(counts, prior)
+    delta = np.zeros_like(prob) if delta is None else delta
+    args = (counts[PAIR_I, PAIR_J], counts[PAIR_J, PAIR_I], delta[PAIR_I, PAIR_J], freq, matches)
+
+    seeds = np.random.SeedSequence(seed).spawn(max(1, workers))
+    if workers > 1:
+        sizes = [len(c) for c in np.array_split(np.arange(replicates), workers)]
+        pool = _get_pool(workers)
+        futures = [
+            pool.submit(_simulate_chunk, *args, size, prior, s)
+            for size, s in zip(sizes, seeds) if size
+        ]
+        parts = [f.result() for f in futures]
+        games = np.concatenate([g for g, _ in parts])
+        wins = np.concatenate([w for _, w in parts])
+    else:
+        games, wins = _simulate_chunk(*args, replicates, prior, seeds[0])
+
+    # 매치업 결과를 종족별 승/경기 수로 환산 (replicates x races)
+    onehot_i = np.eye(NUM_RACES)[PAIR_I]
+    onehot_j = np.eye(NUM_RACES)[PAIR_J]
+    race_wins = wins @ onehot_i + (games - wins) @ onehot_j
+    race_games = games @ (onehot_i + onehot_j)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        race_rates = race_wins / race_games
+        pair_rates = wins / games
+
+    alpha = 1 - confidence
+    quantiles = [alpha / 2, 1 - alpha / 2]
+
+    def expected_race_rates(p):
+        pair_p = p[PAIR_I, PAIR_J]
+        race_w = (freq * pair_p) @ onehot_i + (freq * (1 - pair_p)) @ onehot_j
+        return race_w / (freq @ (onehot_i + onehot_j))
+
+    return {
+        "matches": matches,
+        "replicates": replicates,
+        "confidence": confidence,
+        "baseline_race": expected_race_rates(prob),
+        "projected_race": np.nanmean(race_rates, axis=0),
+        "race_band": np.nanquantile(race_rates, quantiles, axis=0),
+        "baseline_pair": prob[PAIR_I, PAIR_J],
+        "projected_pair": np.nanmean(pair_rates, axis=0),
+        "pair_band": np.nanquantile(pair_rates, quantiles, axis=0),
+    }
+
+
+def simulation_data(result: dict) -> dict:
+    """simulate() result as plain per-race / per-matchup records (for structured tool output)"""
+    races = [
+        {
+            "race": race,
+            "baseline": float(result["baseline_race"][r]),
+            "projected": float(result["projected_race"][r]),
+            "band": [float(result["race_band"][0][r]), float(result["race_band"][1][r])],
+        }
+        for r, race in enumerate(RACES)
+    ]
+    matchups = [
+        {
+            "matchup": f"{RACES[i]} vs {RACES[j]}",
+            "baseline": float(result["baseline_pair"][k]),
+            "projected": float(result["projected_pair"][k]),
+            "band": [float(result["pair_band"][0][k]), float(result["pair_band"][1][k])],
+        }
+        for k, (i, j) in enumerate(PAIRS)
+    ]
+    return {
+        "matches": result["matches"],
+        "replicates": result["replicates"],
+        "confidence": result["confidence"],
+        "races": races,
+        "matchups": matchups,
+    }
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Bradley-Terry strength ratings over match history.
+
+Every entity (a race, or a race x MMR bracket pair) gets a strength p_i with
+P(i beats j) = p_i / (p_i + p_j). Strengths are fitted with the vectorized
+minorization-maximization update (Hunter, 2004) over the whole win matrix at
+once, regularized with a few virtual games against a reference opponent of
+strength 1 so undefeated or winless entities stay finite.
+
+Fits are warm-started from the previous solution: when new matches arrive
+only the win matrix changes a little, so a handful of iterations suffice.
+"""
+
+import logging
+
+import numpy as np
+
+from match_store import BRACKETS, RACES
+
+logger = logging.getLogger(__name__)
+
+NUM_RACES = len(RACES)
+NUM_BRACKETS = len(BRACKETS)
+ELO_BASE = 1500
+ELO_SCALE = 400 / np.log(10)
+
+
+def fit_bradley_terry(wins, init=None, prior_games: float = 2.0, max_iter: int = 10000, tol: float = 1e-10):
+    """Fit strengths from a win matrix wins[i, j] (= times i beat j)
+
+    Args:
+        wins: (K, K) win count matrix
+        init: Previous strengths for a warm start
+        prior_games: Virtual games per entity vs a strength-1 reference (half won)
+        max_iter: Iteration cap
+        tol: Convergence threshold on the max relative change
+
+    Returns:
+        (strengths normalized to geometric mean 1, iterations used)
+    """
+    wins = np.asarray(wins, dtype=np.float64)
+    games = wins + wins.T
+    total_wins = wins.sum(axis=1) + prior_games / 2
+    p = np.ones(len(wins)) if init is None else np.asarray(init, dtype=np.float64).copy()
+    for iteration in range(1, max_iter + 1):
+        denom = (games / (p[:, None] + p[None, :])).sum(axis=1) + prior_games / (p + 1.0)
+        new_p = total_wins / denom
+        new_p /= np.exp(np.log(new_p).mean())
+        change = np.max(np.abs(new_p - p) / p)
+        p = new_p
+        if change < tol:
+            break
+    return p, iteration
+
+
+def to_elo(strengths) -> np.ndarray:
+    """Strengths -> Elo-equivalent ratings (400 points = 10x odds)"""
+    return ELO_BASE + ELO_SCALE * np.log(strengths)
+
+
+def win_probability(strengths) -> np.ndarray:
+    """Expected P(i beats j) matrix"""
+    p = np.asarray(strengths)
+    return p[:, None] / (p[:, None] + p[None, :])
+
+
+class RatingEngine:
+    """Race and race x bracket Bradley-Terry ratings with warm-started refits"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._race_strengths = None
+        # race x bracket 승리 행렬은 처음 요청될 때 만들고 이후엔 새 행만 반영
+        self._bracket_wins = None
+        self._bracket_rows = 0
+        self._bracket_store = None
+        self._bracket_strengths = None
+
+    def race_ratings(self, lo=None, hi=None) -> dict:
+        """Fit race strengths over a window using the engine's daily rollups"""
+        counts, _ = self.engine.matchup_table(lo, hi)
+        strengths, iterations = fit_bradley_terry(counts, init=self._race_strengths)
+        if lo is None and hi is None:
+            self._race_strengths = strengths
+        return {"strengths": strengths, "games": counts.sum(axis=1) + counts.sum(axis=0), "iterations": iterations}
+
+    def _sync_bracket_wins(self):
+        store = self.engine.store
+        store.refresh()
+        size = NUM_RACES * NUM_BRACKETS
+        # 스토어가 다시 만들어졌으면 (행 수가 더 많아도) 처음부터 센다
+        if self._bracket_wins is None or self._bracket_store != store.store_id or self._bracket_rows > len(store):
+            self._bracket_wins = np.zeros((size, size), dtype=np.int64)
+            self._bracket_rows = 0
+            self._bracket_store = store.store_id
+            self._bracket_strengths = None
+        start, end = self._bracket_rows, len(store)
+        if start == end:
+            return
+        bracket = np.asarray(store.bracket[start:end], dtype=np.int64)
+        winner = np.asarray(store.winner[start:end], dtype=np.int64) * NUM_BRACKETS + bracket
+        loser = np.asarray(store.loser[start:end], dtype=np.int64) * NUM_BRACKETS + bracket
+        self._bracket_wins += np.bincount(winner * size + loser, minlength=size * size).reshape(size, size)
+        self._bracket_rows = end
+
+    def bracket_ratings(self) -> dict:
+        """Fit race x bracket strengths over the full history (incremental)"""
+        self._sync_bracket_wins()
+        strengths, iterations = fit_bradley_terry(self._bracket_wins, init=self._bracket_strengths)
+        self._bracket_strengths = strengths
+        wins = self._bracket_wins
+        games = (wins.sum(axis=1) + wins.sum(axis=0)).reshape(NUM_RACES, NUM_BRACKETS)
+        return {
+            "strengths": strengths.reshape(NUM_RACES, NUM_BRACKETS),
+            "games": games,
+            "iterations": iterations,
+        }
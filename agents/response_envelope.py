@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Incremental extraction of the {"status", "message"} response envelope.
+
+The agents are prompted to answer with a JSON envelope, but the model output
+around it varies: leading prose, ``<thinking>`` / ``<response>`` tags, and
+messages that themselves contain braces. ``EnvelopeParser`` is fed the text
+as it streams in and
+
+- skips ``<thinking>...</thinking>`` blocks (also when a tag is split across
+  chunks)
+- tracks brace depth with JSON string/escape awareness, so ``}`` inside the
+  message does not end the object
+- falls back to scanning every ``{`` with a real JSON decoder at the end, and
+  finally to the cleaned text with the default status
+
+Executors use ``run_agent_envelope`` to stream a Strands run through the
+parser and branch on the status once the turn has finished; the GUIs use the
+same parser on the /ask_stream answer to show the message as it streams.
+"""
+
+import json
+import re
+import threading
+
+from serialization import loads
+
+THINK_OPEN = "<thinking>"
+THINK_CLOSE = "</thinking>"
+_TAGS = re.compile(r"<thinking>.*?(?:</thinking>|$)|</?response>", re.DOTALL)
+
+
+def strip_tags(text: str) -> str:
+    """Remove <thinking> blocks (also an unterminated trailing one) and <response> tags"""
+    return _TAGS.sub("", text or "").strip()
+
+
+def split_thinking(text: str):
+    """Response text -> ([thinking blocks], answer without tags)"""
+    thinking = [t.strip() for t in re.findall(r"<thinking>(.*?)</thinking>", text or "", re.DOTALL)]
+    return thinking, strip_tags(text)
+
+
+class EnvelopeParser:
+    """Streaming parser for the {"status": ..., "message": ...} envelope"""
+
+    def __init__(self, default_status: str = "completed"):
+        self.default_status = default_status
+        self.buffer = ""
+        self.envelope = None
+        self._pos = 0
+        self._in_thinking = False
+        self._reset_object()
+
+    def _reset_object(self):
+        self._start = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def complete(self) -> bool:
+        return self.envelope is not None
+
+    def feed(self, chunk: str):
+        if not chunk or self.envelope is not None:
+            self.buffer += chunk or ""
+            return
+        self.buffer += chunk
+        self._scan()
+
+    def _scan(self):
+        buf = self.buffer
+        i = self._pos
+        while i < len(buf) and self.envelope is None:
+            if self._in_thinking:
+                end = buf.find(THINK_CLOSE, i)
+                if end < 0:
+                    # 닫는 태그가 청크 경계에 걸쳐 있을 수 있으므로 끝부분은 다시 본다
+                    i = max(i, len(buf) - len(THINK_CLOSE) + 1)
+                    break
+                i = end + len(THINK_CLOSE)
+                self._in_thinking = False
+                continue
+
+            ch = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                i += 1
+                continue
+
+            if ch == "<" and self._start is None:
+                rest = buf[i:i + len(THINK_OPEN)]
+                if rest == THINK_OPEN:
+                    self._in_thinking = True
+                    i += len(THINK_OPEN)
+                    continue
+                if THINK_OPEN.startswith(rest):
+                    # "<thin" 처럼 잘린 태그: 다음 청크를 기다린다
+                    break
+            elif ch == "{":
+                if self._start is None:
+                    self._start = i
+                self._depth += 1
+            elif ch == "}" and self._start is not None:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._on_object(buf[self._start:i + 1])
+                    self._reset_object()
+            elif ch == '"' and self._start is not None:
+                self._in_string = True
+            i += 1
+        self._pos = i
+
+    def _on_object(self, text: str):
+        try:
+            obj = loads(text)
+        except ValueError:
+            obj = None
+        if isinstance(obj, dict) and ("status" in obj or "message" in obj):
+            self.envelope = obj
+
+    def finish(self):
+        """(status, message) once the stream has ended"""
+        if self.envelope is None:
+            self.envelope = _decode_any(strip_tags(self.buffer))
+        if self.envelope is not None:
+            status = self.envelope.get("status") or self.default_status
+            message = self.envelope.get("message")
+            if not isinstance(message, str):
+                message = json.dumps(message, ensure_ascii=False) if message is not None else ""
+            return status, message
+        return self.default_status, strip_tags(self.buffer)
+
+
+def _decode_any(text: str):
+    """First JSON object with status/message found at any '{' in text"""
+    decoder = json.JSONDecoder()
+    start = text.find("{")
+    while start >= 0:
+        try:
+            obj, _ = decoder.raw_decode(text, start)
+            if isinstance(obj, dict) and ("status" in obj or "message" in obj):
+                return obj
+        except ValueError:
+            pass
+        start = text.find("{", start + 1)
+    return None
+
+
+def parse_envelope(text: str, default_status: str = "completed"):
+    """Whole response text -> (status, message)"""
+    parser = EnvelopeParser(default_status)
+    parser.feed(text)
+    return parser.finish()
+
+
+async def run_agent_envelope(agent, prompt, cancellation=None, on_tool=None) -> EnvelopeParser:
+    """Stream a Strands agent run through an EnvelopeParser
+
+    The turn always runs to the end, even after the envelope has closed:
+    cancelling it would make Strands record "Cancelled by user" in place of
+    the answer, and follow-up turns of the conversation would lose it. Only
+    a user cancel on ``cancellation`` stops the run.
+
+    Args:
+        on_tool: Optional async callback(tool_name), awaited once per tool
+            call as soon as the model starts it (progress reporting)
+    """
+    stop = threading.Event()
+    discard = None
+    if cancellation is not None:
+        async def propagate():
+            stop.set()
+        discard = cancellation.on_cancel(propagate)
+        if cancellation.cancelled:
+            stop.set()
+
+    parser = EnvelopeParser()
+    final_text = None
+    tools_seen = set()
+    try:
+        async for event in agent.stream_async(prompt, cancel_signal=stop):
+            if "current_tool_use" in event and on_tool is not None:
+                # 도구 입력이 스트리밍되는 동안 같은 이벤트가 반복되므로 ID당 한 번만
+                tool_use = event["current_tool_use"]
+                if tool_use.get("toolUseId") not in tools_seen:
+                    tools_seen.add(tool_use.get("toolUseId"))
+                    await on_tool(tool_use.get("name", ""))
+            elif "data" in event:
+                parser.feed(event["data"])
+            elif "result" in event:
+                final_text = str(event["result"])
+    finally:
+        if discard:
+            discard()
+
+    if not parser.buffer and final_text:
+        # 스트리밍 텍스트 이벤트가 없었던 경우 최종 결과로 파싱
+        parser.feed(final_text)
+    return parser
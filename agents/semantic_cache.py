@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Semantic answer cache.
+
+Users ask the same thing in many ways ("테란 승률 알려줘" / "테란 이기는 비율은?"),
+so exact-match caching rarely hits. Queries are instead
+
+1. normalized: NFKC + lowercase, punctuation, request endings ("알려줘",
+   "보여줘", ...) and trailing particles removed, domain synonyms mapped to
+   one term ("이기는 비율" → "승률")
+2. embedded locally with a signed hashing vectorizer over character 2/3-grams
+   (no model, no external service)
+3. looked up in an in-memory random-hyperplane LSH index and accepted only
+   above a cosine threshold
+
+Questions about different races, topics, filters or numbers must never
+share an answer, however similar the wording, so entries are also keyed by
+the entities in the query (race, topic, urgency/period qualifiers,
+numbers). The whole cache is dropped when the data version reported by
+``version`` changes, and entries expire after a TTL.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DIM = 1 << 12
+NGRAMS = (2, 3)
+LSH_TABLES = 16
+LSH_BITS = 6
+
+THRESHOLD_ENV = "SEMANTIC_CACHE_THRESHOLD"
+SIZE_ENV = "SEMANTIC_CACHE_SIZE"
+TTL_ENV = "SEMANTIC_CACHE_TTL"
+
+# 같은 뜻의 표현을 하나로 (긴 표현부터 치환)
+SYNONYMS = [
+    ("이기는 비율", "승률"), ("이길 확률", "승률"), ("승리 확률", "승률"), ("승리 비율", "승률"),
+    ("승리율", "승률"), ("win rate", "승률"), ("winrate", "승률"),
+    ("플레이 시간", "경기 시간"), ("게임 시간", "경기 시간"), ("게임 길이", "경기 시간"),
+    ("상성", "매치업"), ("matchup", "매치업"),
+    ("컴플레인", "피드백"), ("불만", "피드백"), ("민원", "피드백"),
+    ("제일", "가장"), ("강해", "강한"),
+    ("terran", "테란"), ("zerg", "저그"), ("protoss", "프로토스"),
+]
+_FILLER = re.compile(
+    r"(알려\s?주세요|알려\s?줘|보여\s?주세요|보여\s?줘|말해\s?줘|어떤가요|어때요|어때|뭐야|궁금해요|궁금해|해\s?줘|주세요|좀)"
+)
+# 단어 끝 조사 ("테란의", "승률은", "1.0.1에서")
+_PARTICLE = re.compile(r"(?<=[가-힣\d])(에서|으로|은|는|이|가|을|를|의|에|로|과|와|도)(?=\s|$)")
+RACES = {"테란": "terran", "terran": "terran", "저그": "zerg", "zerg": "zerg",
+         "프로토스": "protoss", "토스": "protoss", "protoss": "protoss"}
+# 답을 바꾸는 주제/조건 단어: 표현이 비슷해도 이것이 다르면 다른 질문
+QUALIFIERS = {
+    "승률": "win_rate", "경기 시간": "duration", "매치업": "matchup", "피드백": "feedback",
+    "레이팅": "rating", "강한": "rating", "강함": "rating", "패치": "patch",
+    "긴급": "urgency", "high": "urgency", "medium": "urgency", "low": "urgency",
+    "최근": "recent", "지난": "recent", "이번": "recent", "오늘": "recent", "어제": "recent", "요즘": "recent",
+    "트렌드": "trend", "키워드": "trend", "많이": "trend",
+    "티어": "bracket", "브래킷": "bracket", "구간": "bracket",
+}
+_NUMBER = re.compile(r"\d+(?:\.\d+)*")
+
+
+def normalize(query: str) -> str:
+    text = unicodedata.normalize("NFKC", query or "").lower()
+    text = re.sub(r"[^\w\s.]", " ", text)
+    # 숫자 사이의 점(패치 버전 1.0.1)만 남긴다
+    text = re.sub(r"(?<!\d)\.|\.(?!\d)", " ", text)
+    text = re.sub(r"\s+", " ", text)
+    for phrase, canonical in SYNONYMS:
+        text = text.replace(phrase, canonical)
+    text = _FILLER.sub(" ", text)
+    text = _PARTICLE.sub("", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def entities(normalized: str) -> tuple:
+    """Races, topics, conditions and numbers (patch versions, day counts) the answer depends on"""
+    found = {race for name, race in RACES.items() if name in normalized}
+    found.update(tag for word, tag in QUALIFIERS.items() if word in normalized)
+    found.update(_NUMBER.findall(normalized))
+    return tuple(sorted(found))
+
+
+def embed(normalized: str) -> np.ndarray:
+    """L2-normalized signed hashing vector of character n-grams"""
+    vector = np.zeros(DIM, dtype=np.float32)
+    padded = f" {normalized} "
+    for n in NGRAMS:
+        for i in range(len(padded) - n + 1):
+            h = zlib.crc32(padded[i:i + n].encode())
+            vector[h % DIM] += 1.0 if h & 0x80000000 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SemanticCache:
+    """Answers keyed by query meaning (LSH over n-gram embeddings)"""
+
+    def __init__(self, version=None, threshold: float = None, max_entries: int = None, ttl: float = None, seed: int = 0):
+        """
+        Args:
+            version: Callable returning the current data version; a change
+                clears the cache
+            threshold: Minimum cosine similarity for a hit (default 0.8)
+            max_entries: LRU capacity (default 1024)
+            ttl: Seconds an answer stays valid (default 600)
+        """
+        self.version = version
+        self.threshold = threshold if threshold is not None else float(os.environ.get(THRESHOLD_ENV, "0.8"))
+        self.max_entries = max_entries if max_entries is not None else int(os.environ.get(SIZE_ENV, "1024"))
+        self.ttl = ttl if ttl is not None else float(os.environ.get(TTL_ENV, "600"))
+        self.seed = seed
+        # 초평면(약 1.5MB)은 첫 조회 때 만든다 (에이전트 import 시간 단축)
+        self._planes = None
+        self._weights = 1 << np.arange(LSH_BITS)
+        self._lock = threading.Lock()
+        self._version = None
+        self._clear()
+
+    def _clear(self):
+        self.entries = OrderedDict()
+        self._buckets = [dict() for _ in range(LSH_TABLES)]
+        self._next_id = 0
+
+    def _keys(self, vector: np.ndarray) -> list:
+        if self._planes is None:
+            rng = np.random.default_rng(self.seed)
+            self._planes = rng.standard_normal((LSH_TABLES * LSH_BITS, DIM)).astype(np.float32)
+        bits = (self._planes @ vector > 0).reshape(LSH_TABLES, LSH_BITS)
+        return (bits @ self._weights).tolist()
+
+    def _check_version(self):
+        if self.version is None:
+            return
+        current = self.version()
+        if current != self._version:
+            if self.entries:
+                logger.info(f"Data version changed ({self._version} → {current}), clearing {len(self.entries)} cached answers")
+            self._clear()
+            self._version = current
+
+    def lookup(self, query: str):
+        """Best cached answer for a query with the same meaning, or None
+
+        Returns a dict with query, answer, data and similarity.
+        """
+        normalized = normalize(query)
+        if not normalized:
+            return None
+        vector = embed(normalized)
+        signature = entities(normalized)
+        with self._lock:
+            self._check_version()
+            candidates = set()
+            for table, key in zip(self._buckets, self._keys(vector)):
+                candidates.update(table.get((signature, key), ()))
+            best, best_score = None, self.threshold
+            now = time.time()
+            for entry_id in candidates:
+                entry = self.entries[entry_id]
+                if now - entry["created"] > self.ttl:
+                    continue
+                score = float(vector @ entry["vector"])
+                if score >= best_score:
+                    best, best_score = entry_id, score
+            if best is None:
+                return None
+            self.entries.move_to_end(best)
+            entry = self.entries[best]
+            return {"query": entry["query"], "answer": entry["answer"], "data": entry["data"], "similarity": best_score}
+
+    def store(self, query: str, answer: str, data=()):
+        normalized = normalize(query)
+        if not normalized or not answer:
+            return
+        vector = embed(normalized)
+        signature = entities(normalized)
+        with self._lock:
+            self._check_version()
+            entry_id = self._next_id
+            self._next_id += 1
+            keys = [(signature, key) for key in self._keys(vector)]
+            self.entries[entry_id] = {
+                "query": query, "answer": answer, "data": list(data), "vector": vector,
+                "keys": keys, "created": time.time(),
+            }
+            for table, key in zip(self._buckets, keys):
+                table.setdefault(key, set()).add(entry_id)
+            while len(self.entries) > self.max_entries:
+                self._remove(next(iter(self.entries)))
+
+    def _remove(self, entry_id):
+        entry = self.entries.pop(entry_id)
+        for table, key in zip(self._buckets, entry["keys"]):
+            bucket = table.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del table[key]
+
+    def __len__(self):
+        return len(self.entries)
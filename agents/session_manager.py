@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Per-conversation Strands agents.
+
+A single module-level ``Agent`` is shared by every request: its message list
+grows with everyone's turns, and Strands refuses concurrent invocations of
+the same instance. ``AgentSessions`` gives each A2A ``context_id`` (or GUI
+session) its own agent instead:
+
+- hot sessions stay in memory in an LRU of at most ``SESSION_MAX_HOT``
+- evicted sessions are spilled to ``SESSION_DIR`` as JSON (off the event
+  loop; image/document bytes as base64) and restored the next time the
+  context is used; spill files unused for ``SESSION_TTL_DAYS`` are deleted
+- each agent keeps at most ``AGENT_MAX_MESSAGES`` messages (Strands sliding
+  window, also applied when a spilled session is restored)
+- turns of the same session run one at a time (per-session lock)
+
+Prompt size and memory therefore stay bounded by the configuration rather
+than by server uptime.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from strands.agent.conversation_manager import SlidingWindowConversationManager
+
+logger = logging.getLogger(__name__)
+
+MAX_HOT_ENV = "SESSION_MAX_HOT"
+MAX_MESSAGES_ENV = "AGENT_MAX_MESSAGES"
+SESSION_DIR_ENV = "SESSION_DIR"
+SESSION_TTL_ENV = "SESSION_TTL_DAYS"
+# 스필 파일에서 bytes 값을 나타내는 키
+BYTES_KEY = "__bytes__"
+
+
+_models = {}
+
+
+def bedrock_model(model_id: str = "us.amazon.nova-lite-v1:0", temperature: float = 0.3):
+    """Bedrock model shared by every session agent, created on first use
+
+    Building the boto3 client is deferred so importing an agent module does
+    no AWS setup (fast cold start, see startup.py).
+    """
+    key = (model_id, temperature)
+    if key not in _models:
+        from strands.models.bedrock import BedrockModel
+        _models[key] = BedrockModel(model_id=model_id, temperature=temperature)
+    return _models[key]
+
+
+def max_messages() -> int:
+    return int(os.environ.get(MAX_MESSAGES_ENV, "40"))
+
+
+def conversation_manager():
+    """Sliding window that caps an agent's message list"""
+    return SlidingWindowConversationManager(window_size=max_messages())
+
+
+def trim_messages(messages: list, limit: int) -> list:
+    """Last ``limit`` messages, starting at a user text turn (no orphan toolResult)"""
+    messages = messages[-limit:] if limit > 0 else []
+    for i, message in enumerate(messages):
+        if message.get("role") == "user" and not any("toolResult" in block for block in message.get("content", [])):
+            return messages[i:]
+    return []
+
+
+def _encode(value):
+    """json.dumps default: bytes (image/document blocks) as {"__bytes__": base64}"""
+    # str() 로 바꾸면 "b'...'" 문자열이 되어 복원할 수 없다
+    if isinstance(value, (bytes, bytearray)):
+        return {BYTES_KEY: base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _decode(obj: dict):
+    if len(obj) == 1 and BYTES_KEY in obj:
+        return base64.b64decode(obj[BYTES_KEY])
+    return obj
+
+
+def messages_since(agent, known: set) -> list:
+    """Messages added after ``known = {id(m) for m in agent.messages}`` was taken
+
+    Index-based slicing breaks once the sliding window drops old messages
+    during the turn, so messages are matched by identity.
+    """
+    return [message for message in agent.messages if id(message) not in known]
+
+
+def record_turn(agent, prompt: str, answer: str):
+    """Add a turn answered without running the agent (semantic cache hit) to its history"""
+    agent.messages.extend([
+        {"role": "user", "content": [{"text": prompt}]},
+        {"role": "assistant", "content": [{"text": answer}]},
+    ])
+
+
+class AgentSessions:
+    """LRU of per-session Strands agents with disk spill"""
+
+    def __init__(self, factory, name: str, max_hot: int = None, spill_dir=None, ttl_days: float = None):
+        """
+        Args:
+            factory: ``factory(messages)`` -> new Agent holding those messages
+            name: Agent name, used for the default spill directory
+            max_hot: Sessions kept in memory (default $SESSION_MAX_HOT or 64)
+            spill_dir: Where evicted sessions go (default $SESSION_DIR/<name>)
+            ttl_days: Delete spill files unused for this long (default 7)
+        """
+        self.factory = factory
+        self.max_hot = max_hot if max_hot is not None else int(os.environ.get(MAX_HOT_ENV, "64"))
+        base = os.environ.get(SESSION_DIR_ENV) or Path(tempfile.gettempdir()) / "agent_sessions"
+        self.spill_dir = Path(spill_dir) if spill_dir is not None else Path(base) / name
+        self.ttl = (ttl_days if ttl_days is not None else float(os.environ.get(SESSION_TTL_ENV, "7"))) * 86400
+        self.hot = OrderedDict()
+        self._locks = {}
+        # 디스크에 쓰는 중인 세션: 끝나기 전에 다시 쓰이면 쓰기를 기다렸다가 복원한다
+        self._spilling = {}
+        self._pruned_at = 0.0
+
+    @asynccontextmanager
+    async def session(self, session_id: str = None):
+        """Agent for one conversation turn; ``None`` gives a throwaway agent"""
+        if session_id is None:
+            yield self.factory(None)
+            return
+        lock = self._locks.setdefault(session_id, asyncio.Lock())
+        async with lock:
+            agent = self.hot.get(session_id)
+            if agent is None:
+                spill = self._spilling.get(session_id)
+                if spill is not None:
+                    await asyncio.shield(spill)
+                agent = self.factory(await asyncio.to_thread(self._restore, session_id))
+                self.hot[session_id] = agent
+            self.hot.move_to_end(session_id)
+            try:
+                yield agent
+            finally:
+                await self._evict()
+
+    async def _evict(self):
+        for session_id in list(self.hot):
+            if len(self.hot) <= self.max_hot:
+                break
+            lock = self._locks.get(session_id)
+            if lock is not None and lock.locked():
+                # 실행 중인 세션은 건너뛰고 다음으로 오래된 세션을 내보낸다
+                continue
+            agent = self.hot.pop(session_id)
+            self._locks.pop(session_id, None)
+            spill = asyncio.ensure_future(self._spill(session_id, agent))
+            self._spilling[session_id] = spill
+            spill.add_done_callback(lambda done, key=session_id: self._spilled(key, done))
+            # 이 턴이 취소되어도 쓰기는 끝까지 한다
+            await asyncio.shield(spill)
+
+    def _spilled(self, session_id: str, spill):
+        if self._spilling.get(session_id) is spill:
+            del self._spilling[session_id]
+
+    def _path(self, session_id: str) -> Path:
+        return self.spill_dir / f"{hashlib.sha1(session_id.encode()).hexdigest()}.json"
+
+    async def _spill(self, session_id: str, agent):
+        messages = trim_messages(list(agent.messages), max_messages())
+        if not messages:
+            return
+        try:
+            await asyncio.to_thread(self._write, self._path(session_id), messages)
+        except (OSError, TypeError, ValueError) as e:
+            # JSON 으로 옮길 수 없는 블록이 있으면 깨진 세션을 남기느니 버린다
+            logger.warning(f"Could not spill session {session_id}: {e}")
+        await asyncio.to_thread(self._prune)
+
+    def _write(self, path: Path, messages: list):
+        data = json.dumps(messages, ensure_ascii=False, default=_encode)
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(data)
+        os.replace(tmp, path)
+
+    def _restore(self, session_id: str):
+        path = self._path(session_id)
+        try:
+            messages = json.loads(path.read_text(), object_hook=_decode)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable session {session_id}: {e}")
+            return None
+        finally:
+            path.unlink(missing_ok=True)
+        return trim_messages(messages, max_messages()) or None
+
+    def _prune(self):
+        # 스필 디렉터리 전체를 훑으므로 한 시간에 한 번만
+        now = time.time()
+        if now - self._pruned_at < 3600:
+            return
+        self._pruned_at = now
+        cutoff = now - self.ttl
+        for path in self.spill_dir.glob("*.json"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+
+    def __len__(self):
+        return len(self.hot)
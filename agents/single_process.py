@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Single-process deployment of all three agents.
+
+For a single host, running the coordinator, CS and data agents as three
+processes costs two extra interpreters and a JSON-RPC/HTTP round trip per
+sub-agent event. Here all three executors share one process and one event
+loop:
+
+- the coordinator calls the CS and data agents through ``InProcessTransport``
+  (their request handlers directly, no sockets or serialization)
+- every agent still serves its own A2A endpoint and /ask_stream on the usual
+  port (9001 / 9002 / 9003), so the GUIs and external A2A clients work as
+  before
+- in-process calls made from the coordinator's /ask_stream worker thread
+  are run on the server loop, and each agent keeps its own admission
+  controller, so per-agent limits hold as in separate processes
+
+Usage: python agents/single_process.py
+"""
+
+import startup
+startup.begin()
+
+import asyncio
+import logging
+import signal
+from contextlib import nullcontext
+
+import uvicorn
+
+import cs_feedback_agent
+import data_analysis_agent
+import data_analysis_agent_executor
+import game_balance_agent
+
+startup.phase("imports")
+
+logger = logging.getLogger(__name__)
+
+SERVERS = [
+    (game_balance_agent.app, "127.0.0.1", 9001),
+    (cs_feedback_agent.app, "0.0.0.0", 9002),
+    (data_analysis_agent.app, "0.0.0.0", 9003),
+]
+
+
+def connect_in_process(client=None):
+    """Route the coordinator's sub-agent calls to the handlers in this process"""
+    client = client or game_balance_agent.a2a_client
+    client.connect_local("cs", cs_feedback_agent.agent_card, cs_feedback_agent.request_handler)
+    client.connect_local("data", data_analysis_agent.agent_card, data_analysis_agent.request_handler)
+
+
+async def serve_all():
+    # 핸들러·세션 락·admission 은 이 루프 소속: 다른 루프에서 온 in-process 호출은 여기로 넘긴다
+    game_balance_agent.a2a_client.local_loop = asyncio.get_running_loop()
+    servers = [uvicorn.Server(uvicorn.Config(app, host=host, port=port)) for app, host, port in SERVERS]
+    # uvicorn 서버마다 시그널을 따로 잡으면 종료가 연쇄적으로 재전파되므로, 한 곳에서 모두 멈춘다
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, lambda: [setattr(server, "should_exit", True) for server in servers])
+    for server in servers:
+        server.capture_signals = nullcontext
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+connect_in_process()
+startup.phase("app build")
+
+if __name__ == "__main__":
+    if startup.profiling():
+        print(startup.report("All agents (single process)"))
+        raise SystemExit
+    logger.info("Starting all agents in one process on ports 9001-9003...")
+    data_analysis_agent_executor.start_drift_watcher()
+    asyncio.run(serve_all())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+SQLite-backed A2A task store.
+
+InMemoryTaskStore keeps tasks inside one process, so a multi-turn task
+(input_required -> follow-up) only works when the follow-up reaches the same
+worker. This store keeps every task in one SQLite file (WAL mode) that all
+workers of an agent share, so any worker can load the task history.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from a2a.server.tasks import InMemoryTaskStore, TaskStore
+from a2a.types import Task
+
+logger = logging.getLogger(__name__)
+
+TASK_STORE_ENV = "A2A_TASK_STORE"
+
+
+class SQLiteTaskStore(TaskStore):
+    """TaskStore persisted in a SQLite file shared between worker processes"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            # WAL: 여러 워커가 동시에 읽고, 쓰기는 짧게 직렬화
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                "id TEXT PRIMARY KEY, context_id TEXT, data TEXT NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def _save(self, task: Task):
+        data = task.model_dump_json(by_alias=True, exclude_none=True)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tasks (id, context_id, data, updated) VALUES (?, ?, ?, ?)",
+                (task.id, task.context_id, data, time.time()),
+            )
+
+    def _get(self, task_id: str):
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return Task.model_validate_json(row[0]) if row else None
+
+    def _delete(self, task_id: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    async def save(self, task: Task, context=None) -> None:
+        await asyncio.to_thread(self._save, task)
+
+    async def get(self, task_id: str, context=None):
+        return await asyncio.to_thread(self._get, task_id)
+
+    async def delete(self, task_id: str, context=None) -> None:
+        await asyncio.to_thread(self._delete, task_id)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def create_task_store() -> TaskStore:
+    """SQLiteTaskStore when A2A_TASK_STORE is set (multi-worker mode), else in-memory"""
+    path = os.environ.get(TASK_STORE_ENV)
+    if path:
+        logger.info(f"Using shared task store: {path}")
+        return SQLiteTaskStore(path)
+    return InMemoryTaskStore()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Cold-start profiling for the agent servers.
+
+``python agents/<agent>.py --profile-startup`` imports and builds the agent
+exactly like a normal start, then prints where the time went and exits
+instead of serving:
+
+- per-module import time, measured by a meta path hook installed before the
+  agent's own imports (inclusive = with the modules it imports, self = its
+  own top-level code), summed per top-level package and listed for the
+  slowest modules
+- the phases the agent marks with ``phase()`` (imports, app build)
+
+Agents call ``begin()`` before any other import and ``phase()`` after each
+startup step; without the flag both only record a timestamp.
+"""
+
+import importlib.machinery
+import sys
+import time
+from collections import defaultdict
+
+PROFILE_FLAG = "--profile-startup"
+
+_started = time.perf_counter()
+_last = _started
+_phases = []
+_profiler = None
+_FILE_LOADERS = (
+    importlib.machinery.SourceFileLoader,
+    importlib.machinery.SourcelessFileLoader,
+    importlib.machinery.ExtensionFileLoader,
+)
+
+
+class ImportProfiler:
+    """Meta path finder that times ``exec_module`` of every file-based module"""
+
+    def __init__(self):
+        self.inclusive = {}
+        self.self_time = {}
+        self._stack = []
+
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is None:
+                continue
+            # 빌트인/프로즌 로더는 클래스 단위로 공유되므로 파일 로더 인스턴스만 감싼다
+            if isinstance(spec.loader, _FILE_LOADERS):
+                self._wrap(spec.loader, name)
+            return spec
+        return None
+
+    def _wrap(self, loader, name):
+        exec_module = loader.exec_module
+
+        def timed(module):
+            self._stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                elapsed = time.perf_counter() - start
+                children = self._stack.pop()
+                if self._stack:
+                    self._stack[-1] += elapsed
+                self.inclusive[name] = elapsed
+                self.self_time[name] = elapsed - children
+
+        loader.exec_module = timed
+
+    def by_package(self) -> list:
+        totals = defaultdict(float)
+        for name, seconds in self.self_time.items():
+            totals[name.partition(".")[0]] += seconds
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+    def slowest(self, limit: int) -> list:
+        return sorted(self.inclusive.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+def profiling() -> bool:
+    return PROFILE_FLAG in sys.argv
+
+
+def begin():
+    """Start the clock (and the import hook with --profile-startup); call before other imports"""
+    global _profiler
+    if profiling() and _profiler is None:
+        _profiler = ImportProfiler()
+        sys.meta_path.insert(0, _profiler)
+
+
+def phase(name: str):
+    """Record the time since the previous phase (prefixed with the module unless it is __main__)"""
+    global _last
+    now = time.perf_counter()
+    module = sys._getframe(1).f_globals.get("__name__")
+    if module != "__main__":
+        name = f"{module}: {name}"
+    _phases.append((name, now - _last))
+    _last = now
+
+
+def report(name: str, limit: int = 15) -> str:
+    """Startup profile as text"""
+    lines = [f"⏱️ Startup profile ({name}): {time.perf_counter() - _started:.3f}s"]
+    lines += [f"  {phase_name:<56}{seconds * 1000:9.1f} ms" for phase_name, seconds in _phases]
+    if _profiler is not None:
+        lines.append("")
+        lines.append("Import time by package (self):")
+        lines += [f"  {package:<56}{seconds * 1000:9.1f} ms" for package, seconds in _profiler.by_package()[:limit]]
+        lines.append("")
+        lines.append("Slowest modules (inclusive / self):")
+        lines += [
+            f"  {module:<56}{seconds * 1000:9.1f} ms {_profiler.self_time[module] * 1000:9.1f} ms"
+            for module, seconds in _profiler.slowest(limit)
+        ]
+    return "\n".join(lines)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Structured tool outputs.
+
+Tools return a Strands ToolResult with a one-line text summary plus a
+``json`` block holding the numbers (rates, intervals, matchup tables). The
+LLM reads the compact JSON instead of re-parsing formatted prose, and the
+executors attach the same payloads to their A2A artifacts as ``DataPart``s
+next to the text answer, so the coordinator (or any A2A client) can use the
+numbers directly.
+"""
+
+import numpy as np
+from a2a.types import DataPart, Part, TextPart
+
+
+def to_jsonable(value, digits: int = 4):
+    """numpy scalars/arrays -> plain Python (floats rounded), recursively"""
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v, digits) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v, digits) for v in value]
+    if isinstance(value, np.ndarray):
+        return to_jsonable(value.tolist(), digits)
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        value = float(value)
+        return round(value, digits) if np.isfinite(value) else None
+    return value
+
+
+def tool_result(summary: str, data: dict) -> dict:
+    """Successful ToolResult: short text summary + JSON payload"""
+    return {"status": "success", "content": [{"text": summary}, {"json": to_jsonable(data)}]}
+
+
+def tool_error(message: str) -> dict:
+    """Failed ToolResult (unknown race, bad window, no data)"""
+    return {"status": "error", "content": [{"text": message}]}
+
+
+def collect_tool_data(messages) -> list:
+    """[{"tool": name, "data": payload}] for every JSON tool result in the messages"""
+    names = {}
+    payloads = []
+    for message in messages:
+        for block in message.get("content", []):
+            if "toolUse" in block:
+                names[block["toolUse"]["toolUseId"]] = block["toolUse"]["name"]
+            elif "toolResult" in block:
+                result = block["toolResult"]
+                if result.get("status") != "success":
+                    continue
+                for item in result.get("content", []):
+                    if "json" in item:
+                        payloads.append({"tool": names.get(result.get("toolUseId"), "unknown"), "data": item["json"]})
+    return payloads
+
+
+def tool_names(messages) -> set:
+    """Names of the tools called in the messages"""
+    return {
+        block["toolUse"]["name"]
+        for message in messages for block in message.get("content", []) if "toolUse" in block
+    }
+
+
+def artifact_parts(text: str, payloads=()) -> list:
+    """Artifact parts: the text answer followed by one DataPart per tool payload"""
+    return [Part(TextPart(text=text))] + [Part(DataPart(data=payload)) for payload in payloads]
+
+
+def split_parts(parts):
+    """Artifact parts -> (text, [data payloads])"""
+    text = ""
+    data = []
+    for part in parts:
+        root = getattr(part, "root", part)
+        if getattr(root, "kind", None) == "data":
+            data.append(root.data)
+        elif hasattr(root, "text"):
+            text += root.text
+    return text, data
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Vectorized win-rate statistics: confidence intervals, binomial tests against
+50%, and batched bootstrap intervals for means.
+
+Every function takes arrays of wins/games (one entry per race or matchup) and
+evaluates all groups in one pass. Only numpy and the standard library are
+used; the regularized incomplete beta function needed for Clopper-Pearson
+intervals and exact binomial p-values is a vectorized continued fraction.
+"""
+
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+_EPS = 1e-15
+_TINY = 1e-300
+_MAX_CF_ITER = 20000
+_QUANTILE_ITER = 100
+
+_lgamma = np.vectorize(math.lgamma, otypes=[np.float64])
+
+
+def _z(confidence: float) -> float:
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def _betacf(a, b, x):
+    """Continued fraction for the incomplete beta (Lentz), vectorized"""
+    qab = a + b
+    qap = a + 1.0
+    qam = a - 1.0
+    c = np.ones_like(x)
+    d = 1.0 - qab * x / qap
+    d = np.where(np.abs(d) < _TINY, _TINY, d)
+    d = 1.0 / d
+    h = d.copy()
+    active = np.ones(x.shape, dtype=bool)
+    for m in range(1, _MAX_CF_ITER + 1):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = np.where(np.abs(d) < _TINY, _TINY, d)
+        c = 1.0 + aa / c
+        c = np.where(np.abs(c) < _TINY, _TINY, c)
+        d = 1.0 / d
+        h = np.where(active, h * d * c, h)
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = np.where(np.abs(d) < _TINY, _TINY, d)
+        c = 1.0 + aa / c
+        c = np.where(np.abs(c) < _TINY, _TINY, c)
+        d = 1.0 / d
+        delta = d * c
+        h = np.where(active, h * delta, h)
+        active &= np.abs(delta - 1.0) > _EPS
+        if not active.any():
+            break
+    return h
+
+
+def betainc(a, b, x):
+    """Regularized incomplete beta I_x(a, b), elementwise over broadcast arrays"""
+    a, b, x = np.broadcast_arrays(
+        np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64), np.asarray(x, dtype=np.float64)
+    )
+    a, b, x = a.copy(), b.copy(), np.clip(x, 0.0, 1.0)
+    result = np.zeros(x.shape)
+    inner = (x > 0) & (x < 1)
+    result[x >= 1] = 1.0
+    if not inner.any():
+        return result
+    a_i, b_i, x_i = a[inner], b[inner], x[inner]
+    log_front = (
+        _lgamma(a_i + b_i) - _lgamma(a_i) - _lgamma(b_i)
+        + a_i * np.log(x_i) + b_i * np.log1p(-x_i)
+    )
+    front = np.exp(log_front)
+    # 수렴이 빠른 쪽으로 대칭 변환: I_x(a,b) = 1 - I_{1-x}(b,a)
+    direct = x_i < (a_i + 1.0) / (a_i + b_i + 2.0)
+    aa = np.where(direct, a_i, b_i)
+    bb = np.where(direct, b_i, a_i)
+    xx = np.where(direct, x_i, 1.0 - x_i)
+    cf = front * _betacf(aa, bb, xx) / aa
+    result[inner] = np.where(direct, cf, 1.0 - cf)
+    return result
+
+
+def binom_cdf(k, n, p):
+    """P(X <= k) for X ~ Binomial(n, p), vectorized"""
+    k = np.asarray(k, dtype=np.float64)
+    n = np.asarray(n, dtype=np.float64)
+    k, n, p = np.broadcast_arrays(k, n, np.asarray(p, dtype=np.float64))
+    out = np.ones(k.shape)
+    out[k < 0] = 0.0
+    mid = (k >= 0) & (k < n)
+    if mid.any():
+        out[mid] = betainc(n[mid] - k[mid], k[mid] + 1, 1.0 - p[mid])
+    return out
+
+
+def wilson_interval(wins, games, confidence: float = 0.95):
+    """Wilson score interval -> (low, high) arrays; NaN where games == 0"""
+    wins = np.asarray(wins, dtype=np.float64)
+    games = np.asarray(games, dtype=np.float64)
+    z = _z(confidence)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p = wins / games
+        denom = 1 + z * z / games
+        center = (p + z * z / (2 * games)) / denom
+        margin = z * np.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / denom
+    low = np.where(games > 0, np.clip(center - margin, 0, 1), np.nan)
+    high = np.where(games > 0, np.clip(center + margin, 0, 1), np.nan)
+    return low, high
+
+
+def _beta_quantile(a, b, q, start=None):
+    """Inverse of I_x(a, b) in x: safeguarded Newton (bisection fallback), vectorized"""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    lo = np.zeros(a.shape)
+    hi = np.ones(a.shape)
+    x = np.full(a.shape, 0.5) if start is None else np.clip(np.asarray(start, dtype=np.float64), 1e-12, 1 - 1e-12)
+    log_beta = _lgamma(a) + _lgamma(b) - _lgamma(a + b)
+    for _ in range(_QUANTILE_ITER):
+        f = betainc(a, b, x) - q
+        lo = np.where(f < 0, x, lo)
+        hi = np.where(f < 0, hi, x)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            pdf = np.exp((a - 1) * np.log(x) + (b - 1) * np.log1p(-x) - log_beta)
+            step = x - f / pdf
+        # Newton 스텝이 구간을 벗어나면 이분법으로 대체
+        bad = ~np.isfinite(step) | (step <= lo) | (step >= hi)
+        new_x = np.where(bad, (lo + hi) / 2, step)
+        done = np.abs(new_x - x) < 1e-13
+        x = new_x
+        if done.all():
+            break
+    return x
+
+
+def clopper_pearson_interval(wins, games, confidence: float = 0.95):
+    """Exact (Clopper-Pearson) interval -> (low, high) arrays; NaN where games == 0"""
+    wins = np.asarray(wins, dtype=np.float64)
+    games = np.asarray(games, dtype=np.float64)
+    alpha = 1 - confidence
+    low = np.full(wins.shape, np.nan)
+    high = np.full(wins.shape, np.nan)
+    valid = games > 0
+    low[valid & (wins == 0)] = 0.0
+    high[valid & (wins == games)] = 1.0
+    # Wilson 구간에서 출발하면 Newton이 몇 번 만에 수렴한다
+    start_low, start_high = wilson_interval(wins, games, confidence)
+    need_low = valid & (wins > 0)
+    if need_low.any():
+        low[need_low] = _beta_quantile(
+            wins[need_low], games[need_low] - wins[need_low] + 1, alpha / 2, start_low[need_low]
+        )
+    need_high = valid & (wins < games)
+    if need_high.any():
+        high[need_high] = _beta_quantile(
+            wins[need_high] + 1, games[need_high] - wins[need_high], 1 - alpha / 2, start_high[need_high]
+        )
+    return low, high
+
+
+def binomial_test_half(wins, games):
+    """Two-sided exact binomial test p-values against p = 0.5; NaN where games == 0"""
+    wins = np.asarray(wins, dtype=np.float64)
+    games = np.asarray(games, dtype=np.float64)
+    # p=0.5는 대칭이므로 양측 p-value = 2 * 작은 쪽 꼬리
+    tail_k = np.minimum(wins, games - wins)
+    p_values = np.minimum(1.0, 2 * binom_cdf(tail_k, games, 0.5))
+    return np.where(games > 0, p_values, np.nan)
+
+
+def interval(wins, games, method: str = "wilson", confidence: float = 0.95):
+    """Dispatch to wilson_interval / clopper_pearson_interval
+
+    Raises:
+        ValueError: unknown method
+    """
+    method = method.lower().replace("_", "-")
+    if method == "wilson":
+        return wilson_interval(wins, games, confidence)
+    if method in ("clopper-pearson", "exact"):
+        return clopper_pearson_interval(wins, games, confidence)
+    raise ValueError(f"지원하지 않는 신뢰구간 방식: {method} (wilson, clopper-pearson)")
+
+
+def win_rate_summary(wins, games, method: str = "wilson", confidence: float = 0.95) -> dict:
+    """Rates, intervals, p-values and significance flags for all groups at once"""
+    wins = np.asarray(wins, dtype=np.float64)
+    games = np.asarray(games, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rate = np.where(games > 0, wins / games, np.nan)
+    low, high = interval(wins, games, method, confidence)
+    p_values = binomial_test_half(wins, games)
+    return {
+        "rate": rate,
+        "low": low,
+        "high": high,
+        "p_value": p_values,
+        "significant": np.nan_to_num(p_values, nan=1.0) < (1 - confidence),
+    }
+
+
+def bootstrap_mean_interval(values, n_boot: int = 2000, confidence: float = 0.95,
+                            seed: int = None, max_batch_elements: int = 4_000_000):
+    """Percentile bootstrap interval for the mean using batched resampling
+
+    Resampling n values with replacement is the same as drawing multinomial
+    counts over the distinct values, so when values repeat a lot (durations
+    in whole seconds) each replicate costs O(distinct) instead of O(n).
+    Otherwise resamples are drawn as (batch, n) index matrices, one vectorized
+    gather + mean per batch. Batch size is capped to bound memory.
+    Returns (low, high), NaN for empty input.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n == 0:
+        return float("nan"), float("nan")
+    rng = np.random.default_rng(seed)
+    distinct, counts = np.unique(values, return_counts=True)
+    use_histogram = len(distinct) * 4 < n
+    width = len(distinct) if use_histogram else n
+    batch = max(1, min(n_boot, max_batch_elements // width))
+    means = np.empty(n_boot)
+    for start in range(0, n_boot, batch):
+        size = min(batch, n_boot - start)
+        if use_histogram:
+            draws = rng.multinomial(n, counts / n, size=size)
+            means[start:start + size] = draws @ distinct / n
+        else:
+            idx = rng.integers(0, n, size=(size, n))
+            means[start:start + size] = values[idx].mean(axis=1)
+    alpha = 1 - confidence
+    low, high = np.quantile(means, [alpha / 2, 1 - alpha / 2])
+    return float(low), float(high)
+
+
+def format_interval_line(low: float, high: float, p_value: float, significant: bool,
+                         confidence: float = 0.95) -> str:
+    """'95% CI 41.2%~58.8%, p=0.523 (50% 대비 유의하지 않음)' style summary"""
+    verdict = "유의함" if significant else "유의하지 않음"
+    return f"{confidence * 100:.0f}% CI {low * 100:.1f}%~{high * 100:.1f}%, p={p_value:.3g} (50% 대비 {verdict})"
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Multi-worker serving for the agent servers.
+
+With AGENT_WORKERS=N (N > 1) an agent script no longer serves its app in one
+process. Instead it starts N copies of itself and puts a small reverse proxy
+on the public port. Each worker binds a free local port itself and reports
+it back through a port file, so no other process can take the port between
+choosing and binding it:
+
+- every worker shares one SQLite task store (A2A_TASK_STORE), so a task saved
+  by one worker can be continued by any other
+- the proxy routes by task / context ID: IDs seen in a worker's response are
+  pinned to that worker (LRU), so follow-up turns, tasks/get, tasks/cancel
+  and resubscribe land on the worker that holds the live task state
+- requests without a known ID are spread round-robin
+- POSTs to the agent's ``broadcast`` routes change in-memory state (CS
+  feedback ingest, coordinator drift alerts), so they are sent to every
+  worker and all of them answer from the same data. A worker restarted
+  after a crash starts again from the agent's initial data.
+- crashed workers are restarted, with a backoff that doubles on repeated
+  quick crashes and starts over once a worker has stayed up for a while
+
+With AGENT_WORKERS unset or 1 the agent runs exactly as before (one uvicorn
+process, in-memory task store).
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import re
+import socket
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+
+from sqlite_task_store import TASK_STORE_ENV
+
+logger = logging.getLogger(__name__)
+
+WORKERS_ENV = "AGENT_WORKERS"
+WORKER_PORT_ENV = "A2A_WORKER_PORT"
+WORKER_PORT_FILE_ENV = "A2A_WORKER_PORT_FILE"
+MAX_PINNED_IDS = 50_000
+# 응답 앞부분만 보고 ID를 찾는다 (스트림 전체를 버퍼링하지 않음)
+SNIFF_BYTES = 64 * 1024
+HOP_BY_HOP = {"connection", "keep-alive", "transfer-encoding", "content-length", "host", "upgrade"}
+# SSE 이벤트 구분자 (빈 줄)
+EVENT_END = re.compile(rb"\r?\n\r?\n")
+# 이 시간 이상 살아 있던 워커가 죽으면 재시작 대기를 처음(1초)부터 다시 센다
+STABLE_UPTIME = 60.0
+MAX_BACKOFF = 30.0
+WORKER_START_TIMEOUT = 60.0
+
+
+def request_ids(body: bytes) -> list:
+    """Task / context IDs referenced by a JSON-RPC request body (task ID first)"""
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return []
+    params = payload.get("params") if isinstance(payload, dict) else None
+    if not isinstance(params, dict):
+        return []
+    ids = []
+    message = params.get("message")
+    if isinstance(message, dict):
+        ids += [message.get("taskId"), message.get("contextId")]
+    # tasks/get, tasks/cancel, tasks/resubscribe
+    ids.append(params.get("id"))
+    return [i for i in ids if isinstance(i, str) and i]
+
+
+def response_ids(payload) -> list:
+    """Task / context IDs in a JSON-RPC response or stream event (Task, Message, status/artifact update)"""
+    result = payload.get("result") if isinstance(payload, dict) else None
+    if not isinstance(result, dict):
+        return []
+    ids = [result.get("taskId"), result.get("contextId")]
+    if result.get("kind") == "task":
+        ids.insert(0, result.get("id"))
+    return [i for i in ids if isinstance(i, str) and i]
+
+
+class ResponseIdScanner:
+    """Finds the task / context IDs in a response relayed chunk by chunk
+
+    Chunks are buffered up to complete SSE events (or the whole JSON body),
+    so an ID split across two chunks is still found. Only the first
+    ``limit`` bytes are looked at.
+    """
+
+    def __init__(self, streaming: bool, limit: int = SNIFF_BYTES):
+        self.streaming = streaming
+        self.limit = limit
+        self.buffer = bytearray()
+        self.seen = 0
+
+    def feed(self, chunk: bytes) -> list:
+        """IDs in the SSE events completed by this chunk"""
+        if self.seen > self.limit:
+            return []
+        self.seen += len(chunk)
+        self.buffer += chunk
+        ids = []
+        while self.streaming:
+            end = EVENT_END.search(self.buffer)
+            if end is None:
+                break
+            ids += self._event_ids(bytes(self.buffer[:end.start()]))
+            del self.buffer[:end.end()]
+        if self.seen > self.limit:
+            # 한도를 넘으면 남은 부분은 버린다 (긴 스트림/본문을 메모리에 쌓지 않음)
+            self.buffer.clear()
+        return ids
+
+    def close(self) -> list:
+        """IDs in what is left: the JSON body, or a last SSE event without a trailing blank line"""
+        data, self.buffer = bytes(self.buffer), bytearray()
+        if not data or self.seen > self.limit:
+            return []
+        return self._event_ids(data) if self.streaming else self._body_ids(data)
+
+    def _event_ids(self, event: bytes) -> list:
+        lines = [line[5:].strip() for line in event.splitlines() if line.startswith(b"data:")]
+        return self._body_ids(b"\n".join(lines)) if lines else []
+
+    @staticmethod
+    def _body_ids(body: bytes) -> list:
+        try:
+            return response_ids(json.loads(body))
+        except ValueError:
+            return []
+
+
+class AffinityRouter:
+    """Pins task / context IDs to the worker that created them"""
+
+    def __init__(self, workers: int, max_pinned: int = MAX_PINNED_IDS):
+        self.workers = workers
+        self.max_pinned = max_pinned
+        self.pinned = OrderedDict()
+        self._round_robin = itertools.cycle(range(workers))
+
+    def pick(self, ids) -> int:
+        for task_or_context_id in ids:
+            worker = self.pinned.get(task_or_context_id)
+            if worker is not None:
+                self.pinned.move_to_end(task_or_context_id)
+                return worker
+        if ids:
+            # 처음 보는 ID도 항상 같은 워커로 (공유 스토어가 있어 어느 워커든 처리 가능)
+            return zlib.crc32(ids[0].encode()) % self.workers
+        return next(self._round_robin)
+
+    def pin(self, ids, worker: int):
+        for task_or_context_id in ids:
+            self.pinned[task_or_context_id] = worker
+            self.pinned.move_to_end(task_or_context_id)
+        while len(self.pinned) > self.max_pinned:
+            self.pinned.popitem(last=False)
+
+
+class WorkerPool:
+    """N copies of the current agent script, each on a local port it picks itself"""
+
+    def __init__(self, workers: int, command: list = None):
+        """
+        Args:
+            workers: Number of worker processes
+            command: Python arguments of a worker (default: this script with its arguments)
+        """
+        self.command = command if command is not None else sys.argv
+        self.ports = [None] * workers
+        self.processes = [None] * workers
+        self.started = [0.0] * workers
+        self.backoff = [1.0] * workers
+        self._port_dir = tempfile.mkdtemp(prefix="agent_workers_")
+
+    def _port_file(self, index: int) -> str:
+        return os.path.join(self._port_dir, f"worker{index}.port")
+
+    def start(self, index: int):
+        port_file = self._port_file(index)
+        if os.path.exists(port_file):
+            os.remove(port_file)
+        self.ports[index] = None
+        # 포트 0: 워커가 직접 빈 포트를 바인드하고 port 파일로 알려준다
+        env = dict(os.environ, **{WORKER_PORT_ENV: "0", WORKER_PORT_FILE_ENV: port_file})
+        self.processes[index] = subprocess.Popen([sys.executable, "-u", *self.command], env=env)
+        self.started[index] = time.monotonic()
+        logger.info(f"Worker {index} started (PID {self.processes[index].pid})")
+
+    def start_all(self):
+        for index in range(len(self.ports)):
+            self.start(index)
+
+    def port(self, index: int):
+        """Port worker ``index`` listens on, None while it is still starting"""
+        if self.ports[index] is None:
+            try:
+                with open(self._port_file(index)) as f:
+                    self.ports[index] = int(f.read())
+            except (OSError, ValueError):
+                return None
+        return self.ports[index]
+
+    def wait_ready(self, timeout: float = WORKER_START_TIMEOUT) -> bool:
+        """Block until every running worker has reported its port"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            pending = [i for i, process in enumerate(self.processes) if process.poll() is None and self.port(i) is None]
+            if not pending:
+                return True
+            time.sleep(0.1)
+        return False
+
+    def restart_delay(self, index: int) -> float:
+        """Wait before restarting worker ``index``: doubles on quick crashes, resets after STABLE_UPTIME"""
+        if time.monotonic() - self.started[index] >= STABLE_UPTIME:
+            self.backoff[index] = 1.0
+        delay = self.backoff[index]
+        self.backoff[index] = min(delay * 2, MAX_BACKOFF)
+        return delay
+
+    async def watch(self):
+        while True:
+            await asyncio.sleep(1)
+            for index, process in enumerate(self.processes):
+                if process.poll() is not None:
+                    logger.warning(f"Worker {index} exited with code {process.returncode}, restarting")
+                    await asyncio.sleep(self.restart_delay(index))
+                    self.start(index)
+
+    def stop(self):
+        for process in self.processes:
+            if process and process.poll() is None:
+                process.terminate()
+        for process in self.processes:
+            if process:
+                try:
+                    process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+        shutil.rmtree(self._port_dir, ignore_errors=True)
+
+
+def build_proxy(pool: WorkerPool, broadcast=()) -> Starlette:
+    """Reverse proxy app that routes requests to workers by task / context affinity
+
+    Args:
+        pool: The workers
+        broadcast: Paths whose POSTs are sent to every worker (in-memory state updates)
+    """
+    router = AffinityRouter(len(pool.ports))
+    client = httpx.AsyncClient(timeout=httpx.Timeout(None, connect=5.0))
+    broadcast = set(broadcast)
+
+    async def fan_out(request, body, headers):
+        ports = [pool.port(index) for index in range(len(pool.ports))]
+        if None in ports:
+            # 한 워커라도 빠지면 워커마다 데이터가 달라지므로 아무 데도 보내지 않는다
+            return Response("Workers are starting", status_code=503, headers={"Retry-After": "1"})
+        responses = await asyncio.gather(*(
+            client.request(request.method, f"http://127.0.0.1:{port}{request.url.path}",
+                           params=request.query_params, headers=headers, content=body)
+            for port in ports
+        ), return_exceptions=True)
+        failed = [i for i, r in enumerate(responses) if isinstance(r, Exception) or r.status_code >= 500]
+        if failed:
+            logger.warning(f"Broadcast {request.url.path} failed on workers {failed}")
+            return Response(f"Workers {failed} did not apply the request", status_code=502)
+        first = responses[0]
+        response_headers = {k: v for k, v in first.headers.items()
+                            if k.lower() not in HOP_BY_HOP and k.lower() != "content-encoding"}
+        return Response(first.content, status_code=first.status_code, headers=response_headers)
+
+    async def proxy(request):
+        body = await request.body()
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in HOP_BY_HOP}
+        if request.method == "POST" and request.url.path in broadcast:
+            return await fan_out(request, body, headers)
+        ids = request_ids(body) if request.method == "POST" else []
+        worker = router.pick(ids)
+        port = pool.port(worker)
+        if port is None:
+            return Response(f"Worker {worker} is starting", status_code=503, headers={"Retry-After": "1"})
+        upstream = client.build_request(
+            request.method,
+            f"http://127.0.0.1:{port}{request.url.path}",
+            params=request.query_params,
+            headers=headers,
+            content=body,
+        )
+        try:
+            response = await client.send(upstream, stream=True)
+        except httpx.HTTPError as e:
+            return Response(f"Worker {worker} unavailable: {e}", status_code=502)
+
+        streaming = response.headers.get("content-type", "").startswith("text/event-stream")
+        scanner = ResponseIdScanner(streaming)
+
+        async def relay():
+            try:
+                async for chunk in response.aiter_raw():
+                    found = scanner.feed(chunk)
+                    if found:
+                        router.pin(found, worker)
+                    yield chunk
+                found = scanner.close()
+                if found:
+                    router.pin(found, worker)
+            finally:
+                await response.aclose()
+
+        if ids:
+            router.pin(ids, worker)
+        response_headers = {k: v for k, v in response.headers.items() if k.lower() not in HOP_BY_HOP}
+        return StreamingResponse(relay(), status_code=response.status_code, headers=response_headers)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        watcher = asyncio.create_task(pool.watch())
+        try:
+            yield
+        finally:
+            watcher.cancel()
+            await client.aclose()
+            pool.stop()
+
+    methods = ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
+    return Starlette(routes=[Route("/{path:path}", proxy, methods=methods)], lifespan=lifespan)
+
+
+def serve_worker(app, port: int = 0, port_file: str = None):
+    """Serve the app as a pool worker on 127.0.0.1
+
+    Args:
+        app: The agent's Starlette app
+        port: Port to bind (0: any free port)
+        port_file: Where to report the bound port to the pool
+    """
+    # 직접 바인드한 소켓을 uvicorn 에 넘긴다: 고른 포트를 다른 프로세스가 먼저 잡는 경쟁이 없다
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", port))
+    if port_file:
+        tmp = f"{port_file}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(str(sock.getsockname()[1]))
+        os.replace(tmp, port_file)
+    uvicorn.Server(uvicorn.Config(app, log_level="warning")).run(sockets=[sock])
+
+
+def serve(app, host: str, port: int, name: str = "agent", broadcast=()):
+    """Run the agent app, as a single process or as AGENT_WORKERS workers behind a proxy
+
+    Args:
+        app: The agent's Starlette app (used directly in single-process mode)
+        host: Public bind address
+        port: Public port
+        name: Used for the default shared task store file name
+        broadcast: POST paths that update in-memory state and go to every worker
+    """
+    worker_port = os.environ.get(WORKER_PORT_ENV)
+    if worker_port:
+        serve_worker(app, int(worker_port), os.environ.get(WORKER_PORT_FILE_ENV))
+        return
+
+    workers = int(os.environ.get(WORKERS_ENV, "1"))
+    if workers <= 1:
+        uvicorn.run(app, host=host, port=port)
+        return
+
+    if not os.environ.get(TASK_STORE_ENV):
+        slug = re.sub(r"\W+", "_", name.lower()).strip("_")
+        os.environ[TASK_STORE_ENV] = os.path.join(tempfile.gettempdir(), f"{slug}_tasks.sqlite")
+    logger.info(f"Starting {workers} workers (task store: {os.environ[TASK_STORE_ENV]})")
+    pool = WorkerPool(workers)
+    pool.start_all()
+    if not pool.wait_ready():
+        logger.warning("Some workers did not report a port in time; requests to them get 503 until they do")
+    try:
+        uvicorn.run(build_proxy(pool, broadcast), host=host, port=port)
+    finally:
+        pool.stop()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Synthetic game-log and feedback generator for scaling tests
+
+Generates seeded, production-sized datasets in the agents' native formats:
+- game logs: data/game_logs.json records (JSON array or JSONL), optionally
+  written straight into a match store
+- feedback: data/feedback_data.json records with Korean complaint text,
+  Zipf-distributed duplication and a configurable urgency mix
+
+Usage:
+    python generate_synthetic_data.py games --count 5000000 --out /tmp/game_logs.jsonl
+    python generate_synthetic_data.py games --count 5000000 --store /tmp/game_logs.store
+    python generate_synthetic_data.py feedback --count 200000 --out /tmp/feedback.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
+
+from match_store import BRACKETS, COLUMNS, RACES, MatchStore, date_to_day, day_to_date
+
+CHUNK_SIZE = 200_000
+
+RACE_KR = {"Terran": "테란", "Zerg": "저그", "Protoss": "프로토스"}
+UNITS = {
+    "Terran": ["마린", "탱크", "벙커", "밴시", "바이킹", "사이클론", "토르", "배틀크루저", "불곰"],
+    "Zerg": ["저글링", "뮤탈", "히드라", "럴커", "울트라", "바퀴", "감염충", "여왕"],
+    "Protoss": ["광전사", "추적자", "스톰", "캐리어", "불멸자", "거신", "암흑기사", "예언자"],
+}
+# (속성, 조사)
+ASPECTS = [("체력", "이"), ("공격력", "이"), ("사거리", "가"), ("생산 속도", "가"), ("방어력", "이"), ("이동 속도", "가")]
+STRONG_TEMPLATES = [
+    "{race} {unit} {aspect}{josa} 너무 강력합니다.",
+    "{race} {unit} {aspect}{josa} 사기입니다. 상대할 방법이 없어요.",
+    "{unit} 러시를 막을 방법이 없습니다. {race} 너프 부탁드려요.",
+    "{race} {unit} 때문에 게임이 재미가 없습니다.",
+]
+WEAK_TEMPLATES = [
+    "{race} {unit} {aspect}{josa} 너무 약해서 쓸모가 없어요.",
+    "{race} {unit} 너프 이후로 승률이 너무 떨어졌습니다.",
+    "{race} {unit} 버프가 필요합니다.",
+]
+SUFFIXES = ["", " 제발 수정해주세요.", " 빨리 패치해주세요!", " 다들 공감하시죠?", " ㅠㅠ"]
+URGENCIES = ("high", "medium", "low")
+# 긴급도별 추천 수 lognormal 평균 (log scale)
+UPVOTE_LOG_MEAN = {"high": 5.2, "medium": 4.3, "low": 3.2}
+
+
+def parse_weights(text: str, names, default) -> np.ndarray:
+    """'Terran:1.4,Zerg:0.8' -> array aligned with names (missing = default)"""
+    weights = {name: default for name in names}
+    for item in filter(None, (text or "").split(",")):
+        name, value = item.split(":")
+        name = name.strip()
+        match = [n for n in names if n.lower() == name.lower()]
+        if not match:
+            raise ValueError(f"Unknown name: {name} (choose from {', '.join(names)})")
+        weights[match[0]] = float(value)
+    return np.array([weights[n] for n in names], dtype=np.float64)
+
+
+def sample_days(rng, count: int, start_day: int, days: int, weekend_boost: float) -> np.ndarray:
+    """Sorted day numbers with a weekend traffic bump"""
+    day_range = np.arange(start_day, start_day + days)
+    weekday = (day_range + 3) % 7  # 1970-01-01 = 목요일, 0 = 월요일
+    weights = np.where(weekday >= 5, weekend_boost, 1.0)
+    return np.sort(rng.choice(day_range, size=count, p=weights / weights.sum())).astype(np.int32)
+
+
+def generate_game_columns(rng, count: int, first_id: int, days: np.ndarray, strengths, pick_rates,
+                          bracket_weights, duration_minutes: float, duration_sigma: float) -> dict:
+    """One chunk of matches as match-store columns"""
+    race_a = rng.choice(len(RACES), size=count, p=pick_rates)
+    race_b = rng.choice(len(RACES), size=count, p=pick_rates)
+    # Bradley-Terry: P(a 승) = s_a / (s_a + s_b)
+    p_a = strengths[race_a] / (strengths[race_a] + strengths[race_b])
+    a_wins = rng.random(count) < p_a
+    winner = np.where(a_wins, race_a, race_b)
+    loser = np.where(a_wins, race_b, race_a)
+    # 불리한 쪽이 이기면 게임이 길어지는 경향
+    upset = np.where(a_wins, 1 - p_a, p_a)
+    duration = rng.lognormal(np.log(duration_minutes * 60) + 0.3 * (upset - 0.5), duration_sigma, count)
+    return {
+        "game_id": np.arange(first_id, first_id + count, dtype=COLUMNS["game_id"]),
+        "winner": winner.astype(COLUMNS["winner"]),
+        "loser": loser.astype(COLUMNS["loser"]),
+        "duration": np.clip(duration, 180, 5400).astype(COLUMNS["duration"]),
+        "day": days,
+        "bracket": (rng.choice(len(bracket_weights), size=count, p=bracket_weights) + 1).astype(COLUMNS["bracket"]),
+    }
+
+
+def game_records(columns: dict):
+    """Column chunk -> game_logs.json style dicts"""
+    dates = np.datetime_as_string(columns["day"].astype("datetime64[D]"))
+    for gid, w, l, dur, date, b in zip(
+        columns["game_id"].tolist(), columns["winner"].tolist(), columns["loser"].tolist(),
+        columns["duration"].tolist(), dates.tolist(), columns["bracket"].tolist(),
+    ):
+        yield {"game_id": gid, "winner_race": RACES[w], "loser_race": RACES[l], "duration": dur,
+               "date": date, "mmr_bracket": BRACKETS[b]}
+
+
+class RecordWriter:
+    """Streams records as JSONL or as a JSON array (one record per line, like data/*.json)"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.array = self.path.suffix == ".json"
+        self.file = open(self.path, "w", encoding="utf-8")
+        self.count = 0
+        if self.array:
+            self.file.write("[\n")
+
+    def write(self, records):
+        sep = ",\n" if self.array else "\n"
+        lines = [json.dumps(r, ensure_ascii=False) for r in records]
+        if not lines:
+            return
+        if self.array and self.count:
+            self.file.write(sep)
+        self.file.write(sep.join(lines))
+        if not self.array:
+            self.file.write("\n")
+        self.count += len(lines)
+
+    def close(self):
+        if self.array:
+            self.file.write("\n]\n")
+        self.file.close()
+
+
+def generate_games(args):
+    rng = np.random.default_rng(args.seed)
+    strengths = parse_weights(args.race_skew, RACES, 1.0)
+    pick_rates = parse_weights(args.pick_rates, RACES, 1.0)
+    pick_rates /= pick_rates.sum()
+    bracket_weights = parse_weights(args.brackets, BRACKETS[1:], 0.0)
+    bracket_weights /= bracket_weights.sum()
+    all_days = sample_days(rng, args.count, date_to_day(args.start_date), args.days, args.weekend_boost)
+
+    writer = RecordWriter(args.out) if args.out else None
+    store = MatchStore.create(args.store) if args.store else None
+    started = time.perf_counter()
+    for start in range(0, args.count, CHUNK_SIZE):
+        size = min(CHUNK_SIZE, args.count - start)
+        columns = generate_game_columns(
+            rng, size, start + 1, all_days[start:start + size], strengths, pick_rates,
+            bracket_weights, args.duration_minutes, args.duration_sigma,
+        )
+        if store is not None:
+            store.append_columns(columns)
+        if writer is not None:
+            writer.write(game_records(columns))
+    if writer is not None:
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Generated {args.count:,} matches ({day_to_date(all_days[0])} ~ {day_to_date(all_days[-1])}) "
+          f"in {elapsed:.1f}s")
+    for target in filter(None, [args.out, args.store]):
+        print(f"   → {target}")
+
+
+def build_complaint_pool() -> list:
+    """(race index, complaint text) for every race x unit x template"""
+    pool = []
+    for r, race in enumerate(RACES):
+        for unit in UNITS[race]:
+            for t, template in enumerate(STRONG_TEMPLATES + WEAK_TEMPLATES):
+                aspect, josa = ASPECTS[(len(unit) + t) % len(ASPECTS)]
+                text = template.format(race=RACE_KR[race], unit=unit, aspect=aspect, josa=josa)
+                pool.append((r, text))
+    return pool
+
+
+def generate_feedback(args):
+    rng = np.random.default_rng(args.seed)
+    race_weights = parse_weights(args.race_weights, RACES, 1.0)
+    urgency_mix = parse_weights(args.urgency_mix, URGENCIES, 0.0)
+    urgency_mix /= urgency_mix.sum()
+
+    pool = build_complaint_pool()
+    # 종족 가중치 x Zipf 순위 → 소수의 인기 컴플레인이 반복되는 분포
+    order = rng.permutation(len(pool))
+    rank = np.empty(len(pool))
+    rank[order] = np.arange(1, len(pool) + 1)
+    weights = race_weights[[r for r, _ in pool]] / rank ** args.zipf
+    weights /= weights.sum()
+
+    all_days = sample_days(rng, args.count, date_to_day(args.start_date), args.days, 1.0)
+    writer = RecordWriter(args.out)
+    started = time.perf_counter()
+    for start in range(0, args.count, CHUNK_SIZE):
+        size = min(CHUNK_SIZE, args.count - start)
+        picks = rng.choice(len(pool), size=size, p=weights)
+        suffixes = rng.choice(len(SUFFIXES), size=size, p=[0.6, 0.1, 0.1, 0.1, 0.1])
+        urgency = rng.choice(len(URGENCIES), size=size, p=urgency_mix)
+        log_mean = np.array([UPVOTE_LOG_MEAN[u] for u in URGENCIES])[urgency]
+        upvotes = rng.lognormal(log_mean, 0.8).astype(np.int64)
+        dates = np.datetime_as_string(all_days[start:start + size].astype("datetime64[D]")).tolist()
+        records = (
+            {
+                "id": start + i + 1,
+                "race": RACES[pool[p][0]],
+                "complaint": pool[p][1] + SUFFIXES[s],
+                "urgency": URGENCIES[u],
+                "date": dates[i],
+                "upvotes": int(v),
+            }
+            for i, (p, s, u, v) in enumerate(zip(picks.tolist(), suffixes.tolist(), urgency.tolist(), upvotes.tolist()))
+        )
+        writer.write(records)
+    writer.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Generated {args.count:,} complaints ({len(pool)} distinct templates) in {elapsed:.1f}s → {args.out}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic data generator for scaling tests")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    games = sub.add_parser("games", help="game logs")
+    games.add_argument("--count", type=int, default=1_000_000)
+    games.add_argument("--out", help="output .json (array) or .jsonl file")
+    games.add_argument("--store", help="write directly into a match store directory")
+    games.add_argument("--race-skew", default="Terran:1.3,Zerg:0.9,Protoss:1.0",
+                       help="Bradley-Terry strengths, e.g. 'Terran:1.3,Zerg:0.9'")
+    games.add_argument("--pick-rates", default="Terran:0.36,Zerg:0.33,Protoss:0.31")
+    games.add_argument("--brackets", default="Bronze:0.2,Silver:0.25,Gold:0.25,Platinum:0.15,Diamond:0.1,Master:0.04,Grandmaster:0.01")
+    games.add_argument("--duration-minutes", type=float, default=18.0, help="median game length")
+    games.add_argument("--duration-sigma", type=float, default=0.35, help="lognormal sigma")
+    games.add_argument("--weekend-boost", type=float, default=1.5)
+
+    feedback = sub.add_parser("feedback", help="forum feedback")
+    feedback.add_argument("--count", type=int, default=100_000)
+    feedback.add_argument("--out", required=True, help="output .json (array) or .jsonl file")
+    feedback.add_argument("--race-weights", default="Terran:1.5,Zerg:1.0,Protoss:1.0")
+    feedback.add_argument("--urgency-mix", default="high:0.25,medium:0.45,low:0.30")
+    feedback.add_argument("--zipf", type=float, default=1.1, help="duplication skew (0 = uniform)")
+
+    for p in (games, feedback):
+        p.add_argument("--seed", type=int, default=42)
+        p.add_argument("--start-date", default="2025-10-01")
+        p.add_argument("--days", type=int, default=90)
+
+    args = parser.parse_args()
+    if args.command == "games":
+        if not args.out and not args.store:
+            parser.error("games: --out or --store is required")
+        generate_games(args)
+    else:
+        generate_feedback(args)
+
+
+if __name__ == "__main__":
+    main()
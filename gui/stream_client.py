@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Shared /ask_stream client for the Streamlit GUIs.
+
+- One keep-alive ``requests.Session`` per GUI process (``st.cache_resource``)
+  instead of a new connection per question
+- Rendering is batched to one frame per ``FRAME_INTERVAL``; events that
+  arrive in between are only accumulated
+- The thinking trace is append-only: each frame re-renders just the live
+  tail, and once the tail grows past ``LIVE_TAIL`` its head is frozen into a
+  static block that is never sent again. The old GUIs rebuilt the whole
+  trace in a new expander per chunk (quadratic in output length)
+- Chat history lives in a process-wide store keyed by a session ID in the
+  URL, not in ``st.session_state``; reruns render only the most recent
+  ``HISTORY_WINDOW`` messages, and a page reload keeps the conversation
+"""
+
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+from uuid import uuid4
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "agents"))
+from response_envelope import EnvelopeParser
+from serialization import loads
+
+FRAME_INTERVAL = 0.1  # 초당 최대 10회 렌더링
+LIVE_TAIL = 4000  # 프레임마다 다시 그리는 최대 글자 수
+HISTORY_WINDOW = 30  # 재실행 시 그리는 최근 메시지 수
+MAX_SESSIONS = 100
+STATUS_ICONS = {'input_required': '❓', 'completed': '✅', 'error': '❌'}
+
+
+@st.cache_resource
+def http_session() -> requests.Session:
+    """Keep-alive HTTP session shared by every rerun of this GUI"""
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    return session
+
+
+def iter_events(url: str, payload: dict, session: requests.Session = None, timeout: int = 120):
+    """POST to an /ask_stream endpoint and yield its SSE events as dicts"""
+    session = session or http_session()
+    with session.post(url, json=payload, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        for line in response.iter_lines(decode_unicode=True):
+            if line and line.startswith('data: '):
+                event = loads(line[6:])
+                yield event
+                if event.get('type') == 'done':
+                    return
+
+
+class AppendOnlyText:
+    """Live text area that only re-renders its unfrozen tail"""
+
+    def __init__(self, container, live_tail: int = LIVE_TAIL):
+        self.container = container
+        self.live_tail = live_tail
+        self.text = ""
+        self.frozen = 0
+        self.live = None
+
+    def append(self, text: str):
+        self.text += text
+
+    def flush(self):
+        if self.live is None:
+            if not self.text:
+                return
+            self.live = self.container.empty()
+        tail = self.text[self.frozen:]
+        while len(tail) > self.live_tail:
+            # 앞부분을 줄 단위로 잘라 고정: 마지막으로 한 번 그리고 새 placeholder 로 넘어간다
+            cut = tail.rfind("\n", 0, self.live_tail)
+            cut = cut + 1 if cut > 0 else self.live_tail
+            self.live.code(tail[:cut], language=None)
+            self.live = self.container.empty()
+            self.frozen += cut
+            tail = tail[cut:]
+        self.live.code(tail, language=None)
+
+
+class ChatStore:
+    """Conversations by session ID, kept server-side (LRU)"""
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()
+
+    def messages(self, session_id: str) -> list:
+        if session_id not in self.sessions:
+            self.sessions[session_id] = []
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+        self.sessions.move_to_end(session_id)
+        return self.sessions[session_id]
+
+    def clear(self, session_id: str):
+        self.sessions.pop(session_id, None)
+
+
+@st.cache_resource
+def chat_store() -> ChatStore:
+    return ChatStore()
+
+
+def session_id() -> str:
+    """Conversation ID from the URL (?session=...), created on first visit"""
+    if "session" not in st.query_params:
+        st.query_params["session"] = uuid4().hex
+    return st.query_params["session"]
+
+
+def new_session():
+    """Drop the current conversation and start a new one (new session ID)"""
+    chat_store().clear(session_id())
+    st.query_params["session"] = uuid4().hex
+
+
+def render_history(messages: list, window: int = HISTORY_WINDOW):
+    """Render the most recent messages; the thinking trace stays collapsed"""
+    if len(messages) > window:
+        st.caption(f"이전 메시지 {len(messages) - window}개 생략")
+    for message in messages[-window:]:
+        with st.chat_message(message["role"]):
+            if message["role"] == "assistant" and message.get("thinking"):
+                with st.expander("🧠 사고 과정 보기"):
+                    st.code(message["thinking"], language=None)
+            st.markdown(message["content"])
+
+
+def format_answer(parser: EnvelopeParser, status_label: str = "Status") -> str:
+    """Final chat message from the parsed {status, message} envelope"""
+    status, message = parser.finish()
+    if not parser.complete:
+        return message
+    # Format: Status: [icon] [status]\nMessage: [icon] [message]
+    return f"**{status_label}:** {STATUS_ICONS.get(status, '📝')} {status}\n\n**Message:** 💬 {message}"
+
+
+def stream_turn(url: str, payload: dict, status_label: str = "Status", thinking_separator: str = None) -> dict:
+    """Stream one answer into the current chat message -> assistant history entry
+
+    Args:
+        url: /ask_stream endpoint
+        payload: Request body ({"query": ...})
+        status_label: Label for the envelope status line
+        thinking_separator: Inserted between thinking events (None for stdout fragments)
+    """
+    thinking_slot = st.empty()
+    progress_placeholder = st.empty()
+    answer_placeholder = st.empty()
+    answer_placeholder.markdown("⏳ 응답 대기 중...")
+
+    thinking = AppendOnlyText(None)
+    progress_lines = []
+    answer_text = ""
+    parser = EnvelopeParser()
+    dirty = False
+    last_frame = 0.0
+
+    def render():
+        if thinking.container is None and thinking.text:
+            # 사고 과정이 처음 도착할 때 한 번만 expander 를 만든다
+            thinking.container = thinking_slot.container().expander("🧠 사고 과정 (실시간)", expanded=True)
+        thinking.flush()
+        if progress_lines:
+            progress_placeholder.markdown("\n\n".join(progress_lines[-5:]))
+        if answer_text:
+            answer_placeholder.markdown(answer_text.replace('\\n', '\n'))
+
+    for event in iter_events(url, payload):
+        kind = event.get('type')
+        if kind == 'thinking':
+            if thinking_separator and thinking.text:
+                thinking.append(thinking_separator)
+            thinking.append(event['content'])
+        elif kind == 'progress':
+            # 하위 에이전트 중간 결과: 최근 몇 건만 표시
+            progress_lines.append(f"⏳ **{event['agent']}** · {event['content'][:200]}")
+        elif kind == 'answer':
+            answer_text += event['content']
+            parser.feed(event['content'])
+        elif kind == 'error':
+            raise RuntimeError(event.get('content', ''))
+        elif kind == 'done':
+            break
+        dirty = True
+        now = time.monotonic()
+        if now - last_frame >= FRAME_INTERVAL:
+            render()
+            dirty, last_frame = False, now
+    if dirty:
+        render()
+
+    final_message = format_answer(parser, status_label)
+    progress_placeholder.empty()
+    answer_placeholder.markdown(final_message)
+    return {"role": "assistant", "content": final_message, "thinking": thinking.text}
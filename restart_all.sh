@@ -6,16 +6,28 @@ pkill -f "game_balance_agent|data_analysis_agent|cs_feedback_agent|streamlit"
 sleep 2
 
 echo "🚀 Starting agents..."
-cd "/Users/hyeonsup/aws goa 2025/msk-a2a-demo/game-balance-a2a"
+cd "$(dirname "$0")"
 
-# Start agents
+# Poll the agent card until the agent answers (backoff 0.1s → 2s, 60s timeout)
+wait_for() {
+    local port=$1 delay_ms=100 waited_ms=0
+    until curl -sf "http://localhost:$port/.well-known/agent-card.json" > /dev/null; do
+        if (( waited_ms > 60000 )); then
+            echo "⚠️ Agent on port $port not ready after 60s"
+            return 1
+        fi
+        sleep "$(printf '%d.%03d' $((delay_ms / 1000)) $((delay_ms % 1000)))"
+        waited_ms=$((waited_ms + delay_ms))
+        delay_ms=$((delay_ms * 2 > 2000 ? 2000 : delay_ms * 2))
+    done
+    echo "✅ Agent on port $port ready"
+}
+
+# Start all agents concurrently (the coordinator discovers CS / Data on first use)
 venv/bin/python -u agents/cs_feedback_agent.py > /tmp/cs_agent.log 2>&1 &
 venv/bin/python -u agents/data_analysis_agent.py > /tmp/data_agent.log 2>&1 &
-sleep 3
 venv/bin/python -u agents/game_balance_agent.py > /tmp/balance_agent.log 2>&1 &
-
-echo "⏳ Waiting for agents to start..."
-sleep 5
+wait_for 9001 & wait_for 9002 & wait_for 9003 & wait
 
 echo "🎨 Starting GUIs..."
 venv/bin/streamlit run gui/balance_gui.py --server.port 8501 > /tmp/balance_gui.log 2>&1 &
@@ -29,7 +41,7 @@ echo ""
 echo "✅ All services started!"
 echo ""
 echo "📊 Agents:"
-lsof -i :8000,9001,9003 | grep LISTEN | awk '{print "  - Port " $9}'
+lsof -i :9001,9002,9003 | grep LISTEN | awk '{print "  - Port " $9}'
 echo ""
 echo "🎨 GUIs:"
 echo "  - Balance GUI: http://localhost:8501"
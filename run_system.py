@@ -1,82 +1,183 @@
 #!/usr/bin/env python3
 """
-System Runner - Starts all three agents in parallel
+System Runner - Supervises all three agents
+
+- CS / Data agents start concurrently; the coordinator starts as soon as
+  both answer on their agent card endpoint (no fixed sleeps)
+- Readiness is polled with exponential backoff
+- Crashed agents are restarted with exponential backoff
+- stdout/stderr pipes are drained asynchronously (prefixed + /tmp/*.log)
 """
 
-import subprocess
-import time
+import asyncio
 import signal
 import sys
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
 
+import httpx
+
 AGENTS_DIR = Path(__file__).parent / "agents"
+AGENT_CARD_PATH = "/.well-known/agent-card.json"
+
+READY_TIMEOUT = 60.0
+READY_POLL_INITIAL = 0.1
+READY_POLL_MAX = 2.0
+RESTART_BACKOFF_INITIAL = 1.0
+RESTART_BACKOFF_MAX = 30.0
+# 이 시간 이상 살아 있었으면 재시작 backoff를 초기화
+STABLE_AFTER = 60.0
+
+
+@dataclass
+class AgentSpec:
+    name: str
+    script: str
+    port: int
+    log_file: str
+    depends_on: list = field(default_factory=list)
+
+
+AGENTS = [
+    AgentSpec("CS Feedback Agent", "cs_feedback_agent.py", 9002, "/tmp/cs_agent.log"),
+    AgentSpec("Data Analysis Agent", "data_analysis_agent.py", 9003, "/tmp/data_agent.log"),
+    AgentSpec("Game Balance Agent", "game_balance_agent.py", 9001, "/tmp/balance_agent.log",
+              depends_on=["CS Feedback Agent", "Data Analysis Agent"]),
+]
+
+
+class Supervisor:
+    def __init__(self, specs):
+        self.specs = {spec.name: spec for spec in specs}
+        self.ready = {spec.name: asyncio.Event() for spec in specs}
+        self.processes = {}
+        self.stopping = asyncio.Event()
+
+    async def drain(self, spec: AgentSpec, process: asyncio.subprocess.Process):
+        """Read the agent's output as it arrives so the pipe never fills up"""
+        pending = b""
+        with open(spec.log_file, "ab") as log:
+            while True:
+                # readline()은 64KB 넘는 줄에서 실패하므로 청크 단위로 읽는다
+                chunk = await process.stdout.read(65536)
+                if not chunk:
+                    break
+                log.write(chunk)
+                log.flush()
+                *lines, pending = (pending + chunk).split(b"\n")
+                for line in lines:
+                    print(f"[{spec.name}] {line.decode('utf-8', errors='replace')}")
+            if pending:
+                print(f"[{spec.name}] {pending.decode('utf-8', errors='replace')}")
 
-processes = []
+    async def wait_or_stop(self, event: asyncio.Event) -> bool:
+        """Wait for event unless shutdown starts first; True if the event fired"""
+        stop = asyncio.create_task(self.stopping.wait())
+        fired = asyncio.create_task(event.wait())
+        await asyncio.wait({stop, fired}, return_when=asyncio.FIRST_COMPLETED)
+        stop.cancel()
+        fired.cancel()
+        return event.is_set()
 
-def cleanup(signum=None, frame=None):
-    """Clean up all processes"""
-    print("\n🛑 Shutting down all agents...")
-    for process in processes:
-        if process.poll() is None:
-            process.terminate()
+    async def wait_ready(self, spec: AgentSpec, process) -> bool:
+        """Poll the agent card endpoint until it answers (exponential backoff)"""
+        url = f"http://localhost:{spec.port}{AGENT_CARD_PATH}"
+        delay = READY_POLL_INITIAL
+        deadline = time.monotonic() + READY_TIMEOUT
+        async with httpx.AsyncClient(timeout=2) as client:
+            while time.monotonic() < deadline and process.returncode is None:
+                try:
+                    response = await client.get(url)
+                    if response.status_code == 200:
+                        return True
+                except httpx.HTTPError:
+                    pass
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, READY_POLL_MAX)
+        return False
+
+    async def run_agent(self, spec: AgentSpec):
+        """Start the agent after its dependencies, restart it when it crashes"""
+        for dependency in spec.depends_on:
+            if not await self.wait_or_stop(self.ready[dependency]):
+                return
+
+        backoff = RESTART_BACKOFF_INITIAL
+        while not self.stopping.is_set():
+            started = time.monotonic()
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, "-u", str(AGENTS_DIR / spec.script),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+            )
+            self.processes[spec.name] = process
+            print(f"🚀 Starting {spec.name} (port {spec.port}, PID {process.pid})")
+            drain_task = asyncio.create_task(self.drain(spec, process))
+
+            if await self.wait_ready(spec, process):
+                print(f"✅ {spec.name} ready in {time.monotonic() - started:.1f}s → http://localhost:{spec.port}")
+                self.ready[spec.name].set()
+            elif process.returncode is None:
+                print(f"⚠️ {spec.name} not ready after {READY_TIMEOUT:.0f}s, still waiting on the process")
+
+            await process.wait()
+            await drain_task
+            self.ready[spec.name].clear()
+            if self.stopping.is_set():
+                break
+
+            if time.monotonic() - started > STABLE_AFTER:
+                backoff = RESTART_BACKOFF_INITIAL
+            print(f"❌ {spec.name} exited with code {process.returncode}, restarting in {backoff:.0f}s")
+            try:
+                await asyncio.wait_for(self.stopping.wait(), timeout=backoff)
+            except asyncio.TimeoutError:
+                pass
+            backoff = min(backoff * 2, RESTART_BACKOFF_MAX)
+
+    async def report_when_ready(self):
+        started = time.monotonic()
+        for event in self.ready.values():
+            if not await self.wait_or_stop(event):
+                return
+        print("\n" + "=" * 50)
+        print(f"✅ All agents ready in {time.monotonic() - started:.1f}s")
+        print("\n📋 Agent URLs:")
+        for spec in self.specs.values():
+            print(f"   - {spec.name}: http://localhost:{spec.port}")
+        print("\nPress Ctrl+C to stop all agents")
+        print("=" * 50)
+
+    async def shutdown(self):
+        if self.stopping.is_set():
+            return
+        print("\n🛑 Shutting down all agents...")
+        self.stopping.set()
+        for process in self.processes.values():
+            if process.returncode is None:
+                process.terminate()
+        for process in self.processes.values():
             try:
-                process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
+                await asyncio.wait_for(process.wait(), timeout=5)
+            except asyncio.TimeoutError:
                 process.kill()
-    print("✅ All agents stopped")
-    sys.exit(0)
+        print("✅ All agents stopped")
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, lambda: asyncio.create_task(self.shutdown()))
+        reporter = asyncio.create_task(self.report_when_ready())
+        await asyncio.gather(*(self.run_agent(spec) for spec in self.specs.values()))
+        reporter.cancel()
+
 
 def main():
     print("🚀 Starting Game Balance A2A System")
     print("=" * 50)
-    
-    # Register signal handlers
-    signal.signal(signal.SIGINT, cleanup)
-    signal.signal(signal.SIGTERM, cleanup)
-    
-    agents = [
-        ("CS Feedback Agent", "cs_feedback_agent.py", 9001),
-        ("Data Analysis Agent", "data_analysis_agent.py", 9002),
-        ("Game Balance Agent", "game_balance_agent.py", 9000)
-    ]
-    
-    # Start each agent
-    for name, script, port in agents:
-        print(f"\n🚀 Starting {name} (port {port})...")
-        process = subprocess.Popen(
-            [sys.executable, str(AGENTS_DIR / script)],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1
-        )
-        processes.append(process)
-        print(f"   PID: {process.pid}")
-        time.sleep(3)  # Wait for agent to start
-    
-    print("\n" + "=" * 50)
-    print("✅ All agents started successfully!")
-    print("\n📋 Agent URLs:")
-    print("   - CS Feedback Agent: http://localhost:9001")
-    print("   - Data Analysis Agent: http://localhost:9002")
-    print("   - Game Balance Agent: http://localhost:9000")
-    print("\n💡 Test with:")
-    print('   curl -X POST http://localhost:9000/send_message \\')
-    print('     -H "Content-Type: application/json" \\')
-    print('     -d \'{"message": {"role": "user", "parts": [{"type": "text", "text": "Analyze game balance"}], "messageId": "test-1"}}\'')
-    print("\nPress Ctrl+C to stop all agents")
-    print("=" * 50)
-    
-    # Monitor processes
-    try:
-        while True:
-            for i, process in enumerate(processes):
-                if process.poll() is not None:
-                    print(f"\n❌ {agents[i][0]} has stopped unexpectedly!")
-                    cleanup()
-            time.sleep(1)
-    except KeyboardInterrupt:
-        cleanup()
+    asyncio.run(Supervisor(AGENTS).run())
+
 
 if __name__ == "__main__":
     main()
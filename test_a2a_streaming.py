@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Test the coordinator's streaming A2A client (progress relay, early return, context reuse)"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
+
+from a2a.server.apps import A2AStarletteApplication
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import Message, MessageSendParams, Part, Role, TaskState, TextPart
+
+import cs_feedback_agent_executor
+import game_balance_agent
+from agent_test_helpers import ScriptedAgent, ToolCallingAgent, cs_card, cs_handler, fake_cs_agents
+from game_balance_agent import A2AClient, coordinator_session, progress_listener
+from game_balance_agent_executor import GameBalanceExecutor
+from semantic_cache import SemanticCache
+from session_manager import AgentSessions
+
+
+def cs_app():
+    card = cs_card()
+    return card, A2AStarletteApplication(agent_card=card, http_handler=cs_handler()).build()
+
+
+def with_app(app, run):
+    """Run ``run()`` with the coordinator's httpx clients routed to the in-process app"""
+    real_client = httpx.AsyncClient
+    game_balance_agent.httpx.AsyncClient = lambda timeout=None: real_client(
+        transport=httpx.ASGITransport(app=app), base_url="http://cs.test", timeout=timeout)
+    try:
+        return asyncio.run(run())
+    finally:
+        game_balance_agent.httpx.AsyncClient = real_client
+
+
+def test_call_agent_relays_progress():
+    card, app = cs_app()
+    client = A2AClient()
+    # 카드는 첫 호출 때 조회된다 (import/시작 시 네트워크 I/O 없음)
+    client.agents["cs"] = card.url
+
+    async def run():
+        progress = []
+
+        async def listener(agent_name, text):
+            progress.append((agent_name, text))
+
+        progress_listener.set(listener)
+        return await client.call_agent("cs", "테란 피드백"), progress
+
+    with fake_cs_agents(lambda messages: ToolCallingAgent()):
+        (text, data), progress = with_app(app, run)
+
+    assert text == "테란 불만 2건", text
+    assert data == []
+    assert client.cards["cs"].name == card.name
+    # 도구 시작은 한 번만, 그 다음 부분 결과(artifact)가 중계된다
+    assert progress == [("cs", "🔧 get_feedback 실행 중"), ("cs", "테란 불만 2건")], progress
+    print(f"✅ sub-agent progress relayed: {json.dumps(progress, ensure_ascii=False)}")
+
+
+def test_follow_ups_reuse_context_and_resume_task():
+    fake = ScriptedAgent([
+        {"status": "input_required", "message": "어느 종족인가요?"},
+        {"status": "completed", "message": "테란 불만 2건"},
+        {"status": "completed", "message": "저그 불만 1건"},
+        {"status": "completed", "message": "새 대화"},
+    ])
+    card, app = cs_app()
+    client = A2AClient()
+    client.cards["cs"] = card
+
+    async def run():
+        coordinator_session.set("session-1")
+        await client.call_agent("cs", "피드백 보여줘")
+        waiting = dict(client.sessions[("session-1", "cs")])
+        await client.call_agent("cs", "테란")
+        done = dict(client.sessions[("session-1", "cs")])
+        await client.call_agent("cs", "저그는?")
+        await client.call_agent("cs", "처음부터", continue_conversation=False)
+        return waiting, done, dict(client.sessions[("session-1", "cs")])
+
+    with fake_cs_agents(lambda messages: fake):
+        waiting, done, fresh = with_app(app, run)
+        hot = list(cs_feedback_agent_executor.sessions.hot)
+    # input_required 태스크는 같은 task 로 재개되고, 완료된 뒤에는 같은 context 의 새 태스크로 잇는다
+    assert waiting["task_id"] is not None
+    assert done == {"context_id": waiting["context_id"], "task_id": None}
+    # 이전 턴은 context 의 세션 에이전트가 기억하므로 델타만 전달된다
+    assert fake.prompts == ["피드백 보여줘", "테란", "저그는?", "처음부터"]
+    assert waiting["context_id"] in hot
+    assert fresh["context_id"] != waiting["context_id"]
+    print("✅ follow-ups reuse the sub-agent context and resume input_required tasks")
+
+
+def test_session_map_is_lru():
+    client = A2AClient(max_sessions=2)
+    for i in range(3):
+        client.remember((f"s{i}", "cs"), f"ctx{i}", f"task{i}", TaskState.completed)
+    coordinator_session.set("s1")
+    assert client.conversation("cs")[1] == {"context_id": "ctx1", "task_id": None}
+    client.remember(("s3", "cs"), "ctx3", "task3", TaskState.input_required)
+    assert list(client.sessions) == [("s1", "cs"), ("s3", "cs")]
+    coordinator_session.set(None)
+    assert client.conversation("cs") == (None, None)
+    print("✅ session map evicts the least recently used conversation")
+
+
+def test_executor_uses_injected_state():
+    # executor 는 game_balance_agent 를 import 하지 않고 넘겨받은 세션·캐시·ContextVar 만 쓴다
+    fake = ScriptedAgent([{"status": "completed", "message": "저그 승률 정상"}])
+    cache = SemanticCache()
+    executor = GameBalanceExecutor(AgentSessions(lambda messages: fake, "test"), cache,
+                                   coordinator_session, progress_listener)
+    handler = DefaultRequestHandler(agent_executor=executor, task_store=InMemoryTaskStore())
+
+    async def run():
+        message = Message(role=Role.user, parts=[Part(TextPart(text="저그 승률 어때?"))], message_id="m1",
+                          context_id="ctx-exec")
+        return await handler.on_message_send(MessageSendParams(message=message))
+
+    task = asyncio.run(run())
+    assert task.status.state == TaskState.completed, task.status.state
+    envelope = json.loads(task.artifacts[0].parts[0].root.text)
+    assert envelope == {"status": "completed", "message": "저그 승률 정상"}
+    assert fake.prompts == ["저그 승률 어때?"]
+    assert cache.lookup("저그 승률 어때?")["answer"] == "저그 승률 정상"
+    print("✅ coordinator executor runs on the sessions and cache it was given")
+
+
+class FeedbackReadingAgent(ScriptedAgent):
+    """Records a call_cs_agent tool use in its messages before answering"""
+
+    async def stream_async(self, prompt, cancel_signal=None):
+        self.messages.append({"role": "assistant", "content": [
+            {"toolUse": {"toolUseId": "t1", "name": "call_cs_agent", "input": {"query": prompt}}},
+        ]})
+        async for event in super().stream_async(prompt, cancel_signal):
+            yield event
+
+
+def test_answers_that_read_feedback_are_not_cached():
+    # 캐시 버전은 경기 데이터만 반영하므로 피드백을 읽은 답은 저장하면 새 피드백에도 그대로 남는다
+    fake = FeedbackReadingAgent([{"status": "completed", "message": "테란 불만 2건"}])
+    cache = SemanticCache()
+    executor = GameBalanceExecutor(AgentSessions(lambda messages: fake, "test"), cache,
+                                   coordinator_session, progress_listener)
+    handler = DefaultRequestHandler(agent_executor=executor, task_store=InMemoryTaskStore())
+
+    async def run():
+        message = Message(role=Role.user, parts=[Part(TextPart(text="테란 불만 알려줘"))], message_id="m2",
+                          context_id="ctx-feedback")
+        return await handler.on_message_send(MessageSendParams(message=message))
+
+    task = asyncio.run(run())
+    assert task.status.state == TaskState.completed, task.status.state
+    assert cache.lookup("테란 불만 알려줘") is None
+    print("✅ coordinator answers built from CS feedback skip the answer cache")
+
+
+if __name__ == "__main__":
+    test_call_agent_relays_progress()
+    test_follow_ups_reuse_context_and_resume_task()
+    test_session_map_is_lru()
+    test_executor_uses_injected_state()
+    test_answers_that_read_feedback_are_not_cached()
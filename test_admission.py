@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Test admission control (concurrency, priority queue, rate limits, rejection)"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
+
+from agent_test_helpers import patched
+from admission import BATCH, INTERACTIVE, AdmissionController, Overloaded, TokenBucket
+
+
+def test_priority_order_and_concurrency():
+    async def run():
+        controller = AdmissionController(max_concurrency=1, max_queue=8)
+        order = []
+        peak = 0
+
+        async def request(name, priority):
+            nonlocal peak
+            async with controller.slot(priority):
+                peak = max(peak, controller.active)
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        first = asyncio.create_task(request("first", BATCH))
+        await asyncio.sleep(0)
+        # 슬롯이 찬 뒤 배치 → 대화형 순으로 도착해도 대화형이 먼저
+        tasks = [asyncio.create_task(request(n, p)) for n, p in
+                 [("batch1", BATCH), ("batch2", BATCH), ("gui1", INTERACTIVE), ("gui2", INTERACTIVE)]]
+        await asyncio.gather(first, *tasks)
+        assert order == ["first", "gui1", "gui2", "batch1", "batch2"], order
+        assert peak == 1 and controller.active == 0
+
+    asyncio.run(run())
+    print("✅ interactive requests jump ahead of batch, concurrency bounded")
+
+
+def test_rejects_when_queue_full():
+    async def run():
+        controller = AdmissionController(max_concurrency=1, max_queue=2)
+        gate = asyncio.Event()
+
+        async def hold():
+            async with controller.slot():
+                await gate.wait()
+
+        tasks = [asyncio.create_task(hold()) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert controller.active == 1 and controller.queue_depth == 2
+        start = time.perf_counter()
+        try:
+            async with controller.slot():
+                pass
+            assert False, "must reject"
+        except Overloaded as e:
+            assert e.retry_after > 0
+        assert time.perf_counter() - start < 0.01
+        # 배치 요청은 큐 절반에서 이미 거절
+        try:
+            controller.check(BATCH)
+            assert False, "batch must be rejected earlier"
+        except Overloaded:
+            pass
+        gate.set()
+        await asyncio.gather(*tasks)
+        assert controller.active == 0 and controller.queue_depth == 0
+
+    asyncio.run(run())
+    print("✅ fast rejection when the queue is too deep")
+
+
+def test_cancelled_waiter_frees_queue():
+    async def run():
+        controller = AdmissionController(max_concurrency=1, max_queue=4)
+        gate = asyncio.Event()
+
+        async def hold():
+            async with controller.slot():
+                await gate.wait()
+
+        holder = asyncio.create_task(hold())
+        waiter = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        assert controller.queue_depth == 0
+        gate.set()
+        await holder
+        assert controller.active == 0
+
+    asyncio.run(run())
+    print("✅ cancelled waiters leave the queue")
+
+
+def test_token_bucket_rate():
+    async def run():
+        bucket = TokenBucket(rate=100, capacity=10)
+        start = time.perf_counter()
+        for _ in range(30):
+            await bucket.acquire(1)
+        # 10개는 버스트, 나머지 20개는 초당 100개 → 약 0.2초
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(run())
+    assert 0.15 < elapsed < 0.5, elapsed
+    print(f"✅ token bucket paces requests ({elapsed * 1000:.0f} ms for 30 @ 100/s, burst 10)")
+
+
+def test_quota_split_across_agents_and_workers():
+    # 계정 할당량 120 RPM / 240000 TPM 을 에이전트 3개 x 워커 2개가 나눠 쓴다
+    env = {"BEDROCK_RPM": "120", "BEDROCK_TPM": "240000", "AGENT_WORKERS": "2"}
+    with patched(os, environ={**os.environ, **env}):
+        os.environ.pop("BEDROCK_QUOTA_AGENTS", None)
+        controller = AdmissionController.from_env()
+        assert abs(controller.request_bucket.rate * 60 - 20) < 1e-9
+        assert abs(controller.token_bucket.rate * 60 - 40000) < 1e-9
+
+        os.environ["BEDROCK_QUOTA_AGENTS"] = "1"
+        os.environ["AGENT_WORKERS"] = "1"
+        assert abs(AdmissionController.from_env().request_bucket.rate * 60 - 120) < 1e-9
+    print("✅ account quota is split across agents and worker processes")
+
+
+if __name__ == "__main__":
+    test_priority_order_and_concurrency()
+    test_rejects_when_queue_full()
+    test_cancelled_waiter_frees_queue()
+    test_token_bucket_rate()
+    test_quota_split_across_agents_and_workers()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Test the correlated balance snapshot (match stats + complaint volume in one call)"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
+
+from balance_snapshot import FeedbackRollup, feedback_snapshot, match_snapshot, previous_window
+from complaint_trends import ComplaintTrends
+from game_log_engine import GameLogEngine
+from match_store import RACES, MatchStore, date_to_day, day_to_date
+
+
+def posts(count: int, seed: int = 3, first: str = "2025-10-01", days: int = 20) -> list:
+    rng = np.random.default_rng(seed)
+    texts = ["마린 러시가 너무 강력합니다", "뮤탈이 쓸모가 없어요", "스톰 데미지가 사기입니다", "패치 좋아요"]
+    start = date_to_day(first)
+    return [{
+        "race": RACES[r], "complaint": texts[t], "upvotes": int(u), "date": day_to_date(start + int(d)),
+        "urgency": ("high", "medium", "low")[int(g)], "sentiment_score": float(s),
+    } for r, t, u, d, g, s in zip(rng.integers(0, 3, count), rng.integers(0, 4, count), rng.integers(0, 500, count),
+                                  rng.integers(0, days, count), rng.integers(0, 3, count), rng.uniform(-1, 1, count))]
+
+
+def test_feedback_rollup():
+    feedback = posts(20000)
+    rollup, trends = FeedbackRollup(), ComplaintTrends(capacity=64, horizon_days=30)
+    # 두 번에 나눠 넣어도 한 번에 계산한 값과 같다
+    rollup.extend(feedback[:5000])
+    rollup.extend(feedback[5000:])
+    trends.extend(feedback)
+    lo, hi = date_to_day("2025-10-05"), date_to_day("2025-10-11")
+    started = time.perf_counter()
+    snapshot = feedback_snapshot(rollup, trends, lo, hi)
+    elapsed = time.perf_counter() - started
+
+    window = [f for f in feedback if "2025-10-05" <= f["date"] <= "2025-10-11"]
+    zerg = [f for f in window if f["race"] == "Zerg"]
+    weights = np.array([f["upvotes"] + 1 for f in zerg])
+    expected = float(weights @ np.array([f["sentiment_score"] for f in zerg]) / weights.sum())
+    assert snapshot["all"]["complaints"] == len(window) and snapshot["Zerg"]["complaints"] == len(zerg)
+    assert snapshot["Zerg"]["upvotes"] == sum(f["upvotes"] for f in zerg)
+    assert abs(snapshot["Zerg"]["sentiment"] - expected) < 1e-3
+    assert snapshot["Zerg"]["urgency"]["high"] == sum(f["urgency"] == "high" for f in zerg)
+    assert snapshot["Zerg"]["keywords_window"] == {"since": "2025-10-05", "until": "2025-10-11"}
+    assert {k["keyword"] for k in snapshot["Zerg"]["keywords"]} & {"뮤탈", "쓸모"}
+    assert elapsed < 0.05, elapsed
+    print(f"✅ 20k posts: window totals and upvote-weighted sentiment match, snapshot in {elapsed * 1e3:.1f} ms")
+
+
+def test_match_snapshot():
+    rng = np.random.default_rng(4)
+    count = 60000
+    winner, loser = rng.integers(0, 3, count), rng.integers(0, 3, count)
+    day = np.sort(rng.integers(20000, 20020, count))
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MatchStore.create(Path(tmp) / "logs.store")
+        store.append_columns({"game_id": np.arange(count), "winner": winner, "loser": loser,
+                              "duration": np.full(count, 900), "day": day, "bracket": np.zeros(count, dtype=int)})
+        engine = GameLogEngine(store, persist=False)
+        engine.sync()
+        lo, hi = engine.resolve_window(last_days=5)
+        snapshot = match_snapshot(engine, lo, hi)
+        assert previous_window(engine, lo, hi) == (lo - 5, lo - 1)
+
+        inside = day >= lo
+        before = (day >= lo - 5) & (day < lo)
+        for code, race in enumerate(RACES):
+            games = ((winner == code) & inside).sum() + ((loser == code) & inside).sum()
+            assert snapshot[race]["games"] == games
+            assert abs(snapshot[race]["win_rate"] - ((winner == code) & inside).sum() / games) < 1e-12
+            assert snapshot[race]["ci_low"] < snapshot[race]["win_rate"] < snapshot[race]["ci_high"]
+            for matchup in snapshot[race]["matchups"]:
+                opp = RACES.index(matchup["opponent"])
+                rates = []
+                for mask in (inside, before):
+                    wins = ((winner == code) & (loser == opp) & mask).sum()
+                    rates.append(wins / (wins + ((winner == opp) & (loser == code) & mask).sum()))
+                assert abs(matchup["delta"] - (rates[0] - 0.5)) < 1e-12
+                assert abs(matchup["change"] - (rates[0] - rates[1])) < 1e-12
+        assert "change" not in match_snapshot(engine)["Terran"]
+    print("✅ match side: win rates, intervals, matchup deltas and change vs the previous window")
+
+
+def test_cs_endpoint():
+    from starlette.testclient import TestClient
+    import cs_feedback_agent
+    import cs_feedback_agent_executor as cs
+
+    original = list(cs.FEEDBACK_DATA)
+    try:
+        client = TestClient(cs_feedback_agent.app)
+        before = client.get("/feedback_snapshot", params={"since": "2025-10-01", "until": "2025-10-04"}).json()
+        assert before["all"]["complaints"] == len(original)
+        assert before["Terran"]["complaints"] == sum(f["race"] == "Terran" for f in original)
+        assert before["Terran"]["sentiment"] < 0
+
+        cs.ingest_feedback([{"race": "Terran", "complaint": "테란 마린 러시 막을 방법이 없습니다!", "date": "2025-10-04", "upvotes": 500}])
+        after = client.get("/feedback_snapshot", params={"since": "2025-10-01", "until": "2025-10-04"}).json()
+        assert after["Terran"]["complaints"] == before["Terran"]["complaints"] + 1
+        assert after["Terran"]["upvotes"] == before["Terran"]["upvotes"] + 500
+        assert client.get("/feedback_snapshot", params={"since": "10월"}).status_code == 400
+    finally:
+        cs.FEEDBACK_DATA[:] = original
+        cs._trends = cs._rollup = None
+        cs._snapshots.clear()
+    print("✅ CS /feedback_snapshot: totals per race, updated on ingest, 400 on bad dates")
+
+
+def test_coordinator_tool():
+    import cs_feedback_agent_executor as cs
+    import game_balance_agent
+
+    calls = []
+
+    async def fake_get_json(agent_name, path, params=None, timeout=10):
+        calls.append((agent_name, path, params))
+        return cs.snapshot_feedback(**(params or {}))
+
+    async def unavailable(agent_name, path, params=None, timeout=10):
+        raise ConnectionError("cs down")
+
+    original = game_balance_agent.a2a_client.get_json
+    try:
+        game_balance_agent.a2a_client.get_json = fake_get_json
+        result = asyncio.run(game_balance_agent.get_balance_snapshot(race="저그", until="2025-10-04"))
+        assert result["status"] == "success", result
+        assert calls == [("cs", "/feedback_snapshot", {"until": "2025-10-04"})]
+        data = result["content"][1]["json"]
+        zerg = data["races"][0]
+        assert [entry["race"] for entry in data["races"]] == ["Zerg"] and zerg["games"] > 0
+        assert zerg["feedback"]["complaints"] == 2 and 0 < zerg["feedback"]["share"] < 1
+        assert "Zerg 승률" in result["content"][0]["text"] and "불만 2건" in result["content"][0]["text"]
+
+        result = asyncio.run(game_balance_agent.get_balance_snapshot())
+        assert len(result["content"][1]["json"]["races"]) == len(RACES)
+
+        game_balance_agent.a2a_client.get_json = unavailable
+        result = asyncio.run(game_balance_agent.get_balance_snapshot(race="Protoss"))
+        assert result["content"][1]["json"]["races"][0]["feedback"] is None
+        assert "피드백 정보 없음" in result["content"][0]["text"]
+        assert asyncio.run(game_balance_agent.get_balance_snapshot(race="Elf"))["status"] == "error"
+    finally:
+        game_balance_agent.a2a_client.get_json = original
+    print("✅ get_balance_snapshot joins win rates and complaints in one call (match side still served if CS is down)")
+
+
+if __name__ == "__main__":
+    test_feedback_rollup()
+    test_match_snapshot()
+    test_cs_endpoint()
+    test_coordinator_tool()
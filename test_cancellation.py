@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Test cooperative cancellation (A2A tasks/cancel → Strands cancel_signal → sub-agent cancel)"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
+
+from a2a.types import Message, MessageSendConfiguration, MessageSendParams, Part, Role, TaskIdParams, TaskState, TextPart
+
+from agent_test_helpers import cs_handler, fake_cs_agents
+from cancellation import cancellations, current_cancellation
+
+
+class SlowAgent:
+    """Stands in for the Strands agent: streams until its cancel_signal is set"""
+
+    def __init__(self):
+        self.signals = []
+        self.messages = []
+
+    async def stream_async(self, prompt, cancel_signal=None):
+        self.signals.append(cancel_signal)
+        for _ in range(500):
+            if cancel_signal.is_set():
+                return
+            await asyncio.sleep(0.01)
+            yield {"data": "..."}
+
+    async def invoke_async(self, prompt, cancel_signal=None):
+        raise AssertionError("cancelled task must not fall back to invoke_async")
+
+
+def test_cancellation_scope_callbacks():
+    async def run():
+        calls = []
+
+        async def remote_cancel():
+            calls.append("remote")
+
+        with cancellations.scope("task-1") as cancellation:
+            assert current_cancellation() is cancellation
+            cancellation.on_cancel(remote_cancel)
+            discard = cancellation.on_cancel(remote_cancel)
+            discard()
+            assert await cancellations.cancel("task-1")
+            assert cancellation.signal.is_set() and calls == ["remote"]
+            # 취소 후 등록된 콜백은 바로 실행
+            cancellation.on_cancel(remote_cancel)
+            await asyncio.sleep(0)
+            assert calls == ["remote", "remote"]
+        assert current_cancellation() is None
+        assert not await cancellations.cancel("task-1")
+
+    asyncio.run(run())
+    print("✅ cancellation scope runs callbacks once")
+
+
+def test_a2a_cancel_stops_executor():
+    fake = SlowAgent()
+    handler = cs_handler()
+
+    async def run():
+        message = Message(role=Role.user, parts=[Part(TextPart(text="피드백 보여줘"))], message_id="m1")
+        # blocking=False: 실행 중인 태스크를 바로 돌려받는다
+        params = MessageSendParams(message=message, configuration=MessageSendConfiguration(blocking=False))
+        task = await handler.on_message_send(params)
+        await asyncio.sleep(0.05)
+        assert fake.signals and not fake.signals[0].is_set()
+
+        start = time.perf_counter()
+        result = await handler.on_cancel_task(TaskIdParams(id=task.id))
+        elapsed = time.perf_counter() - start
+        assert result.status.state == TaskState.canceled, result.status.state
+        assert fake.signals and fake.signals[0].is_set()
+        assert elapsed < 0.5, elapsed
+        return elapsed
+
+    with fake_cs_agents(lambda messages: fake):
+        elapsed = asyncio.run(run())
+    print(f"✅ tasks/cancel stops the running agent ({elapsed * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    test_cancellation_scope_callbacks()
+    test_a2a_cancel_stops_executor()
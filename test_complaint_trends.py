@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Test the streaming heavy-hitter complaint keyword tracker"""
+
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
+
+import cs_feedback_agent_executor
+from complaint_trends import ComplaintTrends, keywords
+from generate_synthetic_data import build_complaint_pool
+from match_store import RACES, day_to_date
+
+
+def synthetic_feedback(count: int, days: int, seed: int = 7):
+    """Zipf-skewed complaints (same templates as generate_synthetic_data.py)"""
+    rng = np.random.default_rng(seed)
+    pool = build_complaint_pool()
+    weights = 1 / np.arange(1, len(pool) + 1) ** 1.1
+    picks = rng.choice(len(pool), size=count, p=weights / weights.sum())
+    first = 20000
+    for i, p in enumerate(picks.tolist()):
+        race, text = pool[p]
+        yield {"race": RACES[race], "complaint": text, "date": day_to_date(first + i * days // count)}
+
+
+def test_keywords():
+    assert keywords("테란 마린 러시가 너무 강력합니다. 초반 방어가 불가능해요.") == [
+        "마린", "러시", "마린 러시", "강력", "초반", "방어", "불가능", "초반 방어", "방어 불가능"]
+    assert keywords("저그 뮤탈이 너프되어서 이제 쓸모가 없습니다.") == ["뮤탈", "너프", "뮤탈 너프"]
+    assert keywords("프로토스 스톰 공격력이 사기입니다. 상대할 방법이 없어요.") == [
+        "스톰", "공격력", "사기", "스톰 공격력", "공격력 사기"]
+    print("✅ keywords: particles, endings and race names removed, adjacent bigrams kept")
+
+
+def test_heavy_hitters_match_exact_counts():
+    feedback = list(synthetic_feedback(30000, days=5))
+    trends = ComplaintTrends(capacity=64, horizon_days=30)
+    trends.extend(feedback)
+    exact = Counter(term for item in feedback if item["race"] == "Zerg" for term in keywords(item["complaint"]))
+
+    top = trends.top("Zerg", "30d", k=10)
+    assert top["complaints"] == sum(item["race"] == "Zerg" for item in feedback)
+    for entry in top["keywords"]:
+        # 실제 횟수는 보고된 하한과 상한 사이에 있다
+        assert entry["count_low"] <= exact[entry["keyword"]] <= entry["count_high"], entry
+    assert [e["keyword"] for e in top["keywords"][:5]] == [term for term, _ in exact.most_common(5)]
+    print(f"✅ Zerg top-5 matches exact counts: {[e['keyword'] for e in top['keywords'][:5]]}")
+
+
+def test_bounds_cover_keywords_dropped_on_some_days():
+    # 둘째 날 요약(용량 2)에서 마린이 밀려나 합계 count(5)는 실제(6)보다 작다
+    trends = ComplaintTrends(capacity=2, horizon_days=30)
+    for word, repeat, date in [("마린", 5, "2025-10-01"), ("마린", 1, "2025-10-02"),
+                               ("뮤탈", 3, "2025-10-02"), ("스톰", 3, "2025-10-02")]:
+        for _ in range(repeat):
+            trends.add({"race": "Terran", "complaint": word, "date": date})
+    exact = {"마린": 6, "뮤탈": 3, "스톰": 3}
+    entries = {e["keyword"]: e for e in trends.top("Terran", "2d")["keywords"]}
+    assert entries["마린"]["count"] < exact["마린"]
+    for term, entry in entries.items():
+        assert entry["count_low"] <= exact[term] <= entry["count_high"], entry
+    print(f"✅ count bounds hold when a keyword drops out of a day summary: {entries['마린']}")
+
+
+def test_memory_fixed_and_window_slides():
+    trends = ComplaintTrends(capacity=32, horizon_days=7)
+    trends.extend(synthetic_feedback(20000, days=60))
+    bound = (1 + len(RACES)) * 7 * 32
+    assert trends.counters() <= bound, trends.counters()
+    held = trends.counters()
+    trends.extend(synthetic_feedback(20000, days=60, seed=8))
+    assert trends.counters() <= bound
+
+    # 새 날짜의 컴플레인만 1일 창에 들어간다
+    last = trends.top(window="24h")["to"]
+    trends.add({"race": "Protoss", "complaint": "프로토스 예언자 공격력이 사기입니다.", "date": last})
+    new_day = day_to_date(trends.latest_day + 1)
+    trends.add({"race": "Protoss", "complaint": "프로토스 예언자 공격력이 사기입니다.", "date": new_day})
+    day = trends.top("Protoss", "1d")
+    assert day["from"] == day["to"] == new_day and day["complaints"] == 1
+    assert {e["keyword"] for e in day["keywords"]} == {"예언자", "공격력", "사기", "예언자 공격력", "공격력 사기"}
+    assert trends.top("Protoss", "2d")["complaints"] > 1
+    print(f"✅ 40k complaints over 60 days held in {held} counters (bound {bound}); 1-day window slides")
+
+
+def test_tool_and_query_speed():
+    original = list(cs_feedback_agent_executor.FEEDBACK_DATA)
+    cs_feedback_agent_executor._trends = cs_feedback_agent_executor._rollup = None
+    try:
+        cs_feedback_agent_executor.record_feedback(
+            {"race": "Zerg", "complaint": "저그 히드라 사거리가 짧아서 쓸모가 없어요.", "urgency": "medium",
+             "date": "2025-10-04", "upvotes": 10})
+        result = cs_feedback_agent_executor.trending_complaints(race="저그", window="24h", k=3)
+        assert result["status"] == "success", result
+        data = result["content"][1]["json"]
+        assert data["from"] == data["to"] == "2025-10-04" and "히드라 사거리" in {e["keyword"] for e in data["keywords"]}
+        cs_feedback_agent_executor.record_feedback(
+            {"race": "Zerg", "complaint": "저그 히드라 체력이 약해요.", "urgency": "low", "date": "2025-10-04", "upvotes": 1})
+        data = cs_feedback_agent_executor.trending_complaints(race="Zerg", window="1d")["content"][1]["json"]
+        assert data["complaints"] == 2
+        assert data["keywords"][0] == {"keyword": "히드라", "count": 2, "count_low": 2, "count_high": 2}
+        assert cs_feedback_agent_executor.trending_complaints(race="Elf")["status"] == "error"
+        assert cs_feedback_agent_executor.trending_complaints(window="soon")["status"] == "error"
+    finally:
+        # 수집 때 만든 누적 집계도 버려야 다음 테스트가 원래 데이터만 본다
+        cs_feedback_agent_executor.FEEDBACK_DATA[:] = original
+        cs_feedback_agent_executor._trends = cs_feedback_agent_executor._rollup = None
+        cs_feedback_agent_executor._snapshots.clear()
+
+    trends = ComplaintTrends(capacity=256, horizon_days=30)
+    trends.extend(synthetic_feedback(50000, days=30))
+    started = time.perf_counter()
+    trends.top("Terran", "7d", 10)
+    first = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(1000):
+        trends.top("Terran", "7d", 10)
+    repeated = (time.perf_counter() - started) / 1000
+    assert repeated < 1e-4, repeated
+    print(f"✅ trending_complaints tool; query {first * 1e3:.1f} ms fresh, {repeated * 1e6:.1f} µs repeated")
+
+
+if __name__ == "__main__":
+    test_keywords()
+    test_heavy_hitters_match_exact_counts()
+    test_bounds_cover_keywords_dropped_on_some_days()
+    test_memory_fixed_and_window_slides()
+    test_tool_and_query_speed()
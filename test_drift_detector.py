@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Test online win-rate drift detection and the coordinator alert webhook"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
+
+from drift_detector import DriftMonitor, DriftWatcher, EwmaCusum
+from match_store import COLUMNS, MatchStore, race_code
+
+TERRAN, ZERG, PROTOSS = (race_code(r) for r in ("Terran", "Zerg", "Protoss"))
+
+
+def matches(count: int, rng, terran_vs_zerg: float = 0.5, first_day: int = 20000, days: int = 10) -> dict:
+    """Non-mirror matches; Terran wins ``terran_vs_zerg`` of TvZ, every other matchup is 50%"""
+    a = rng.integers(0, 3, count)
+    b = (a + rng.integers(1, 3, count)) % 3
+    tvz = ((a == TERRAN) & (b == ZERG)) | ((a == ZERG) & (b == TERRAN))
+    first_wins = rng.random(count) < np.where(tvz & (a == TERRAN), terran_vs_zerg,
+                                              np.where(tvz, 1 - terran_vs_zerg, 0.5))
+    winner, loser = np.where(first_wins, a, b), np.where(first_wins, b, a)
+    return {
+        "game_id": np.arange(count), "winner": winner, "loser": loser,
+        "duration": np.full(count, 900), "day": first_day + np.arange(count) * days // count,
+        "bracket": np.zeros(count, dtype=int),
+    }
+
+
+def test_no_false_alarms_and_clear():
+    rng = np.random.default_rng(1)
+    detector = EwmaCusum()
+    events = [detector.update(int(w)) for w in rng.random(200000) < 0.5]
+    assert not any(events), [e for e in events if e]
+
+    detector = EwmaCusum()
+    events = [detector.update(int(w)) for w in rng.random(5000) < 0.6]
+    assert events.count("up") == 1 and "down" not in events
+    detected = events.index("up")
+    events = [detector.update(int(w)) for w in rng.random(5000) < 0.5]
+    assert events.count("cleared") == 1 and detector.alarm is None
+    print(f"✅ 200k balanced matches: no alert; 60% stream alerted once after {detected} matches, then cleared")
+
+
+def test_monitor_on_match_store():
+    rng = np.random.default_rng(2)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MatchStore.create(Path(tmp) / "logs.store")
+        store.append_columns(matches(30000, rng))
+        monitor = DriftMonitor(warmup=20000)
+        # 처음 붙을 때는 조용히 따라잡고 현재 경보만 보고한다
+        assert monitor.catch_up(store) == []
+        assert monitor.position == len(store) and monitor.catch_up(store) == []
+
+        store.append_columns(matches(20000, rng, terran_vs_zerg=0.62, first_day=20010))
+        started = time.perf_counter()
+        alerts = monitor.catch_up(store)
+        per_match = (time.perf_counter() - started) / 20000
+        streams = {a["stream"]: a for a in alerts}
+        assert streams["Terran vs Zerg"]["event"] == "up" and streams["Zerg"]["event"] == "down", alerts
+        assert "Zerg vs Protoss" not in streams and streams["Terran vs Zerg"]["date"] >= "2024-10-04"
+        assert per_match < 2e-5, per_match
+
+        # 새로 붙은 모니터(재시작)는 이미 경보 상태인 스트림을 한 번에 알려준다
+        restarted = DriftMonitor(warmup=20000).catch_up(store)
+        assert "Terran vs Zerg" in {a["stream"] for a in restarted}
+
+        published = []
+        watcher = DriftWatcher(lambda: monitor.catch_up(store), type("P", (), {"publish": lambda self, a: published.extend(a)})())
+        store.append_columns(matches(30000, rng, first_day=20020))
+        watcher.poll()
+        assert {a["event"] for a in published if a["stream"] == "Terran vs Zerg"} == {"cleared"}, published
+    print(f"✅ TvZ drift alerted from the match store at {per_match * 1e6:.1f} µs/match, cleared after recovery")
+
+
+def test_coordinator_webhook():
+    from starlette.testclient import TestClient
+    import game_balance_agent
+
+    calls = []
+
+    async def fake_call_agent(agent_name, query, continue_conversation=True, priority=None):
+        calls.append((agent_name, query, continue_conversation, priority, game_balance_agent.coordinator_session.get()))
+        return "테란이 저그 상대로 62% 승률입니다.", [{"race": "Terran", "win_rate": 0.62}]
+
+    original = game_balance_agent.a2a_client.call_agent
+    game_balance_agent.a2a_client.call_agent = fake_call_agent
+    game_balance_agent.drift_alerts.clear()
+    try:
+        alert = {"id": "a1", "stream": "Terran vs Zerg", "kind": "matchup", "event": "up", "win_rate": 0.62,
+                 "target": 0.5, "matches": 5000, "date": "2025-10-01", "detected_at": "2025-10-01T00:00:00+00:00"}
+        with TestClient(game_balance_agent.app) as client:
+            response = client.post("/alerts", json={"alerts": [alert]})
+            assert response.status_code == 200 and response.json() == {"received": 1}
+            for _ in range(100):
+                if "analysis" in game_balance_agent.drift_alerts["a1"]:
+                    break
+                time.sleep(0.02)
+            assert client.post("/alerts", content=b"not json").status_code == 400
+            # 형식이 틀린 경보는 저장하지 않고 400 (get_balance_alerts 포맷팅에서 터지지 않도록)
+            for bad in ({"alerts": [dict(alert, id="b1", win_rate="62%")]}, {"alerts": [dict(alert, id="b2", stream="Elf")]},
+                        {"alerts": [dict(alert, id="b3", event="sideways")]}, {"alerts": "a1"}, [alert]):
+                assert client.post("/alerts", json=bad).status_code == 400, bad
+            assert list(game_balance_agent.drift_alerts) == ["a1"]
+        agent, query, fresh, priority, session = calls[0]
+        assert agent == "data" and "Terran vs Zerg" in query and fresh is False
+        assert priority == "batch" and session == "alert-a1"
+
+        result = game_balance_agent.get_balance_alerts()
+        data = result["content"][1]["json"]
+        assert data["alerts"][0]["analysis_data"] == [{"race": "Terran", "win_rate": 0.62}]
+        assert "62%" in result["content"][0]["text"]
+
+        game_balance_agent.drift_alerts["a2"] = dict(alert, id="a2", event="cleared", win_rate=0.51)
+        assert game_balance_agent.get_balance_alerts()["content"][1]["json"]["alerts"] == []
+    finally:
+        game_balance_agent.a2a_client.call_agent = original
+        game_balance_agent.drift_alerts.clear()
+    print("✅ /alerts webhook pre-computed the analysis (batch priority) and get_balance_alerts returns it")
+
+
+def test_script_shares_module_state():
+    # `python agents/game_balance_agent.py` 로 실행해도 executor 가 모듈을 다시 import 해 두 번째 사본(빈 경보 저장소)을 만들지 않는다
+    code = (
+        "import runpy, sys\n"
+        "sys.argv = ['game_balance_agent.py', '--profile-startup']\n"
+        "try:\n    runpy.run_path('agents/game_balance_agent.py', run_name='__main__')\n"
+        "except SystemExit:\n    pass\n"
+        "print('LOADED', 'game_balance_agent' in sys.modules)\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parent, capture_output=True, text=True,
+                         env={**os.environ, "PYTHONPATH": str(Path(__file__).parent / "agents")}, timeout=120)
+    assert "LOADED False" in out.stdout, out.stdout[-500:] + out.stderr[-2000:]
+    print("✅ script run does not load a second copy of game_balance_agent (no duplicate alert store)")
+
+
+if __name__ == "__main__":
+    test_no_false_alarms_and_clear()
+    test_monitor_on_match_store()
+    test_coordinator_webhook()
+    test_script_shares_module_state()
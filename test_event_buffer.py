@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Test the bounded, coalescing event buffers (slow SSE consumers)"""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
+
+from a2a.server.events import EventQueue
+from a2a.types import (
+    Artifact, Message, Part, Role, TaskArtifactUpdateEvent, TaskState, TaskStatus, TaskStatusUpdateEvent, TextPart,
+)
+
+from event_buffer import BoundedEventQueue, StreamBuffer
+
+
+def chunk(text, artifact_id="answer"):
+    return TaskArtifactUpdateEvent(
+        task_id="t1", context_id="c1",
+        artifact=Artifact(artifact_id=artifact_id, parts=[Part(TextPart(text=text))]),
+    )
+
+
+def status(text=None, final=False, state=TaskState.working):
+    message = Message(role=Role.agent, parts=[Part(TextPart(text=text))], message_id=text) if text else None
+    return TaskStatusUpdateEvent(task_id="t1", context_id="c1", final=final,
+                                 status=TaskStatus(state=state, message=message))
+
+
+async def consume(queue: EventQueue, delay: float = 0.0) -> list:
+    events = []
+    while True:
+        event = await queue.dequeue_event()
+        queue.task_done()
+        events.append(event)
+        if isinstance(event, TaskStatusUpdateEvent) and event.final:
+            return events
+        await asyncio.sleep(delay)
+
+
+def test_lagging_consumer_gets_latest_progress():
+    async def run():
+        queue = EventQueue()
+        held = []
+        async with BoundedEventQueue(queue, limit=4) as buffer:
+            # 소비자가 아직 없는 동안 생산: 진행 상황은 최신 것만 남고 artifact 는 모두 전달된다
+            producer = asyncio.create_task(produce(buffer, held))
+            await asyncio.sleep(0.1)
+            consumer = asyncio.create_task(consume(queue))
+            await producer
+            await buffer.enqueue_event(status(final=True, state=TaskState.completed))
+        return await consumer, buffer, max(held)
+
+    async def produce(buffer, held):
+        for i in range(200):
+            await buffer.enqueue_event(status(f"progress {i}"))
+            if i % 50 == 0:
+                await buffer.enqueue_event(chunk(f"part {i}", artifact_id=f"a{i}"))
+            held.append(buffer.depth + len(buffer.pending))
+
+    events, buffer, max_held = asyncio.run(run())
+    artifacts = [e.artifact.artifact_id for e in events if isinstance(e, TaskArtifactUpdateEvent)]
+    assert artifacts == ["a0", "a50", "a100", "a150"], artifacts
+    snapshots = [e.status.message.parts[0].root.text for e in events[:-1] if isinstance(e, TaskStatusUpdateEvent)]
+    assert snapshots[-1] == "progress 199", snapshots
+    assert events[-1].final and len(events) < 20, len(events)
+    assert max_held <= 2 * 4 + 1, max_held
+    assert buffer.depth == 0
+    print(f"✅ 205 events → {len(events)} delivered (dropped {buffer.dropped} snapshots), at most {max_held} held")
+
+
+def test_back_pressure_and_terminal_events():
+    async def run():
+        queue = EventQueue()
+        async with BoundedEventQueue(queue, limit=2) as buffer:
+
+            async def produce():
+                # artifact 는 버릴 수 없으므로 버퍼가 차면 생산자가 기다린다
+                for i in range(10):
+                    await buffer.enqueue_event(chunk(f"part {i}", artifact_id=f"a{i}"))
+                await buffer.enqueue_event(status(final=True, state=TaskState.completed))
+
+            producer = asyncio.create_task(produce())
+            await asyncio.sleep(0.1)
+            blocked = not producer.done()
+            held = buffer.depth + len(buffer.pending)
+            events = await consume(queue, delay=0.001)
+            await producer
+        # 블록을 나오면 EventQueue 의 원래 dequeue_event 로 돌아간다
+        assert "dequeue_event" not in vars(queue)
+        return blocked, held, events
+
+    blocked, held, events = asyncio.run(run())
+    assert blocked and held <= 2 * 2 + 1, held
+    assert [e.artifact.artifact_id for e in events[:-1]] == [f"a{i}" for i in range(10)]
+    assert events[-1].final
+    print(f"✅ artifacts back-pressure the producer ({held} held), final event delivered last")
+
+
+def test_fast_consumer_passes_through():
+    async def run():
+        queue = EventQueue()
+        async with BoundedEventQueue(queue, limit=4) as buffer:
+            consumer = asyncio.create_task(consume(queue))
+            for i in range(3):
+                await buffer.enqueue_event(status(f"step {i}"))
+                await asyncio.sleep(0.01)
+            await buffer.enqueue_event(status(final=True, state=TaskState.completed))
+        return await consumer, buffer
+
+    events, buffer = asyncio.run(run())
+    assert len(events) == 4 and buffer.dropped == 0 and buffer.depth == 0
+    print("✅ events pass through unchanged while the consumer keeps up")
+
+
+def test_stream_buffer_merges_thread_output():
+    async def run():
+        buffer = StreamBuffer(asyncio.get_running_loop(), merge_kinds=("stdout",), snapshot_kinds=("progress",))
+
+        def agent_thread():
+            for i in range(500):
+                buffer.put("stdout", f"{i} ")
+                if i % 100 == 0:
+                    buffer.put("progress", ("cs", f"step {i}"))
+            buffer.put("final", "answer")
+            buffer.put("done")
+
+        thread = threading.Thread(target=agent_thread)
+        thread.start()
+        thread.join()
+        items = await buffer.drain()
+        return items
+
+    items = asyncio.run(run())
+    kinds = [kind for kind, _ in items]
+    assert kinds[-2:] == ["final", "done"]
+    assert kinds.count("progress") == 1 and dict(items)["progress"] == ("cs", "step 400")
+    assert "".join(content for kind, content in items if kind == "stdout") == "".join(f"{i} " for i in range(500))
+    assert len(items) <= 5, kinds
+    print(f"✅ 507 thread items drained as {len(items)}")
+
+
+if __name__ == "__main__":
+    test_lagging_consumer_gets_latest_progress()
+    test_back_pressure_and_terminal_events()
+    test_fast_consumer_passes_through()
+    test_stream_buffer_merges_thread_output()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Test the batch urgency / sentiment classifier for forum feedback"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
+
+import cs_feedback_agent_executor
+from feedback_classifier import FeedbackClassifier
+from generate_synthetic_data import generate_feedback
+
+HAND_LABELED = Path(__file__).parent / "data" / "feedback_data.json"
+
+
+def synthetic_feedback(count: int) -> list:
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / "feedback.json"
+        generate_feedback(argparse.Namespace(
+            count=count, out=str(out), race_weights="Terran:1.5,Zerg:1.0,Protoss:1.0",
+            urgency_mix="high:0.25,medium:0.45,low:0.30", zipf=1.1, seed=42, start_date="2025-10-01", days=90,
+        ))
+        return json.loads(out.read_text(encoding="utf-8"))
+
+
+def test_matches_hand_labels():
+    feedback = json.loads(HAND_LABELED.read_text(encoding="utf-8"))
+    result = FeedbackClassifier().classify(feedback)
+    expected = [item["urgency"] for item in feedback]
+    assert result["urgency"].tolist() == expected, list(zip(expected, result["urgency"].tolist()))
+    assert set(result["sentiment"].tolist()) <= {"negative", "neutral"}
+    print(f"✅ all {len(feedback)} hand-labeled posts reproduced")
+
+
+def test_lexicon_and_velocity():
+    classifier = FeedbackClassifier()
+    classifier.classify([{"complaint": "평범한 글", "upvotes": n, "date": "2025-10-01"} for n in (10, 30, 80, 200, 500)])
+    posts = [
+        {"complaint": "저그 럴커 버그 때문에 게임이 튕깁니다. 제발 빨리 고쳐주세요!", "upvotes": 40, "date": "2025-10-10"},
+        {"complaint": "저그 럴커 사거리 조정 건의합니다.", "upvotes": 40, "date": "2025-10-10"},
+        {"complaint": "이번 패치 정말 재밌어요. 감사합니다", "upvotes": 40, "date": "2025-10-10"},
+    ]
+    result = classifier.classify(posts, observe=False)
+    assert result["urgency"].tolist() == ["high", "medium", "low"], result
+    assert result["sentiment"].tolist() == ["negative", "neutral", "positive"], result
+    # 같은 추천 수라도 하루 만에 모인 글이 열흘 걸린 글보다 급하다
+    fresh, old = classifier.classify([
+        {"complaint": "탱크 사거리", "upvotes": 300, "date": "2025-10-20"},
+        {"complaint": "탱크 사거리", "upvotes": 300, "date": "2025-10-10"},
+    ], as_of="2025-10-20", observe=False)["urgency_score"]
+    assert fresh > old
+    print("✅ lexicon terms and upvote velocity move urgency / sentiment the right way")
+
+
+def test_batch_throughput():
+    feedback = synthetic_feedback(50000)
+    labels = np.array([item["urgency"] for item in feedback])
+    classifier = FeedbackClassifier()
+    started = time.perf_counter()
+    result = classifier.classify(feedback)
+    elapsed = time.perf_counter() - started
+    scores = result["urgency_score"]
+    means = [scores[labels == urgency].mean() for urgency in ("low", "medium", "high")]
+    accuracy = (result["urgency"] == labels).mean()
+    assert means[0] < means[1] < means[2], means
+    # 합성 데이터의 긴급도는 추천 수로만 드러난다 (문구는 무작위): 다수 클래스(45%)보다 나아야 한다
+    assert accuracy > 0.5, accuracy
+    assert len(feedback) / elapsed > 20000, elapsed
+    print(f"✅ {len(feedback):,} posts in {elapsed * 1e3:.0f} ms ({len(feedback) / elapsed:,.0f}/s), "
+          f"accuracy {accuracy:.0%} on synthetic labels")
+
+
+def test_ingested_posts_are_filterable():
+    original = list(cs_feedback_agent_executor.FEEDBACK_DATA)
+    try:
+        cs_feedback_agent_executor.feedback_classifier()
+        posts = cs_feedback_agent_executor.ingest_feedback([
+            {"race": "Protoss", "complaint": "프로토스 캐리어 버그로 게임이 튕깁니다. 당장 고쳐주세요!", "date": "2025-10-06", "upvotes": 900},
+            {"race": "Protoss", "complaint": "프로토스 추적자 점멸 쿨타임 의견입니다.", "date": "2025-10-06", "upvotes": 12},
+        ])
+        assert [post["urgency"] for post in posts] == ["high", "low"], posts
+        result = cs_feedback_agent_executor.get_feedback(urgency="high", race="Protoss")
+        complaints = [item["complaint"] for item in result["content"][1]["json"]["feedback"]]
+        assert posts[0]["complaint"] in complaints and posts[1]["complaint"] not in complaints
+        # 손으로 붙인 라벨은 바꾸지 않는다
+        assert [item["urgency"] for item in original] == [item["urgency"] for item in cs_feedback_agent_executor.FEEDBACK_DATA[:len(original)]]
+    finally:
+        cs_feedback_agent_executor.FEEDBACK_DATA[:] = original
+        cs_feedback_agent_executor._trends = cs_feedback_agent_executor._rollup = None
+        cs_feedback_agent_executor._snapshots.clear()
+    print("✅ ingested posts labeled in one batch and found by get_feedback(urgency=...)")
+
+
+def test_post_feedback_route():
+    from starlette.testclient import TestClient
+    import cs_feedback_agent
+
+    cs = cs_feedback_agent_executor
+    original, max_feedback = list(cs.FEEDBACK_DATA), cs.MAX_FEEDBACK
+    try:
+        cs.complaint_trends()
+        client = TestClient(cs_feedback_agent.app)
+        response = client.post("/feedback", json={"feedback": [
+            {"race": "저그", "complaint": "저그 가시촉수 버그로 게임이 튕깁니다. 당장 고쳐주세요!", "date": "2025-10-06", "upvotes": 900},
+            {"race": "Zerg", "complaint": "저그 가시촉수 사거리 건의합니다.", "date": "2025-10-06", "upvotes": 3},
+        ]})
+        assert response.status_code == 200, response.text
+        assert [label["urgency"] for label in response.json()["labels"]] == ["high", "low"]
+        result = cs.get_feedback(urgency="high", race="Zerg")["content"][1]["json"]
+        assert any("가시촉수" in item["complaint"] for item in result["feedback"])
+        assert "가시촉수" in {e["keyword"] for e in cs.trending_complaints(race="Zerg", window="1d")["content"][1]["json"]["keywords"]}
+
+        for bad in ({"race": "Elf", "complaint": "x", "date": "2025-10-06"}, {"race": "Zerg", "complaint": "", "date": "2025-10-06"},
+                    {"race": "Zerg", "complaint": "x", "date": "어제"}, {"race": "Zerg", "complaint": "x", "date": "2025-10-06", "upvotes": -1},
+                    {"feedback": []}):
+            assert client.post("/feedback", json=bad).status_code == 400, bad
+
+        # 메모리 상한: 오래된 글부터 버리고, get_feedback 은 최근 limit 건만 돌려준다
+        cs.MAX_FEEDBACK = 5
+        client.post("/feedback", json=[{"race": "Terran", "complaint": f"테란 글 {i}", "date": "2025-10-07", "upvotes": i}
+                                       for i in range(8)])
+        assert len(cs.FEEDBACK_DATA) == 5 and cs.FEEDBACK_DATA[-1]["complaint"] == "테란 글 7"
+        data = cs.get_feedback(race="Terran", limit=2)["content"][1]["json"]
+        assert data["count"] == 5 and [f["complaint"] for f in data["feedback"]] == ["테란 글 6", "테란 글 7"]
+        # 상한에서도 캐시 버전은 계속 오르고, 잘려 나간 글도 스냅샷 누적값에 남는다
+        version = cs.answer_cache.version()
+        cs.ingest_feedback([{"race": "Terran", "complaint": "테란 글 8", "date": "2025-10-07", "upvotes": 1}])
+        assert len(cs.FEEDBACK_DATA) == 5 and cs.answer_cache.version() != version
+        assert cs.snapshot_feedback("2025-10-07", "2025-10-07")["Terran"]["complaints"] == 9
+    finally:
+        cs.FEEDBACK_DATA[:] = original
+        cs.MAX_FEEDBACK = max_feedback
+        cs._trends = cs._rollup = None
+    print("✅ POST /feedback classifies, indexes and caps ingested posts; malformed posts get 400")
+
+
+if __name__ == "__main__":
+    test_matches_hand_labels()
+    test_lexicon_and_velocity()
+    test_batch_throughput()
+    test_ingested_posts_are_filterable()
+    test_post_feedback_route()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Test date-partitioned game log engine (windows, patches, incremental sync)"""
+
+import json
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
+
+from match_store import convert, race_code, date_to_day
+from game_log_engine import GameLogEngine, load_patches
+
+DATA_DIR = Path(__file__).parent / "data"
+LOGS = json.loads((DATA_DIR / "game_logs.json").read_text())
+
+
+def brute_force(race, since=None, until=None):
+    games = [g for g in LOGS if (since is None or g["date"] >= since) and (until is None or g["date"] <= until)]
+    wins = sum(1 for g in games if g["winner_race"] == race)
+    losses = sum(1 for g in games if g["loser_race"] == race)
+    return wins, losses
+
+
+def test_windows_match_brute_force():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = GameLogEngine(convert(DATA_DIR / "game_logs.json", Path(tmp) / "s"))
+        for since, until in [(None, None), ("2025-10-02", None), (None, "2025-10-03"), ("2025-10-03", "2025-10-04")]:
+            lo, hi = engine.resolve_window(since, until)
+            totals = engine.race_totals(lo, hi)
+            for race in ("Terran", "Zerg", "Protoss"):
+                code = race_code(race)
+                assert (int(totals["wins"][code]), int(totals["losses"][code])) == brute_force(race, since, until)
+            rows = engine.rows(lo, hi)
+            assert len(engine.store.game_id[rows]) == sum(brute_force(r, since, until)[0] for r in ("Terran", "Zerg", "Protoss"))
+        print("✅ window aggregates match brute force")
+
+
+def test_patch_and_last_days():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = GameLogEngine(
+            convert(DATA_DIR / "game_logs.json", Path(tmp) / "s"),
+            patches=load_patches(DATA_DIR / "patches.json"),
+        )
+        lo, hi = engine.resolve_window(patch="1.0.0")
+        assert (lo, hi) == (date_to_day("2025-10-01"), date_to_day("2025-10-03"))
+        lo, hi = engine.resolve_window(last_days=2)
+        assert (lo, hi) == (date_to_day("2025-10-05"), None)
+        try:
+            engine.resolve_window(patch="0.0.0")
+            assert False, "unknown patch must raise"
+        except ValueError:
+            pass
+        print("✅ patch / last_days windows")
+
+
+def test_incremental_sync_and_persisted_rollup():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = convert(DATA_DIR / "game_logs.json", Path(tmp) / "s")
+        engine = GameLogEngine(store)
+        assert engine.chronological
+
+        # 과거 날짜 행이 뒤늦게 들어오면 정렬 가정을 끈다
+        store.append([{"game_id": 99, "winner_race": "Zerg", "loser_race": "Terran", "duration": 600, "date": "2025-09-30"}])
+        assert engine.sync() == 1
+        assert not engine.chronological
+        lo, hi = engine.resolve_window(until="2025-09-30")
+        assert int(engine.race_totals(lo, hi)["wins"][race_code("Zerg")]) == 1
+        assert engine.days[0] == date_to_day("2025-09-30")
+
+        reloaded = GameLogEngine(store)
+        assert reloaded.rows_indexed == len(store)
+        assert (reloaded.matchups == engine.matchups).all()
+        print("✅ incremental sync + persisted rollup")
+
+
+def test_concurrent_rollup_saves():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = convert(DATA_DIR / "game_logs.json", Path(tmp) / "s")
+        engines = [GameLogEngine(store) for _ in range(4)]
+        errors = []
+
+        def save(engine):
+            try:
+                for _ in range(20):
+                    engine._save_rollup()
+            except Exception as e:
+                errors.append(e)
+
+        # 워커들이 같은 스토어의 롤업을 동시에 저장해도 서로의 임시 파일을 덮어쓰지 않는다
+        threads = [threading.Thread(target=save, args=(engine,)) for engine in engines]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors, errors
+        assert not list(engines[0].rollup_path.parent.glob("*.tmp.npz"))
+        assert GameLogEngine(store).rows_indexed == len(store)
+        print("✅ concurrent rollup saves: no shared temp file, rollup still loads")
+
+
+if __name__ == "__main__":
+    test_windows_match_brute_force()
+    test_patch_and_last_days()
+    test_incremental_sync_and_persisted_rollup()
+    test_concurrent_rollup_saves()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Test the seeded synthetic data generator (schema, reproducibility, race skew)"""
+
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
+
+from match_store import MatchStore, race_code
+
+SCRIPT = Path(__file__).parent / "generate_synthetic_data.py"
+GAME_KEYS = {"game_id", "winner_race", "loser_race", "duration", "date", "mmr_bracket"}
+FEEDBACK_KEYS = {"id", "race", "complaint", "urgency", "date", "upvotes"}
+
+
+def generate(*args):
+    subprocess.run([sys.executable, str(SCRIPT), *args], check=True, capture_output=True, timeout=120)
+
+
+def read_jsonl(path) -> list:
+    return [json.loads(line) for line in Path(path).read_text(encoding="utf-8").splitlines()]
+
+
+def test_game_logs_schema_and_seed():
+    with tempfile.TemporaryDirectory() as tmp:
+        a, b, c = (Path(tmp) / f"{name}.jsonl" for name in "abc")
+        generate("games", "--count", "3000", "--out", str(a), "--seed", "7", "--days", "10")
+        generate("games", "--count", "3000", "--out", str(b), "--seed", "7", "--days", "10")
+        generate("games", "--count", "3000", "--out", str(c), "--seed", "8", "--days", "10")
+        games = read_jsonl(a)
+        assert len(games) == 3000
+        assert all(set(g) == GAME_KEYS for g in games)
+        assert [g["game_id"] for g in games] == list(range(1, 3001))
+        assert all(g["winner_race"] in ("Terran", "Zerg", "Protoss") and 180 <= g["duration"] <= 5400 for g in games)
+        assert "2025-10-01" <= games[0]["date"] <= games[-1]["date"] <= "2025-10-10"
+        # 같은 시드는 바이트까지 같고 다른 시드는 다르다
+        assert a.read_bytes() == b.read_bytes()
+        assert a.read_bytes() != c.read_bytes()
+
+        # .json 은 JSON 배열로 쓴다
+        array = Path(tmp) / "games.json"
+        generate("games", "--count", "50", "--out", str(array), "--seed", "7")
+        assert len(json.loads(array.read_text(encoding="utf-8"))) == 50
+    print("✅ games: 3000 rows with the game_logs.json schema, identical for the same seed")
+
+
+def test_race_skew_shows_in_win_rates():
+    # Bradley-Terry 강도 Terran:2 → 다른 종족 상대 승률 기대값 2/3, 동족전 제외
+    with tempfile.TemporaryDirectory() as tmp:
+        store_path = Path(tmp) / "games.store"
+        generate("games", "--count", "20000", "--store", str(store_path), "--seed", "3",
+                 "--race-skew", "Terran:2,Zerg:1,Protoss:1")
+        store = MatchStore(store_path)
+        assert len(store) == 20000
+        terran = race_code("Terran")
+        mixed = store.winner != store.loser
+        wins = int(((store.winner == terran) & mixed).sum())
+        losses = int(((store.loser == terran) & mixed).sum())
+        win_rate = wins / (wins + losses)
+        assert abs(win_rate - 2 / 3) < 0.03, win_rate
+    print(f"✅ race skew Terran:2 → Terran non-mirror win rate {win_rate:.3f} (expected 0.667)")
+
+
+def test_feedback_schema_and_seed():
+    with tempfile.TemporaryDirectory() as tmp:
+        a, b = Path(tmp) / "a.jsonl", Path(tmp) / "b.jsonl"
+        for path in (a, b):
+            generate("feedback", "--count", "2000", "--out", str(path), "--seed", "5",
+                     "--urgency-mix", "high:1,medium:0,low:0")
+        posts = read_jsonl(a)
+        assert len(posts) == 2000 and a.read_bytes() == b.read_bytes()
+        assert all(set(p) == FEEDBACK_KEYS for p in posts)
+        assert {p["urgency"] for p in posts} == {"high"}
+        assert all(p["complaint"] and p["upvotes"] >= 0 for p in posts)
+    print("✅ feedback: 2000 posts with the feedback_data.json schema, identical for the same seed")
+
+
+if __name__ == "__main__":
+    test_game_logs_schema_and_seed()
+    test_race_skew_shows_in_win_rates()
+    test_feedback_schema_and_seed()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Test the in-process A2A transport (single-process mode)"""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
+
+from a2a.types import TaskState
+
+import cs_feedback_agent_executor
+from admission import AdmissionController, admission_for
+from agent_test_helpers import ScriptedAgent, ToolCallingAgent, cs_card, cs_handler, fake_cs_agents, patched
+from game_balance_agent import A2AClient, coordinator_session, progress_listener
+
+
+def local_cs():
+    handler = cs_handler()
+    client = A2AClient()
+    client.connect_local("cs", cs_card(), handler)
+    return client, handler
+
+
+def test_call_agent_in_process():
+    client, handler = local_cs()
+
+    async def run():
+        progress = []
+
+        async def listener(agent_name, text):
+            progress.append((agent_name, text))
+
+        progress_listener.set(listener)
+        result = await client.call_agent("cs", "테란 피드백")
+        return result, progress
+
+    with fake_cs_agents(lambda messages: ToolCallingAgent()):
+        (text, data), progress = asyncio.run(run())
+    # HTTP 경로와 같은 결과/진행 이벤트, 소켓 없이
+    assert text == "테란 불만 2건", text
+    assert progress == [("cs", "🔧 get_feedback 실행 중"), ("cs", "테란 불만 2건")], progress
+    print("✅ coordinator → CS agent through the in-process transport")
+
+
+def test_context_reuse_in_process():
+    fake = ScriptedAgent([
+        {"status": "input_required", "message": "어떤 종족인가요?"},
+        {"status": "completed", "message": "테란 불만 2건"},
+    ])
+    client, handler = local_cs()
+
+    async def run():
+        coordinator_session.set("gui-session")
+        first = await client.call_agent("cs", "피드백 보여줘")
+        ids = dict(client.sessions[("gui-session", "cs")])
+        second = await client.call_agent("cs", "테란")
+        task = await handler.task_store.get(ids["task_id"])
+        return first, second, ids, task
+
+    with fake_cs_agents(lambda messages: fake):
+        first, second, ids, task = asyncio.run(run())
+    assert first[0] == "어떤 종족인가요?" and second[0] == "테란 불만 2건"
+    assert ids["task_id"], ids
+    # input_required 태스크가 같은 태스크로 이어져 완료된다 (서버 상태가 클라이언트 복사본과 분리됨)
+    assert task.status.state == TaskState.completed
+    assert len(task.artifacts) == 2, task.artifacts
+    print("✅ multi-turn resume works in process; server task state is not aliased")
+
+
+def test_nested_admission_per_agent():
+    client, handler = local_cs()
+    coordinator = AdmissionController(max_concurrency=1, max_queue=4)
+    cs = AdmissionController(max_concurrency=1, max_queue=4)
+
+    async def run():
+        # 코디네이터가 자기 유일한 슬롯을 잡은 채 같은 프로세스의 하위 에이전트를 호출
+        async with coordinator.slot():
+            result = await asyncio.wait_for(client.call_agent("cs", "테란 피드백"), 5)
+            return result, coordinator.active
+
+    with fake_cs_agents(lambda messages: ToolCallingAgent()), patched(cs_feedback_agent_executor, admission=cs):
+        (text, _), held = asyncio.run(run())
+    assert text == "테란 불만 2건", text
+    # 하위 에이전트는 자기 컨트롤러의 슬롯을 쓰고 돌려준다 (코디네이터 슬롯과 별개)
+    assert held == 1 and coordinator.active == 0 and cs.active == 0
+    assert cs_feedback_agent_executor.admission is admission_for("cs") is not admission_for("data")
+    print("✅ in-process sub-agent is admitted by its own controller, no deadlock")
+
+
+def test_calls_from_another_loop_run_on_server_loop():
+    loops = []
+
+    class RecordingAgent(ToolCallingAgent):
+        async def stream_async(self, prompt, cancel_signal=None):
+            loops.append(asyncio.get_running_loop())
+            async for event in super().stream_async(prompt, cancel_signal):
+                yield event
+
+    client, handler = local_cs()
+    # 서버 루프 (single_process.serve_all) 를 흉내: 별도 스레드에서 돈다
+    server = asyncio.new_event_loop()
+    thread = threading.Thread(target=server.run_forever, daemon=True)
+    thread.start()
+    client.local_loop = server
+    try:
+        # /ask_stream 워커 스레드처럼 다른 루프에서 호출
+        with fake_cs_agents(lambda messages: RecordingAgent()):
+            text, _ = asyncio.run(asyncio.wait_for(client.call_agent("cs", "테란 피드백"), 5))
+    finally:
+        # 핸들러의 뒷정리 태스크가 끝난 뒤 루프를 멈춘다
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0.2), server).result(5)
+        asyncio.run_coroutine_threadsafe(server.shutdown_asyncgens(), server).result(5)
+        server.call_soon_threadsafe(server.stop)
+        thread.join(5)
+        server.close()
+    assert text == "테란 불만 2건", text
+    assert loops == [server], loops
+    print("✅ in-process call from a worker thread's loop runs the sub-agent on the server loop")
+
+
+if __name__ == "__main__":
+    test_call_agent_in_process()
+    test_context_reuse_in_process()
+    test_nested_admission_per_agent()
+    test_calls_from_another_loop_run_on_server_loop()
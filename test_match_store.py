@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Test memory-mapped match store (convert / append / query)"""
+
+import json
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
+
+from match_store import MatchStore, convert, encode_records, open_store, race_code, day_to_date
+
+GAME_LOGS = Path(__file__).parent / "data" / "game_logs.json"
+
+
+def test_convert_json():
+    logs = json.loads(GAME_LOGS.read_text())
+    with tempfile.TemporaryDirectory() as tmp:
+        store = convert(GAME_LOGS, Path(tmp) / "logs.store")
+        assert len(store) == len(logs)
+        assert store.game_id.tolist() == [g["game_id"] for g in logs]
+        assert day_to_date(store.day[0]) == logs[0]["date"]
+
+        terran = race_code("Terran")
+        wins = sum(1 for g in logs if g["winner_race"] == "Terran")
+        assert int((store.winner == terran).sum()) == wins
+        print(f"✅ convert: {len(store)} matches, Terran wins {wins}")
+
+
+def test_append_jsonl_and_reopen():
+    new_games = [
+        {"game_id": 101, "winner_race": "Zerg", "loser_race": "Terran", "duration": 900, "date": "2025-10-07"},
+        {"game_id": 102, "winner_race": "Protoss", "loser_race": "Zerg", "duration": 1500, "date": "2025-10-07"},
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl = Path(tmp) / "new.jsonl"
+        jsonl.write_text("\n".join(json.dumps(g) for g in new_games) + "\n")
+
+        store = convert(GAME_LOGS, Path(tmp) / "logs.store")
+        reader = MatchStore(Path(tmp) / "logs.store")
+        before = len(store)
+
+        assert store.append_file(jsonl) == 2
+        assert len(store) == before + 2
+        assert store.game_id[-1] == 102
+
+        # 다른 인스턴스는 refresh()로 새 행을 본다
+        assert reader.refresh()
+        assert len(reader) == before + 2
+        assert open_store(Path(tmp) / "logs.store").duration[-2] == 900
+        print(f"✅ append: {before} → {len(store)} matches")
+
+
+def test_encode_race_names():
+    games = [{"game_id": 1, "winner_race": "zerg", "loser_race": " TERRAN ", "duration": 900, "date": "2025-10-07"}]
+    columns = encode_records(games)
+    assert columns["winner"][0] == race_code("Zerg") and columns["loser"][0] == race_code("Terran")
+    # 알 수 없는 종족은 KeyError 대신 어느 경기·필드인지 알려주는 ValueError
+    for bad in ("Elf", None, 3):
+        try:
+            encode_records([dict(games[0], game_id=7, loser_race=bad)])
+        except ValueError as e:
+            assert "game 7" in str(e) and "loser_race" in str(e), e
+        else:
+            raise AssertionError(f"{bad!r} accepted")
+    print("✅ race names: case-insensitive, unknown race raises a clear ValueError")
+
+
+def test_concurrent_open_and_append():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "logs.store"
+        total = len(json.loads(GAME_LOGS.read_text()))
+        stores, errors = [None] * 6, []
+
+        def run(i):
+            try:
+                # 여러 워커가 처음 쓰는 기본 스토어를 동시에 연다: 한 번만 변환된다
+                stores[i] = open_store(path, GAME_LOGS)
+                stores[i].append([{"game_id": 1000 + i, "winner_race": "Zerg", "loser_race": "Terran",
+                                   "duration": 600, "date": "2025-10-08"}])
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(len(stores))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors, errors
+        assert len({store.store_id for store in stores}) == 1
+        reopened = open_store(path)
+        assert len(reopened) == total + len(stores)
+        assert sorted(reopened.game_id[total:]) == [1000 + i for i in range(len(stores))]
+        assert not [p.name for p in Path(tmp).iterdir() if p.name.endswith((".tmp", ".old"))]
+    print("✅ concurrent first open converts once; concurrent appends keep every row")
+
+
+if __name__ == "__main__":
+    test_convert_json()
+    test_append_jsonl_and_reopen()
+    test_encode_race_names()
+    test_concurrent_open_and_append()
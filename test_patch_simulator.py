@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Test Monte Carlo patch-impact simulator"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
+
+from match_store import RACES
+from patch_simulator import parse_adjustments, simulate
+
+T, Z, P = (RACES.index(r) for r in ("Terran", "Zerg", "Protoss"))
+# counts[winner, loser]
+COUNTS = np.array([
+    [0, 600, 550],
+    [400, 0, 500],
+    [450, 500, 0],
+])
+
+
+def test_parse_adjustments():
+    delta = parse_adjustments({"Terran vs Zerg": -5, "protoss": 2})
+    assert np.isclose(delta[T, Z], -0.05) and np.isclose(delta[Z, T], 0.05)
+    assert np.isclose(delta[P, T], 0.02) and np.isclose(delta[T, P], -0.02)
+    try:
+        parse_adjustments({"Marine": -5})
+        assert False, "unknown race must raise"
+    except ValueError:
+        pass
+    print("✅ parse adjustments")
+
+
+def test_projection_and_bands():
+    start = time.perf_counter()
+    none = simulate(COUNTS, seed=0)
+    nerf = simulate(COUNTS, parse_adjustments({"Terran": -5}), seed=0)
+    elapsed = time.perf_counter() - start
+
+    assert np.allclose(none["projected_race"], none["baseline_race"], atol=0.01)
+    drop = none["projected_race"][T] - nerf["projected_race"][T]
+    assert 0.04 < drop < 0.06, drop
+    low, high = nerf["race_band"]
+    assert (low <= nerf["projected_race"]).all() and (nerf["projected_race"] <= high).all()
+    assert elapsed < 1.0
+    print(f"✅ Terran -5%p → {drop * 100:.1f}%p drop ({elapsed * 1000:.0f} ms for 2 runs)")
+
+
+def test_process_pool_matches_shape():
+    result = simulate(COUNTS, parse_adjustments({"Zerg": 3}), replicates=400, seed=1, workers=2)
+    assert result["race_band"].shape == (2, len(RACES))
+    assert np.isfinite(result["projected_pair"]).all()
+    print("✅ process pool replicates")
+
+
+if __name__ == "__main__":
+    test_parse_adjustments()
+    test_projection_and_bands()
+    test_process_pool_matches_shape()
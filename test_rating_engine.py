@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Test Bradley-Terry rating engine (fit, warm start, race x bracket)"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
+
+from match_store import MatchStore, RACES, BRACKETS
+from game_log_engine import GameLogEngine
+from rating_engine import RatingEngine, fit_bradley_terry, win_probability
+
+
+def simulate_wins(strengths, games_per_pair, seed=0):
+    rng = np.random.default_rng(seed)
+    expected = win_probability(strengths)
+    k = len(strengths)
+    wins = np.zeros((k, k), dtype=np.int64)
+    for i in range(k):
+        for j in range(i + 1, k):
+            w = rng.binomial(games_per_pair, expected[i, j])
+            wins[i, j], wins[j, i] = w, games_per_pair - w
+    return wins
+
+
+def test_fit_recovers_strengths():
+    true = np.array([2.0, 1.0, 0.5])
+    strengths, _ = fit_bradley_terry(simulate_wins(true, 20000))
+    ratio = strengths / strengths[1]
+    assert np.allclose(ratio, true, rtol=0.05), ratio
+    print(f"✅ recovered strengths {ratio.round(3)}")
+
+
+def test_warm_start_converges_faster():
+    true = np.array([3.0, 1.0, 0.7, 1.5])
+    wins = simulate_wins(true, 5000)
+    cold, cold_iter = fit_bradley_terry(wins)
+    wins[0, 1] += 10
+    warm, warm_iter = fit_bradley_terry(wins, init=cold)
+    _, fresh_iter = fit_bradley_terry(wins)
+    assert warm_iter < fresh_iter
+    print(f"✅ warm start {warm_iter} vs cold {fresh_iter} iterations")
+
+
+def test_bracket_ratings_incremental():
+    records = [
+        {"game_id": i, "winner_race": "Terran", "loser_race": "Zerg", "duration": 900, "date": "2025-10-01",
+         "mmr_bracket": "Gold"}
+        for i in range(8)
+    ] + [
+        {"game_id": 100 + i, "winner_race": "Zerg", "loser_race": "Terran", "duration": 900, "date": "2025-10-01",
+         "mmr_bracket": "Master"}
+        for i in range(8)
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MatchStore.create(Path(tmp) / "s")
+        store.append(records[:8])
+        ratings = RatingEngine(GameLogEngine(store, persist=False))
+        first = ratings.bracket_ratings()
+        gold = BRACKETS.index("Gold")
+        assert first["games"][RACES.index("Terran"), gold] == 8
+
+        store.append(records[8:])
+        result = ratings.bracket_ratings()
+        master = BRACKETS.index("Master")
+        s = result["strengths"]
+        assert s[RACES.index("Terran"), gold] > s[RACES.index("Zerg"), gold]
+        assert s[RACES.index("Zerg"), master] > s[RACES.index("Terran"), master]
+        print("✅ race x bracket ratings")
+
+
+def test_bracket_ratings_reset_on_rebuilt_store():
+    def games(winner, loser, count):
+        return [{"game_id": i, "winner_race": winner, "loser_race": loser, "duration": 900, "date": "2025-10-01",
+                 "mmr_bracket": "Gold"} for i in range(count)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MatchStore.create(Path(tmp) / "s")
+        store.append(games("Terran", "Zerg", 8))
+        ratings = RatingEngine(GameLogEngine(store, persist=False))
+        ratings.bracket_ratings()
+
+        # 같은 경로에 더 많은 행으로 다시 만든 스토어: 행 수만 보면 이어 붙인 것처럼 보인다
+        MatchStore.create(Path(tmp) / "s").append(games("Zerg", "Terran", 12))
+        result = ratings.bracket_ratings()
+        gold = BRACKETS.index("Gold")
+        assert result["games"][RACES.index("Terran"), gold] == 12, result["games"]
+        s = result["strengths"]
+        assert s[RACES.index("Zerg"), gold] > s[RACES.index("Terran"), gold]
+        print("✅ bracket win matrix rebuilt when the store ID changes")
+
+
+def test_store_without_bracket_column():
+    record = {"game_id": 1, "winner_race": "Terran", "loser_race": "Zerg", "duration": 900, "date": "2025-10-01"}
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MatchStore.create(Path(tmp) / "s")
+        store.append([record, record])
+        (Path(tmp) / "s" / "bracket.bin").unlink()
+
+        old = MatchStore(Path(tmp) / "s")
+        assert old.bracket.tolist() == [0, 0]
+        old.append([dict(record, mmr_bracket="Diamond")])
+        assert old.bracket.tolist() == [0, 0, BRACKETS.index("Diamond")]
+        print("✅ optional bracket column")
+
+
+if __name__ == "__main__":
+    test_fit_recovers_strengths()
+    test_warm_start_converges_faster()
+    test_bracket_ratings_incremental()
+    test_bracket_ratings_reset_on_rebuilt_store()
+    test_store_without_bracket_column()
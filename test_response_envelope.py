@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Test incremental JSON-envelope extraction (response_envelope)"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
+
+from response_envelope import EnvelopeParser, parse_envelope, run_agent_envelope, split_thinking, strip_tags
+
+
+def feed_chunks(text, size):
+    parser = EnvelopeParser()
+    for i in range(0, len(text), size):
+        parser.feed(text[i:i + size])
+    return parser
+
+
+def test_envelope_with_prose_tags_and_braces():
+    message = '패치 {"Stim": 10} 적용 시 "승률" 52% → 50%'
+    text = (
+        "<thinking>먼저 {\"status\": \"error\"} 형식을 고민</thinking>"
+        "분석 결과입니다.\n<response>"
+        + json.dumps({"status": "completed", "message": message}, ensure_ascii=False)
+        + "</response> 추가 설명"
+    )
+    # 청크 크기를 바꿔 태그/문자열이 경계에 걸쳐도 같은 결과
+    for size in (1, 3, 7, len(text)):
+        parser = feed_chunks(text, size)
+        assert parser.complete, size
+        assert parser.finish() == ("completed", message), size
+    print("✅ envelope found through thinking tags, prose and braces in the message")
+
+
+def test_fallbacks():
+    # 따옴표가 깨진 앞부분 뒤에 있는 봉투는 raw_decode 로 찾는다
+    assert parse_envelope('잘린 "문자열 {"status": "error", "message": "실패"}') == ("error", "실패")
+    assert parse_envelope("<thinking>생각</thinking>그냥 텍스트 답변") == ("completed", "그냥 텍스트 답변")
+    assert parse_envelope('{"status": "completed", "message": {"win_rate": 0.5}}') == ("completed", '{"win_rate": 0.5}')
+    assert strip_tags("<response>답</response><thinking>잘린 생각") == "답"
+    # 봉투가 아닌 객체는 건너뛴다
+    assert parse_envelope('{"data": {"status": "x"}} {"status": "error", "message": "m"}') == ("error", "m")
+    assert split_thinking("<thinking> a </thinking>답<thinking>b</thinking>") == (["a", "b"], "답")
+    print("✅ fallbacks: raw_decode scan and cleaned plain text")
+
+
+class FakeAgent:
+    """Streams chunks with latency and keeps the history like Strands (a cancelled turn is recorded as such)"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.sent = 0
+        self.messages = []
+
+    async def stream_async(self, prompt, cancel_signal=None):
+        self.messages.append({"role": "user", "content": [{"text": prompt}]})
+        text = ""
+        for chunk in self.chunks:
+            await asyncio.sleep(0.001)
+            if cancel_signal.is_set():
+                self.messages.append({"role": "assistant", "content": [{"text": "Cancelled by user"}]})
+                return
+            self.sent += 1
+            text += chunk
+            yield {"data": chunk}
+        self.messages.append({"role": "assistant", "content": [{"text": text}]})
+        yield {"result": text}
+
+
+def test_run_agent_keeps_history():
+    chunks = ['<thinking>음</thinking>{"status": "completed", ', '"message": "끝"}', "\n"]
+    agent = FakeAgent(chunks)
+
+    async def run():
+        first = await run_agent_envelope(agent, "질문")
+        second = await run_agent_envelope(agent, "후속 질문")
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first.finish() == second.finish() == ("completed", "끝")
+    assert agent.sent == 2 * len(chunks), agent.sent
+    # 봉투가 닫혀도 턴을 끊지 않으므로 이전 답변이 대화 기록에 그대로 남는다
+    answers = [m["content"][0]["text"] for m in agent.messages if m["role"] == "assistant"]
+    assert answers == ["".join(chunks)] * 2, answers
+    print("✅ multi-turn history keeps every answer (turn not cancelled after the envelope)")
+
+
+if __name__ == "__main__":
+    test_envelope_with_prose_tags_and_braces()
+    test_fallbacks()
+    test_run_agent_keeps_history()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Test the agent supervisor (readiness polling, restart backoff, shutdown)"""
+
+import asyncio
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
+
+import run_system
+from agent_test_helpers import patched
+from run_system import AgentSpec, Supervisor
+
+# 처음 두 번은 카드 엔드포인트를 잠깐 열었다가 죽고, 세 번째부터 계속 산다
+CHILD = '''
+import sys, threading, time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+log = Path({log!r})
+runs = log.read_text().count("start") if log.exists() else 0
+
+
+class Card(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(b"{{}}")
+
+    def log_message(self, *args):
+        pass
+
+
+server = HTTPServer(("127.0.0.1", {port}), Card)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+with log.open("a") as f:
+    f.write(f"start {{time.time()}}\\n")
+if runs < 2:
+    time.sleep(0.5)
+    with log.open("a") as f:
+        f.write(f"exit {{time.time()}}\\n")
+    sys.exit(1)
+time.sleep(60)
+'''
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def events(log: Path) -> list:
+    if not log.exists():
+        return []
+    return [(kind, float(at)) for kind, at in (line.split() for line in log.read_text().splitlines())]
+
+
+def test_ready_restart_and_shutdown():
+    async def supervise(spec):
+        supervisor = Supervisor([spec])
+        task = asyncio.create_task(supervisor.run())
+        ready_pids = []
+        deadline = time.monotonic() + 30
+        # 실행마다 카드 엔드포인트가 응답하면 ready 가 켜진다 (세 번째 실행까지 기다린다)
+        while len(ready_pids) < 3 and time.monotonic() < deadline:
+            process = supervisor.processes.get(spec.name)
+            if supervisor.ready[spec.name].is_set() and process.pid not in ready_pids:
+                ready_pids.append(process.pid)
+            await asyncio.sleep(0.01)
+        await supervisor.shutdown()
+        await asyncio.wait_for(task, 10)
+        return ready_pids, process
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        log = tmp / "runs.txt"
+        port = free_port()
+        (tmp / "child.py").write_text(CHILD.format(log=str(log), port=port))
+        spec = AgentSpec("Child", "child.py", port, str(tmp / "child.log"))
+        with patched(run_system, AGENTS_DIR=tmp, RESTART_BACKOFF_INITIAL=0.3,
+                     READY_POLL_INITIAL=0.01, READY_POLL_MAX=0.05):
+            ready_pids, last = asyncio.run(supervise(spec))
+        history = events(log)
+
+    assert len(ready_pids) == 3, ready_pids
+    assert [kind for kind, _ in history] == ["start", "exit", "start", "exit", "start"], history
+    # 종료 → 다음 시작 간격: backoff 0.3s, 0.6s (+ 인터프리터 기동 시간)
+    delays = [history[i + 1][1] - history[i][1] for i in (1, 3)]
+    assert delays[0] >= 0.3 and delays[1] - delays[0] >= 0.2, delays
+    assert last.returncode is not None, "shutdown must terminate the child"
+    print(f"✅ readiness detected for 3 runs, restarts after {delays[0]:.2f}s then {delays[1]:.2f}s, "
+          f"child stopped (code {last.returncode})")
+
+
+if __name__ == "__main__":
+    test_ready_restart_and_shutdown()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Test the semantic answer cache (paraphrase hits, entity guard, invalidation)"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
+
+from a2a.types import Message, MessageSendParams, Part, Role, TaskState, TextPart
+
+from agent_test_helpers import cs_handler, fake_cs_agents
+from semantic_cache import SemanticCache, entities, normalize
+
+
+def test_paraphrases_hit():
+    cache = SemanticCache()
+    cache.store("테란 승률 알려줘", "테란 승률은 52%입니다", [{"race": "Terran"}])
+    assert normalize("테란 이기는 비율은?") == normalize("테란 승률 알려줘") == "테란 승률"
+    for query in ("테란 이기는 비율은?", "Terran win rate", "테란의 승률 좀 보여줘"):
+        hit = cache.lookup(query)
+        assert hit and hit["answer"] == "테란 승률은 52%입니다", query
+        assert hit["data"] == [{"race": "Terran"}]
+    # 비슷하지만 다른 질문은 임계값 아래
+    assert cache.lookup("테란 승률 왜 높아") is None
+    print("✅ paraphrased questions share one answer")
+
+
+def test_different_entities_never_share():
+    cache = SemanticCache(threshold=0.0)
+    cache.store("테란 승률 알려줘", "테란 52%")
+    cache.store("긴급 피드백 보여줘", "긴급 3건")
+    cache.store("1.0.1 패치 테란 승률", "1.0.1 테란 51%")
+    # 임계값이 0이어도 종족/조건/숫자가 다르면 후보에 오르지 않는다
+    for query in ("저그 승률 알려줘", "테란 경기 시간 알려줘", "피드백 보여줘", "최근 긴급 피드백",
+                  "1.0.2 패치 테란 승률", "최근 7일 테란 승률"):
+        assert cache.lookup(query) is None, query
+    assert entities(normalize("토스 승률")) == entities(normalize("Protoss winrate"))
+    print("✅ different races, topics, filters and numbers never share an answer")
+
+
+def test_invalidation_ttl_and_capacity():
+    version = [1]
+    cache = SemanticCache(version=lambda: version[0], max_entries=2)
+    cache.store("테란 승률", "a")
+    assert cache.lookup("테란 승률은?")
+    version[0] = 2
+    assert cache.lookup("테란 승률은?") is None and len(cache) == 0
+
+    for race in ("테란", "저그", "프로토스"):
+        cache.store(f"{race} 승률", race)
+    assert len(cache) == 2 and cache.lookup("테란 승률") is None
+    assert cache.lookup("저그 승률")["answer"] == "저그"
+
+    cache.ttl = 0.01
+    time.sleep(0.02)
+    assert cache.lookup("저그 승률") is None
+    print("✅ data version change, TTL and LRU capacity evict answers")
+
+
+class CountingAgent:
+    """Stands in for the Strands agent and counts real runs"""
+
+    runs = 0
+
+    def __init__(self, messages=None):
+        self.messages = list(messages or [])
+
+    async def stream_async(self, prompt, cancel_signal=None):
+        CountingAgent.runs += 1
+        self.messages += [{"role": "user", "content": [{"text": prompt}]},
+                          {"role": "assistant", "content": [{"text": "..."}]}]
+        yield {"data": '{"status": "completed", "message": "긴급 피드백 3건"}'}
+
+
+def test_executor_serves_repeat_question_from_cache():
+    agents = {}
+
+    def factory(messages):
+        agent = CountingAgent(messages)
+        agents[len(agents)] = agent
+        return agent
+
+    handler = cs_handler()
+
+    async def ask(text, context_id):
+        message = Message(role=Role.user, parts=[Part(TextPart(text=text))], message_id=text + context_id,
+                          context_id=context_id)
+        return await handler.on_message_send(MessageSendParams(message=message))
+
+    async def run():
+        first = await ask("긴급 피드백 보여줘", "c1")
+        # 다른 대화의 첫 턴: 같은 뜻의 질문은 에이전트를 다시 돌리지 않는다
+        second = await ask("긴급 피드백 좀 알려줘", "c2")
+        for task in (first, second):
+            assert task.status.state == TaskState.completed
+            assert task.artifacts[-1].parts[0].root.text == "긴급 피드백 3건"
+        assert CountingAgent.runs == 1
+        # 캐시로 답한 턴도 대화 기록에 남아 후속 질문이 이어진다
+        assert [m["content"][0]["text"] for m in agents[1].messages] == ["긴급 피드백 좀 알려줘", "긴급 피드백 3건"]
+        # 후속 턴은 앞선 대화에 따라 답이 달라지므로 캐시를 쓰지 않는다
+        await ask("긴급 피드백 보여줘", "c2")
+        assert CountingAgent.runs == 2
+
+    with fake_cs_agents(factory):
+        asyncio.run(run())
+    print("✅ executor answers a paraphrased first turn from the cache")
+
+
+if __name__ == "__main__":
+    test_paraphrases_hit()
+    test_different_entities_never_share()
+    test_invalidation_ttl_and_capacity()
+    test_executor_serves_repeat_question_from_cache()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Test the shared JSON / SSE encoding layer"""
+
+import os
+import sys
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
+
+import serialization
+from serialization import SSE_DONE, dumps, gzip_frames, loads, sse_event, sse_response
+
+
+def test_backends_agree_and_keep_korean():
+    payload = {"status": "completed", "message": "테란 승률 52.3% 🔧", "data": [1, 2.5, None, True]}
+    fast = dumps(payload)
+    orjson, serialization.orjson = serialization.orjson, None
+    try:
+        plain = dumps(payload)
+        assert loads(plain.encode()) == payload
+    finally:
+        serialization.orjson = orjson
+    assert fast == plain, (fast, plain)
+    assert "\\u" not in fast and "테란" in fast
+    assert loads(fast) == payload
+    # orjson 이 거부하는 값은 표준 json 으로 처리
+    assert loads(dumps({1: "a"})) == {"1": "a"}
+    print(f"✅ {serialization.BACKEND} and json produce identical UTF-8 output ({len(fast.encode())} bytes)")
+
+
+def test_sse_frames():
+    frame = sse_event("progress", agent="cs", content="🔧 get_feedback 실행 중")
+    assert frame.startswith(b"data: ") and frame.endswith(b"\n\n")
+    assert loads(frame[6:]) == {"type": "progress", "agent": "cs", "content": "🔧 get_feedback 실행 중"}
+    assert SSE_DONE == b'data: {"type":"done"}\n\n'
+    escaped = len(f'data: {{"type": "answer", "content": "{"테란 불만" * 50}"}}\n\n'.encode("ascii", "backslashreplace"))
+    assert len(sse_event("answer", content="테란 불만" * 50)) < escaped / 1.5
+    print("✅ SSE frames built as bytes, Korean sent as UTF-8")
+
+
+def test_gzip_flushes_every_frame():
+    import asyncio
+
+    frames = [sse_event("thinking", content=f"{i}번째 생각 " * 20) for i in range(20)] + [SSE_DONE]
+
+    async def source():
+        for frame in frames:
+            yield frame
+
+    async def compress():
+        return [chunk async for chunk in gzip_frames(source())]
+
+    chunks = asyncio.run(compress())
+    # 클라이언트는 청크가 도착할 때마다 프레임 전체를 풀 수 있어야 한다
+    decoder = zlib.decompressobj(31)
+    for chunk, frame in zip(chunks, frames):
+        assert decoder.decompress(chunk) == frame
+    assert decoder.decompress(chunks[-1]) == b"" and decoder.eof
+    sent, raw = sum(map(len, chunks)), sum(map(len, frames))
+    assert sent < raw / 2, (sent, raw)
+    print(f"✅ gzip SSE: {raw} → {sent} bytes, every frame decodable on arrival")
+
+
+def test_sse_response_negotiates_gzip():
+    from starlette.applications import Starlette
+    from starlette.routing import Route
+    from starlette.testclient import TestClient
+
+    async def ask_stream(request):
+        async def generate():
+            yield sse_event("answer", content="저그 승률 48%")
+            yield SSE_DONE
+        return sse_response(request, generate())
+
+    client = TestClient(Starlette(routes=[Route("/ask_stream", ask_stream, methods=["POST"])]))
+    old = os.environ.get(serialization.GZIP_ENV)
+    try:
+        os.environ[serialization.GZIP_ENV] = "1"
+        gzipped = client.post("/ask_stream", headers={"Accept-Encoding": "gzip"})
+        identity = client.post("/ask_stream", headers={"Accept-Encoding": "identity"})
+        os.environ[serialization.GZIP_ENV] = "0"
+        disabled = client.post("/ask_stream", headers={"Accept-Encoding": "gzip"})
+    finally:
+        if old is None:
+            os.environ.pop(serialization.GZIP_ENV, None)
+        else:
+            os.environ[serialization.GZIP_ENV] = old
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in identity.headers and "content-encoding" not in disabled.headers
+    expected = sse_event("answer", content="저그 승률 48%") + SSE_DONE
+    assert gzipped.content == identity.content == disabled.content == expected
+    assert gzipped.headers["content-type"].startswith("text/event-stream")
+    print("✅ gzip only when SSE_GZIP is on and the client accepts it")
+
+
+if __name__ == "__main__":
+    test_backends_agree_and_keep_korean()
+    test_sse_frames()
+    test_gzip_flushes_every_frame()
+    test_sse_response_negotiates_gzip()
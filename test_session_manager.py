@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Test per-conversation agent sessions (LRU, disk spill, message cap)"""
+
+import asyncio
+import json
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
+
+from session_manager import AgentSessions, messages_since, trim_messages
+
+
+def text(role, value):
+    return {"role": role, "content": [{"text": value}]}
+
+
+TOOL_TURN = [
+    text("user", "테란 승률"),
+    {"role": "assistant", "content": [{"toolUse": {"toolUseId": "t1", "name": "analyze_win_rates", "input": {}}}]},
+    {"role": "user", "content": [{"toolResult": {"toolUseId": "t1", "status": "success", "content": [{"text": "52%"}]}}]},
+    text("assistant", "52%입니다"),
+]
+
+
+class FakeAgent:
+    def __init__(self, messages=None):
+        self.messages = list(messages or [])
+
+
+def test_trim_keeps_tool_pairs():
+    messages = TOOL_TURN + [text("user", "저그는?"), text("assistant", "48%")]
+    # 잘린 앞부분이 toolResult 로 시작하면 다음 사용자 턴까지 버린다
+    assert trim_messages(messages, 4) == messages[4:]
+    assert trim_messages(messages, 6) == messages
+    assert trim_messages(messages, 0) == []
+    print("✅ trimming never starts at an orphan toolResult")
+
+
+def test_lru_spill_and_restore():
+    with tempfile.TemporaryDirectory() as tmp:
+        created = []
+
+        def factory(messages):
+            agent = FakeAgent(messages)
+            created.append(agent)
+            return agent
+
+        sessions = AgentSessions(factory, "test", max_hot=2, spill_dir=tmp)
+
+        async def run():
+            for session_id in ("a", "b", "c"):
+                async with sessions.session(session_id) as agent:
+                    agent.messages += [text("user", f"{session_id} 질문"), text("assistant", f"{session_id} 답")]
+            assert list(sessions.hot) == ["b", "c"]
+            assert len(list(Path(tmp).glob("*.json"))) == 1
+            # 스필된 세션은 다음 사용 때 디스크에서 복원된다
+            async with sessions.session("a") as agent:
+                assert [m["content"][0]["text"] for m in agent.messages] == ["a 질문", "a 답"]
+            assert list(sessions.hot) == ["c", "a"]
+            # 일회용 세션은 저장되지 않는다
+            async with sessions.session(None) as agent:
+                assert agent.messages == []
+            assert len(sessions) == 2
+
+        asyncio.run(run())
+        assert len(created) == 5
+    print("✅ cold sessions spill to disk and come back on demand")
+
+
+def test_spill_keeps_bytes_and_runs_off_the_loop():
+    image = bytes(range(256))
+    with tempfile.TemporaryDirectory() as tmp:
+        sessions = AgentSessions(FakeAgent, "test", max_hot=1, spill_dir=tmp)
+        writers = []
+        write = sessions._write
+
+        def recording_write(path, messages):
+            writers.append(threading.current_thread())
+            write(path, messages)
+
+        sessions._write = recording_write
+
+        async def run():
+            async with sessions.session("a") as agent:
+                agent.messages += [
+                    {"role": "user", "content": [{"text": "이 스크린샷 봐줘"},
+                                                 {"image": {"format": "png", "source": {"bytes": image}}}]},
+                    text("assistant", "확인했습니다"),
+                ]
+            async with sessions.session("b"):
+                pass
+            # 바이트는 base64 로 저장되어 그대로 돌아온다
+            async with sessions.session("a") as agent:
+                return agent.messages[0]["content"][1]["image"]["source"]["bytes"]
+
+        restored = asyncio.run(run())
+        assert restored == image, restored[:20]
+
+        # JSON 으로 옮길 수 없는 값이 있으면 깨진 파일 대신 아무것도 남기지 않는다
+        async def unserializable():
+            async with sessions.session("c") as agent:
+                agent.messages += [text("user", "질문"), {"role": "assistant", "content": [{"text": object()}]}]
+            async with sessions.session("d"):
+                pass
+            async with sessions.session("c") as agent:
+                return agent.messages
+
+        assert asyncio.run(unserializable()) == []
+        # 파일 쓰기는 이벤트 루프 스레드가 아닌 작업 스레드에서
+        assert writers and threading.main_thread() not in writers
+    print("✅ spilled image bytes round-trip as base64; unserializable sessions are not written")
+
+
+def test_same_session_turns_are_serialized():
+    sessions = AgentSessions(FakeAgent, "test")
+    order = []
+
+    async def turn(name):
+        async with sessions.session("ctx") as agent:
+            order.append(f"{name} start")
+            await asyncio.sleep(0.01)
+            agent.messages.append(text("user", name))
+            order.append(f"{name} end")
+
+    async def run():
+        await asyncio.gather(turn("1"), turn("2"))
+
+    asyncio.run(run())
+    assert order == ["1 start", "1 end", "2 start", "2 end"], order
+    print("✅ turns of one conversation run one at a time")
+
+
+def test_real_agent_is_capped():
+    import cs_feedback_agent_executor as cs
+
+    agent = cs.create_agent(TOOL_TURN)
+    assert agent.messages == TOOL_TURN
+    assert agent.conversation_manager.window_size == 40
+    known = {id(m) for m in agent.messages}
+    del agent.messages[:2]
+    agent.messages.append(text("user", "새 질문"))
+    assert messages_since(agent, known) == [text("user", "새 질문")]
+    json.dumps(agent.messages)
+    print("✅ session agents use a sliding window and restore their messages")
+
+
+if __name__ == "__main__":
+    test_trim_keeps_tool_pairs()
+    test_lru_spill_and_restore()
+    test_spill_keeps_bytes_and_runs_off_the_loop()
+    test_same_session_turns_are_serialized()
+    test_real_agent_is_capped()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Test cold-start behaviour (import profiler, no eager pandas / network / AWS setup)"""
+
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+AGENTS = Path(__file__).parent / "agents"
+sys.path.insert(0, str(AGENTS))
+
+from startup import ImportProfiler
+
+
+def test_profiler_splits_inclusive_and_self_time():
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / "slow_child.py").write_text("import time\ntime.sleep(0.05)\n")
+        (Path(tmp) / "slow_parent.py").write_text("import time\nimport slow_child\ntime.sleep(0.02)\n")
+        profiler = ImportProfiler()
+        sys.path.insert(0, tmp)
+        sys.meta_path.insert(0, profiler)
+        try:
+            import slow_parent  # noqa: F401
+        finally:
+            sys.meta_path.remove(profiler)
+            sys.path.remove(tmp)
+
+    assert profiler.inclusive["slow_parent"] >= 0.07
+    assert 0.02 <= profiler.self_time["slow_parent"] < 0.05
+    assert profiler.self_time["slow_child"] >= 0.05
+    assert profiler.slowest(1)[0][0] == "slow_parent"
+    print(f"✅ slow_parent {profiler.inclusive['slow_parent'] * 1000:.0f} ms "
+          f"(self {profiler.self_time['slow_parent'] * 1000:.0f} ms)")
+
+
+def test_agents_import_without_side_effects():
+    # 새 프로세스에서 import: pandas, 하위 에이전트 탐색, Bedrock 클라이언트가 모두 미뤄져야 한다
+    code = (
+        "import sys, data_analysis_agent, game_balance_agent, session_manager\n"
+        "assert 'pandas' not in sys.modules\n"
+        "assert game_balance_agent.a2a_client.cards == {}\n"
+        "assert session_manager._models == {}\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=AGENTS, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert "Failed to connect" not in result.stdout
+    print("✅ agent modules import without pandas, network discovery or AWS setup")
+
+
+def test_profile_startup_flag():
+    result = subprocess.run([sys.executable, "cs_feedback_agent.py", "--profile-startup"],
+                            cwd=AGENTS, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    for expected in ("Startup profile (CS Feedback Agent)", "imports", "app build", "Slowest modules", "strands"):
+        assert expected in result.stdout, expected
+    print("✅ --profile-startup reports and exits: " + result.stdout.splitlines()[0])
+
+
+if __name__ == "__main__":
+    test_profiler_splits_inclusive_and_self_time()
+    test_agents_import_without_side_effects()
+    test_profile_startup_flag()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Test the shared GUI streaming client (append-only rendering, SSE parsing, chat store)"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "gui"))
+
+from stream_client import AppendOnlyText, ChatStore, iter_events
+
+
+class FakeElement:
+    def __init__(self, log):
+        self.log = log
+
+    def code(self, text, language=None):
+        self.log.append(text)
+
+
+class FakeContainer:
+    """Records every text sent to the browser and the placeholders created"""
+
+    def __init__(self):
+        self.sent = []
+        self.placeholders = 0
+
+    def empty(self):
+        self.placeholders += 1
+        return FakeElement(self.sent)
+
+
+class FakeResponse:
+    def __init__(self, lines):
+        self.lines = lines
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self, decode_unicode=False):
+        yield from self.lines
+
+
+class FakeSession:
+    def __init__(self, lines):
+        self.lines = lines
+        self.calls = []
+
+    def post(self, url, json=None, stream=False, timeout=None):
+        self.calls.append((url, json))
+        return FakeResponse(self.lines)
+
+
+def test_append_only_rendering_is_linear():
+    container = FakeContainer()
+    text = AppendOnlyText(container, live_tail=100)
+    chunk = "사고 과정 한 줄입니다\n"
+    for _ in range(500):
+        text.append(chunk)
+        text.flush()
+    sent = sum(len(t) for t in container.sent)
+    total = len(text.text)
+    # 매 프레임 전체를 다시 그리면 총 전송량이 O(n²): 꼬리만 다시 그리면 O(n)
+    assert sent < total * 12, (sent, total)
+    assert text.frozen + len(container.sent[-1]) == total
+    assert container.placeholders > 1
+    print(f"✅ {total} chars rendered with {sent} chars sent ({container.placeholders} blocks)")
+
+
+def test_iter_events_reuses_session():
+    events = [{"type": "thinking", "content": "a"}, {"type": "answer", "content": "b"}, {"type": "done"}, {"type": "answer", "content": "late"}]
+    session = FakeSession([""] + [f"data: {json.dumps(e)}" for e in events])
+    received = list(iter_events("http://agent/ask_stream", {"query": "q"}, session=session))
+    assert received == events[:3]
+    list(iter_events("http://agent/ask_stream", {"query": "q2"}, session=session))
+    assert [c[1]["query"] for c in session.calls] == ["q", "q2"]
+    print("✅ SSE events parsed until done on a shared session")
+
+
+def test_chat_store_lru():
+    store = ChatStore(max_sessions=2)
+    store.messages("a").append({"role": "user", "content": "1"})
+    store.messages("b")
+    store.messages("a")
+    store.messages("c")
+    assert list(store.sessions) == ["a", "c"]
+    assert store.messages("a") == [{"role": "user", "content": "1"}]
+    store.clear("a")
+    assert store.messages("a") == []
+    print("✅ chat history kept per session, least recently used evicted")
+
+
+if __name__ == "__main__":
+    test_append_only_rendering_is_linear()
+    test_iter_events_reuses_session()
+    test_chat_store_lru()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Test structured tool outputs (JSON tool results, DataPart artifacts)"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
+
+from match_store import convert
+from game_log_engine import GameLogEngine
+from structured_output import artifact_parts, collect_tool_data, split_parts, to_jsonable
+import data_analysis_agent_executor as data_tools
+from cs_feedback_agent_executor import get_feedback
+from agent_test_helpers import patched
+
+DATA_DIR = Path(__file__).parent / "data"
+LOGS = json.loads((DATA_DIR / "game_logs.json").read_text())
+
+
+def payload(result):
+    assert result["status"] == "success", result
+    text, data = result["content"][0]["text"], result["content"][1]["json"]
+    # JSON 직렬화가 가능해야 A2A DataPart 로 실을 수 있다
+    json.dumps(data)
+    return text, data
+
+
+def test_data_tools_return_numbers():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = GameLogEngine(convert(DATA_DIR / "game_logs.json", Path(tmp) / "s"), persist=False)
+        with patched(data_tools, _engine=engine, _rating_engine=None):
+            text, data = payload(data_tools.analyze_win_rates("Terran"))
+            wins = sum(1 for g in LOGS if g["winner_race"] == "Terran")
+            games = wins + sum(1 for g in LOGS if g["loser_race"] == "Terran")
+            assert (data["wins"], data["games"]) == (wins, games)
+            assert data["ci_low"] <= data["win_rate"] <= data["ci_high"]
+            assert "Terran 승률" in text
+
+            _, data = payload(data_tools.analyze_matchup("Zerg"))
+            assert [m["opponent"] for m in data["matchups"]] == ["Terran", "Protoss"]
+
+            _, data = payload(data_tools.analyze_game_duration("Protoss", bootstrap=True))
+            low, high = data["ci_minutes"]
+            assert low <= data["mean_minutes"] <= high
+
+            _, data = payload(data_tools.analyze_race_strength())
+            assert {r["race"] for r in data["ratings"]} == {"Terran", "Zerg", "Protoss"}
+            # 구간별 레이팅은 기간 조건을 지원하지 않으므로 무시하지 않고 오류로 알린다
+            assert data_tools.analyze_race_strength(by_bracket=True, last_days=7)["status"] == "error"
+            assert data_tools.analyze_race_strength(by_bracket=True, patch="1.0.1")["status"] == "error"
+
+            error = data_tools.analyze_win_rates("Marine")
+            assert error["status"] == "error"
+    print("✅ data tools return summary + JSON payload")
+
+
+def test_feedback_tool():
+    text, data = payload(get_feedback(urgency="high"))
+    assert data["count"] == len(data["feedback"]) > 0
+    assert all(f["urgency"] == "high" for f in data["feedback"])
+    assert get_feedback(race="Marine")["status"] == "error"
+    print(f"✅ get_feedback → {text}")
+
+
+def test_collect_and_artifact_round_trip():
+    messages = [
+        {"role": "assistant", "content": [{"toolUse": {"toolUseId": "t1", "name": "analyze_win_rates", "input": {}}}]},
+        {"role": "user", "content": [{"toolResult": {"toolUseId": "t1", "status": "success",
+                                                     "content": [{"text": "요약"}, {"json": {"win_rate": 0.5}}]}}]},
+        {"role": "user", "content": [{"toolResult": {"toolUseId": "t2", "status": "error", "content": [{"text": "x"}]}}]},
+    ]
+    payloads = collect_tool_data(messages)
+    assert payloads == [{"tool": "analyze_win_rates", "data": {"win_rate": 0.5}}]
+    text, data = split_parts(artifact_parts("답변", payloads))
+    assert text == "답변" and data == payloads
+    assert to_jsonable({"a": np.float32(0.123456), "b": np.arange(2), "c": np.bool_(True)}) == {"a": 0.1235, "b": [0, 1], "c": True}
+    print("✅ tool payloads → DataPart → client round trip")
+
+
+if __name__ == "__main__":
+    test_data_tools_return_numbers()
+    test_feedback_tool()
+    test_collect_and_artifact_round_trip()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Test vectorized win-rate intervals and binomial p-values"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
+
+from win_rate_stats import (
+    wilson_interval, clopper_pearson_interval, binomial_test_half,
+    win_rate_summary, bootstrap_mean_interval,
+)
+
+# (wins, games) -> reference values (scipy.stats.binomtest)
+WINS = np.array([2, 21, 0, 7, 500])
+GAMES = np.array([3, 21, 5, 50, 1000])
+WILSON = [(0.207660, 0.938508), (0.845361, 1.0), (0.0, 0.434482), (0.069508, 0.261862), (0.469070, 0.530930)]
+EXACT = [(0.094299, 0.991596), (0.838902, 1.0), (0.0, 0.521824), (0.058192, 0.267396), (0.468549, 0.531451)]
+P_VALUES = [1.0, 9.536743e-07, 0.0625, 2.098677e-07, 1.0]
+
+
+def test_intervals_all_groups_at_once():
+    low, high = wilson_interval(WINS, GAMES)
+    assert np.allclose(np.c_[low, high], WILSON, atol=1e-5)
+    low, high = clopper_pearson_interval(WINS, GAMES)
+    assert np.allclose(np.c_[low, high], EXACT, atol=1e-5)
+    print("✅ Wilson / Clopper-Pearson intervals")
+
+
+def test_p_values_and_empty_groups():
+    assert np.allclose(binomial_test_half(WINS, GAMES), P_VALUES, rtol=1e-5)
+
+    # 매치업 행렬처럼 2차원 입력, 경기 없는 칸은 NaN
+    counts = np.array([[0, 13], [0, 0]])
+    summary = win_rate_summary(counts, counts + counts.T)
+    assert np.isnan(summary["rate"][0, 0])
+    assert summary["significant"][0, 1] and not summary["significant"][0, 0]
+    print("✅ binomial p-values")
+
+
+def test_bootstrap_mean_interval():
+    values = np.random.default_rng(0).normal(1200, 300, size=5000)
+    low, high = bootstrap_mean_interval(values, n_boot=500, seed=1, max_batch_elements=100_000)
+    assert low < values.mean() < high
+    assert high - low < 40
+    print(f"✅ bootstrap interval {low:.1f} ~ {high:.1f}")
+
+
+if __name__ == "__main__":
+    test_intervals_all_groups_at_once()
+    test_p_values_and_empty_groups()
+    test_bootstrap_mean_interval()
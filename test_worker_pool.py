@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Test shared SQLite task store and task-affinity routing"""
+
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
+
+from a2a.types import Artifact, Task, TaskState, TaskStatus, TextPart
+from sqlite_task_store import SQLiteTaskStore
+from worker_pool import STABLE_UPTIME, AffinityRouter, ResponseIdScanner, WorkerPool, build_proxy, request_ids
+
+
+def test_task_visible_across_workers():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "tasks.sqlite"
+        # 워커 두 개가 같은 파일을 연다
+        worker_a, worker_b = SQLiteTaskStore(path), SQLiteTaskStore(path)
+        task = Task(
+            id="task-1",
+            contextId="ctx-1",
+            status=TaskStatus(state=TaskState.input_required),
+            artifacts=[Artifact(artifactId="a1", parts=[TextPart(text="어느 종족인가요?")])],
+        )
+
+        async def run():
+            await worker_a.save(task)
+            loaded = await worker_b.get("task-1")
+            assert loaded == task, loaded
+            await worker_b.delete("task-1")
+            assert await worker_a.get("task-1") is None
+
+        asyncio.run(run())
+        worker_a.close()
+        worker_b.close()
+    print("✅ task saved by one worker is loaded by another")
+
+
+def test_request_ids():
+    follow_up = {"jsonrpc": "2.0", "id": "1", "method": "message/send",
+                 "params": {"message": {"taskId": "t1", "contextId": "c1", "parts": []}}}
+    assert request_ids(json.dumps(follow_up).encode()) == ["t1", "c1"]
+    get = {"jsonrpc": "2.0", "id": "2", "method": "tasks/get", "params": {"id": "t1"}}
+    assert request_ids(json.dumps(get).encode()) == ["t1"]
+    assert request_ids(b'{"query": "hi"}') == []
+    assert request_ids(b"not json") == []
+    print("✅ request ID extraction")
+
+
+def test_affinity_routing():
+    router = AffinityRouter(workers=4, max_pinned=3)
+    assert [router.pick([]) for _ in range(5)] == [0, 1, 2, 3, 0]
+    router.pin(["t1", "c1"], 2)
+    assert router.pick(["t1"]) == 2 and router.pick(["c1"]) == 2
+    # 모르는 ID는 해시로 항상 같은 워커
+    assert router.pick(["unknown"]) == router.pick(["unknown"])
+    router.pin(["t2"], 1)
+    router.pin(["t3"], 3)
+    assert "t1" not in router.pinned and len(router.pinned) == 3
+    print("✅ affinity routing (LRU pinning)")
+
+
+def test_response_ids_split_across_chunks():
+    event = {"jsonrpc": "2.0", "id": "1", "result": {"kind": "status-update", "taskId": "task-123", "contextId": "ctx-456",
+                                                      "status": {"state": "working"}, "final": False}}
+    stream = b": ping\r\n\r\n" + b"data: " + json.dumps(event).encode() + b"\r\n\r\n"
+    # ID 중간에서 잘린 청크: 한 청크씩만 보면 놓친다
+    cut = stream.index(b"task-1") + 3
+    scanner = ResponseIdScanner(streaming=True)
+    assert scanner.feed(stream[:cut]) == []
+    assert scanner.feed(stream[cut:]) == ["task-123", "ctx-456"]
+    assert scanner.close() == []
+
+    body = json.dumps({"jsonrpc": "2.0", "id": "1", "result": {"kind": "task", "id": "task-9", "contextId": "ctx-9"}}).encode()
+    scanner = ResponseIdScanner(streaming=False)
+    assert [scanner.feed(body[i:i + 7]) for i in range(0, len(body), 7)] == [[]] * len(range(0, len(body), 7))
+    assert scanner.close() == ["task-9", "ctx-9"]
+
+    scanner = ResponseIdScanner(streaming=False, limit=16)
+    scanner.feed(body)
+    assert scanner.close() == [] and not scanner.buffer
+    print("✅ response IDs found when split across chunks (SSE event and JSON body)")
+
+
+def test_restart_backoff_resets():
+    pool = WorkerPool(1, command=[])
+    try:
+        pool.started[0] = time.monotonic()
+        assert [pool.restart_delay(0) for _ in range(7)] == [1, 2, 4, 8, 16, 30, 30]
+        # 한동안 정상 동작한 뒤 죽으면 다시 1초부터
+        pool.started[0] = time.monotonic() - STABLE_UPTIME
+        assert pool.restart_delay(0) == 1
+        pool.started[0] = time.monotonic()
+        assert pool.restart_delay(0) == 2
+    finally:
+        pool.stop()
+    print("✅ restart backoff doubles on quick crashes and resets after a stable uptime")
+
+
+def test_workers_report_their_ports():
+    script = (
+        f"import sys; sys.path.insert(0, {str(Path(__file__).parent / 'agents')!r})\n"
+        "from starlette.applications import Starlette\n"
+        "from starlette.responses import PlainTextResponse\n"
+        "from starlette.routing import Route\n"
+        "from worker_pool import serve\n"
+        "app = Starlette(routes=[Route('/', lambda request: PlainTextResponse('ok'))])\n"
+        "serve(app, '127.0.0.1', 1)\n"
+    )
+    pool = WorkerPool(2, command=["-c", script])
+    try:
+        pool.start_all()
+        assert pool.wait_ready(30)
+        ports = [pool.port(0), pool.port(1)]
+        assert all(ports) and ports[0] != ports[1], ports
+        assert all(httpx.get(f"http://127.0.0.1:{port}/").text == "ok" for port in ports)
+    finally:
+        pool.stop()
+    print(f"✅ workers bound their own ports {ports} and reported them")
+
+
+def test_state_updates_reach_every_worker():
+    from starlette.testclient import TestClient
+
+    # 워커마다 메모리에 글을 쌓는 작은 앱 (CS 에이전트의 FEEDBACK_DATA 처럼)
+    script = (
+        f"import sys; sys.path.insert(0, {str(Path(__file__).parent / 'agents')!r})\n"
+        "from starlette.applications import Starlette\n"
+        "from starlette.responses import JSONResponse\n"
+        "from starlette.routing import Route\n"
+        "from worker_pool import serve\n"
+        "posts = []\n"
+        "async def post(request):\n"
+        "    posts.append(await request.json())\n"
+        "    return JSONResponse({'ingested': 1})\n"
+        "async def snapshot(request):\n"
+        "    return JSONResponse({'posts': posts})\n"
+        "app = Starlette(routes=[Route('/feedback', post, methods=['POST']), Route('/feedback_snapshot', snapshot)])\n"
+        "serve(app, '127.0.0.1', 1)\n"
+    )
+    pool = WorkerPool(2, command=["-c", script])
+    pool.start_all()
+    try:
+        assert pool.wait_ready(30)
+        with TestClient(build_proxy(pool, broadcast=["/feedback"])) as proxy:
+            response = proxy.post("/feedback", json={"race": "Zerg", "complaint": "가시촉수"})
+            assert response.status_code == 200 and response.json() == {"ingested": 1}
+            # 라운드로빈으로 어느 워커가 받든 같은 글을 본다
+            seen = [proxy.get("/feedback_snapshot").json()["posts"] for _ in range(2)]
+            direct = [httpx.get(f"http://127.0.0.1:{pool.port(i)}/feedback_snapshot").json()["posts"] for i in range(2)]
+    finally:
+        pool.stop()
+    assert seen == direct == [[{"race": "Zerg", "complaint": "가시촉수"}]] * 2, (seen, direct)
+    print("✅ feedback POSTed through the proxy is visible from both workers")
+
+
+if __name__ == "__main__":
+    test_task_visible_across_workers()
+    test_request_ids()
+    test_affinity_routing()
+    test_response_ids_split_across_chunks()
+    test_restart_backoff_resets()
+    test_workers_report_their_ports()
+    test_state_updates_reach_every_worker()